@@ -0,0 +1,321 @@
+# Importing all required libraries
+import io
+import os
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import contextlib
+import numpy as np
+from vtkmodules.vtkCommonCore import vtkVersion
+from vtkmodules.vtkCommonTransforms import vtkTransform
+from vtkmodules.vtkRenderingCore import vtkRenderWindow, vtkRenderer
+from vtkmodules.vtkIOImport import vtkOBJImporter
+from configobj import ConfigObj
+import Main
+import ObjectRebuild
+from MemoryUsage import getCurrentRSS
+import SceneCache
+import SceneCompaction
+import LevelOfDetail
+import ItemPicker
+import PrinterFarm
+import CollisionChecker
+
+# Writes a synthetic .obj and .mtl pair with actorCount nets of about trianglesPerActor triangles each, laid out like a printer model
+def writeSyntheticModel(directory, actorCount, trianglesPerActor, materialCount=12, seed=1):
+    random = np.random.default_rng(seed) # Fixed seed so every run builds the same model
+    os.makedirs(directory, exist_ok=True)
+    objPath = os.path.join(directory, "synthetic.obj")
+    mtlPath = os.path.join(directory, "synthetic.mtl")
+
+    # Materials
+    with open(mtlPath, "w") as file:
+        for i, colour in enumerate(random.uniform(0, 1, (materialCount, 3))): # Loops for each material
+            file.write(f"newmtl material{i}\nKd {colour[0]:.6f} {colour[1]:.6f} {colour[2]:.6f}\n\n")
+
+    # Each net is a wavy grid patch of side by side points, two triangles per grid square
+    side = int(np.ceil(np.sqrt(trianglesPerActor / 2))) + 1 # Grid points along each side of a patch
+    u, v = np.meshgrid(np.linspace(0, 1, side), np.linspace(0, 1, side))
+    u, v = u.reshape(-1), v.reshape(-1)                    # Patch coordinates of each grid point
+    square = np.arange((side - 1) * (side - 1))            # Index of each grid square
+    corner = square // (side - 1) * side + square % (side - 1) # Grid point at the first corner of each square
+    faces = np.empty((len(square) * 2, 3), dtype=np.int64) # Point indices of each triangle
+    faces[0::2] = np.stack([corner, corner + 1, corner + side + 1], axis=1)
+    faces[1::2] = np.stack([corner, corner + side + 1, corner + side], axis=1)
+    faces = faces[:trianglesPerActor] + 1                  # .obj indices start at 1
+
+    with open(objPath, "w") as file:
+        file.write("# Synthetic printer model\nmtllib synthetic.mtl\n")
+        for net in range(actorCount):                      # Loops for each net
+            origin = random.uniform([-100, -200, 0], [300, 200, 400]) # Where the patch sits in the model
+            size = random.uniform(5, 40)                   # Width of the patch
+            points = np.stack([origin[0] + u * size, origin[1] + v * size, origin[2] + np.sin(u * 6) * np.cos(v * 6) * size / 4], axis=1)
+            first = net * side * side                      # Points of the earlier nets come first
+            file.write(f"g net{net}\nusemtl material{net % materialCount}\n")
+            file.write(("v %.4f %.4f %.4f\n" * len(points)) % tuple(points.reshape(-1)))
+            file.write(("vt %.4f %.4f 0.0\n" * len(points)) % tuple(np.stack([u, v], axis=1).reshape(-1))) # Third value is stripped by the rebuild
+            file.write(("f %d/%d %d/%d %d/%d\n" * len(faces)) % tuple(np.repeat(faces + first, 2, axis=1).reshape(-1)))
+    return objPath, mtlPath
+
+# Writes a settings.ini for the synthetic model, based on the given settings file, with the first three quarters of the nets split between the axes
+def writeSyntheticSettings(settingsFile, outputFile, modelDirectory, actorCount):
+    config = ConfigObj(settingsFile) # Keeps every other setting and comment as they are
+    config.filename = outputFile
+    quarter = max(actorCount // 4, 1) # Nets per axis
+    config["PRINTER_MODEL"]["3DPrinterModelDirectory"] = modelDirectory
+    config["PRINTER_MODEL"]["XItems"] = f"0-{quarter - 1}"
+    config["PRINTER_MODEL"]["YItems"] = f"{quarter}-{min(2 * quarter, actorCount) - 1}"
+    config["PRINTER_MODEL"]["ZItems"] = f"{min(2 * quarter, actorCount - 1)}-{min(3 * quarter, actorCount) - 1}"
+    config.write()
+
+# Stand-in for MainWindow without Qt, reusing its vtk methods so the benchmark times the real code
+class HeadlessWindow:
+    setupAxisTransforms = Main.MainWindow.setupAxisTransforms
+    linkAxisTransforms = Main.MainWindow.linkAxisTransforms
+    getAxisItems = Main.MainWindow.getAxisItems
+    updatePrinterPosition = Main.MainWindow.updatePrinterPosition
+    generateItemRanges = Main.MainWindow.generateItemRanges
+    generateMovementRanges = Main.MainWindow.generateMovementRanges
+    convert = Main.MainWindow.convert
+
+    # Initalises the headless window object around an imported renderer
+    def __init__(self, renderer):
+        self.renderer = renderer
+        self.renderScheduler = self # updatePrinterPosition asks the scheduler for a frame, which only marks the scene dirty here
+        self.dirty = False          # Set when the scene has changed since the last frame
+
+        # Same setup as MainWindow.setupVtkWindow and addDockToolbar
+        actors = renderer.GetActors()
+        actors.InitTraversal()
+        self.actorList = [actors.GetNextActor() for item in range(actors.GetNumberOfItems())]
+        self.itemRanges = self.generateItemRanges()
+        self.axisTransforms = [vtkTransform() for direction in range(3)]
+        self.axisActors = [[self.actorList[i] for i in sorted(items)] for items in self.getAxisItems()]
+        self.setupAxisTransforms()
+        self.generateMovementRanges()
+        self.sliders = [[None, None, real[0], real[1], sim[0], sim[1], None] for real, sim in self.movementRanges] # Slider entries without the Qt widgets
+
+    # Marks the scene dirty, matches RenderScheduler.requestRender
+    def requestRender(self, *args):
+        self.dirty = True
+
+# Returns the median time in seconds of repeats calls to function
+def timeRepeated(function, repeats):
+    times = []
+    for i in range(repeats):
+        startTime = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - startTime)
+    return float(np.median(times))
+
+# Renders frameCount frames, calling step before each, and returns the frame rate with the first frame timed separately
+def timeFrames(renderWindow, frameCount, step):
+    startTime = time.perf_counter()
+    step(0)
+    renderWindow.Render()                    # The first frame uploads the geometry and compiles shaders
+    firstFrame = time.perf_counter() - startTime
+    startTime = time.perf_counter()
+    for frame in range(1, frameCount + 1):   # Loops for each timed frame
+        step(frame)
+        renderWindow.Render()
+    seconds = time.perf_counter() - startTime
+    return {"frames": frameCount, "seconds": seconds, "fps": frameCount / seconds, "firstFrameSeconds": firstFrame}
+
+# Builds a synthetic model of the given size and times each stage of the application on it
+def benchmarkModel(workDir, settingsFile, actorCount, trianglesPerActor, frameCount, updateCount, farmSizes):
+    result = {"actors": actorCount, "trianglesPerActor": trianglesPerActor, "triangles": actorCount * trianglesPerActor}
+    modelDir = os.path.join(workDir, f"model{actorCount}x{trianglesPerActor}")
+    objPath, mtlPath = writeSyntheticModel(modelDir, actorCount, trianglesPerActor)
+    result["objMegabytes"] = os.path.getsize(objPath) / (1024 * 1024)
+
+    # Config load, printing is included as it is part of startup but kept off the screen
+    syntheticSettings = os.path.join(modelDir, "settings.ini")
+    writeSyntheticSettings(settingsFile, syntheticSettings, modelDir, actorCount)
+    with contextlib.redirect_stdout(io.StringIO()):
+        result["configLoadSeconds"] = timeRepeated(lambda: Main.getConfig(syntheticSettings), 5)
+
+    # Object file rebuild
+    processedPath = os.path.join(modelDir, "processed.obj")
+    result["rebuild"] = ObjectRebuild.rebuildObjectFile(objPath, processedPath, mtlPath, int(Main.config["SETUP"]["CPUThreads"]))
+
+    # Object file import into an offscreen render window
+    resolution = Main.config["SETUP"]["WindowResolution"].split("x")
+    renderWindow = vtkRenderWindow()
+    renderWindow.OffScreenRenderingOn()      # No display needed
+    renderWindow.SetSize(int(resolution[0]), int(resolution[1]))
+    startTime = time.perf_counter()
+    importer = vtkOBJImporter()
+    importer.SetFileName(processedPath)
+    importer.SetFileNameMTL(mtlPath)
+    importer.SetRenderWindow(renderWindow)
+    importer.Update()
+    result["importSeconds"] = time.perf_counter() - startTime
+
+    # Scene cache, the path taken on every launch after the first
+    cacheDir = os.path.join(modelDir, "sceneCache")
+    renderer = importer.GetRenderer()
+    actors = renderer.GetActors()
+    actors.InitTraversal()
+    startTime = time.perf_counter()
+    SceneCache.saveScene(cacheDir, [actors.GetNextActor() for i in range(actors.GetNumberOfItems())])
+    result["cacheSaveSeconds"] = time.perf_counter() - startTime
+    result["cacheLoadSeconds"] = timeRepeated(lambda: SceneCache.loadScene(cacheDir), 3)
+
+    # Printer position updates without rendering
+    window = HeadlessWindow(renderer)
+    positions = np.random.default_rng(2).uniform(0, 200, (updateCount, 3)) # Simulated positions
+    startTime = time.perf_counter()
+    for position in positions:
+        window.updatePrinterPosition(position)
+    result["updatesPerSecond"] = updateCount / (time.perf_counter() - startTime)
+
+    # Scripted slider sweep, every slider moves across its full real range and back, one frame per step
+    renderer.ResetCamera()
+    def sweep(frame):
+        phase = abs((frame / frameCount) * 2 - 1) # Runs from 1 to 0 and back to 1
+        window.updatePrinterPosition([window.convert(i, window.sliders[i][2] + (1 - phase) * (window.sliders[i][3] - window.sliders[i][2])) for i in range(3)])
+    result["sliderSweep"] = timeFrames(renderWindow, frameCount, sweep)
+
+    # Camera orbit, one full turn around the model
+    camera = renderer.GetActiveCamera()
+    result["cameraOrbit"] = timeFrames(renderWindow, frameCount, lambda frame: camera.Azimuth(360 / frameCount))
+    result["cameraOrbit"]["actors"] = renderer.GetActors().GetNumberOfItems()
+
+    # Camera orbit again with the items merged into one actor per material for each axis and the static items, as drawn with mergeStaticItems on
+    axisItems = window.getAxisItems()
+    result["mergedLoadSeconds"] = timeRepeated(lambda: SceneCompaction.loadMergedScene(cacheDir, axisItems), 3)
+    mergedRenderer = vtkRenderer()
+    mergedActors, mergedDrawn, mergedAxis = SceneCompaction.loadMergedScene(cacheDir, axisItems)
+    for actor in mergedDrawn:
+        mergedRenderer.AddActor(actor)
+    mergedRenderer.SetActiveCamera(camera)   # Same view as the unmerged orbit
+    renderWindow.RemoveRenderer(renderer)
+    renderWindow.AddRenderer(mergedRenderer)
+    result["cameraOrbitMerged"] = timeFrames(renderWindow, frameCount, lambda frame: camera.Azimuth(360 / frameCount))
+    result["cameraOrbitMerged"]["actors"] = mergedRenderer.GetActors().GetNumberOfItems()
+
+    # Item picks at random pixels, as made by clicking in the printer model setup
+    startTime = time.perf_counter()
+    picker = ItemPicker.ItemPicker(mergedRenderer, mergedActors, mergedDrawn, SceneCache.loadArrays(cacheDir))
+    result["pickIndexSeconds"] = time.perf_counter() - startTime
+    width, height = renderWindow.GetSize()
+    pickTimes = []                           # Time of each pick that found an item
+    for x, y in np.random.default_rng(3).uniform(0, 1, (frameCount, 2)) * (width, height): # Loops for each random pixel
+        startTime = time.perf_counter()
+        if picker.pick(int(x), int(y)) is not None:
+            pickTimes.append(time.perf_counter() - startTime)
+    result["pickSeconds"] = float(np.median(pickTimes)) if pickTimes else None
+    result["pickHits"] = len(pickTimes)
+
+    # Collision checks of the X items, with the Y items standing in for bed models, on batches the size of the playback lookahead
+    arrays = SceneCache.loadArrays(cacheDir)
+    startTime = time.perf_counter()
+    movingBoxes = CollisionChecker.obbLeafBoxes(SceneCompaction.mergeItems(arrays, sorted(axisItems[0])).GetMapper().GetInput())
+    simulated = [sorted(slider[4:6]) for slider in window.sliders] # Same travel range as MainWindow.updateCollisionChecker
+    lower = np.array([simulated[0][0], -simulated[1][1], simulated[2][0]])
+    upper = np.array([simulated[0][1], -simulated[1][0], simulated[2][1]])
+    checker = CollisionChecker.CollisionChecker(movingBoxes, lower, upper)
+    checker.setObstacles(CollisionChecker.obbLeafBoxes(SceneCompaction.mergeItems(arrays, sorted(axisItems[1])).GetMapper().GetInput()))
+    result["collisionBuildSeconds"] = time.perf_counter() - startTime
+    translations = np.random.default_rng(5).uniform(lower, upper, (updateCount, 3)) # Relative positions of the X items
+    startTime = time.perf_counter()
+    colliding = np.concatenate([checker.checkTranslations(batch) for batch in np.array_split(translations, max(updateCount // 64, 1))])
+    result["collisionChecksPerSecond"] = updateCount / (time.perf_counter() - startTime)
+    result["collisionBoxes"] = [len(movingBoxes[0]), len(checker.pairCentres)] # X item leaf boxes and box pairs that can meet
+    result["collisionHits"] = int(colliding.sum())
+
+    # Camera orbit at each decimated detail level, as drawn while dragging the view
+    startTime = time.perf_counter()
+    levelDirs = LevelOfDetail.buildLevels(cacheDir)
+    result["lodBuildSeconds"] = time.perf_counter() - startTime
+    result["cameraOrbitLod"] = []
+    for ratio, levelDir in zip(LevelOfDetail.lodRatios, levelDirs): # Loops for each detail level
+        renderWindow.RemoveRenderer(mergedRenderer)
+        mergedRenderer = vtkRenderer()
+        for actor in SceneCompaction.loadMergedScene(levelDir, axisItems)[1]:
+            mergedRenderer.AddActor(actor)
+        mergedRenderer.SetActiveCamera(camera)
+        renderWindow.AddRenderer(mergedRenderer)
+        orbit = timeFrames(renderWindow, frameCount, lambda frame: camera.Azimuth(360 / frameCount))
+        orbit["ratio"] = ratio
+        result["cameraOrbitLod"].append(orbit)
+
+    # Printer farms, every printer moves to a new position each frame and one render draws them all
+    result["farm"] = []
+    for count in farmSizes:                  # Loops for each farm size
+        renderWindow.RemoveRenderer(mergedRenderer)
+        farmRenderer = vtkRenderer()
+        farmActors, farmDrawn, farmAxis = SceneCompaction.loadMergedScene(cacheDir, axisItems) # The main printer
+        window.linkAxisTransforms(farmAxis)
+        for actor in farmDrawn:
+            farmRenderer.AddActor(actor)
+        renderWindow.AddRenderer(farmRenderer)
+        renderWindow.Render()                # Uploads the main printer before measuring the farm printers
+        memoryBefore = getCurrentRSS()
+        bounds = np.array([actor.GetBounds() for actor in farmDrawn if actor.GetVisibility()])
+        spacing = (1.2 * (bounds[:, 1].max() - bounds[:, 0].min()), 1.2 * (bounds[:, 3].max() - bounds[:, 2].min())) # Same spacing as MainWindow.buildFarm
+        instances = []
+        for offset in PrinterFarm.gridOffsets(count, spacing)[1:]: # Loops for each farm printer
+            instance = PrinterFarm.PrinterInstance(offset)
+            instance.addLevels([(farmActors, farmDrawn, farmAxis)])
+            for actor in instance.levels[0]:
+                farmRenderer.AddActor(actor)
+            instances.append(instance)
+        farmRenderer.ResetCamera()
+        positions = np.random.default_rng(4).uniform(0, 200, (frameCount + 1, count, 3)) # Simulated positions of every printer in every frame
+        def moveFarm(frame):
+            window.updatePrinterPosition(positions[frame, 0])
+            for instance, position in zip(instances, positions[frame, 1:]):
+                Main.setAxisTranslations(instance.axisTransforms, position)
+        farm = timeFrames(renderWindow, frameCount, moveFarm)
+        memoryAfter = getCurrentRSS()
+        farm["printers"] = count
+        farm["actors"] = farmRenderer.GetActors().GetNumberOfItems()
+        farm["extraMegabytes"] = memoryAfter - memoryBefore if memoryBefore is not None else None # Memory added by the farm printers
+        result["farm"].append(farm)
+        mergedRenderer = farmRenderer
+
+    renderWindow.Finalize()                  # Releases the offscreen context before the next model
+    shutil.rmtree(modelDir, ignore_errors=True)
+    return result
+
+# Runs the benchmark for every model size and writes the results to a JSON file
+def main():
+    parser = argparse.ArgumentParser(description="Times startup, rebuild, update and render paths on synthetic printer models")
+    parser.add_argument("--sizes", nargs="+", default=["100x2000", "430x2000", "430x8000", "1000x2000"], help="Model sizes as actorsxtrianglesPerActor")
+    parser.add_argument("--frames", type=int, default=120, help="Frames rendered for the slider sweep and camera orbit")
+    parser.add_argument("--updates", type=int, default=10000, help="Printer position updates timed without rendering")
+    parser.add_argument("--farm", nargs="+", type=int, default=[1, 8, 32, 64], help="Printer farm sizes timed with every printer moving")
+    parser.add_argument("--settings", default="settings.ini", help="Settings file the synthetic settings are based on")
+    parser.add_argument("--output", default="benchmarkResults.json", help="JSON file the results are written to")
+    arguments = parser.parse_args()
+
+    results = {"machine": {"platform": platform.platform(), "python": platform.python_version(), "vtk": vtkVersion.GetVTKVersion(), "cpus": os.cpu_count()},
+               "runs": []}
+    workDir = tempfile.mkdtemp(prefix="printerGuruBenchmark") # Synthetic models are written here and removed afterwards
+    try:
+        for size in arguments.sizes:           # Loops for each model size
+            actorCount, trianglesPerActor = (int(value) for value in size.split("x"))
+            result = benchmarkModel(workDir, os.path.abspath(arguments.settings), actorCount, trianglesPerActor, arguments.frames, arguments.updates, arguments.farm)
+            print(f"{size}: import {result['importSeconds']:.2f} s, cache load {result['cacheLoadSeconds']:.2f} s ({result['mergedLoadSeconds']:.2f} s merged), "
+                  f"rebuild {result['rebuild']['throughput']:.1f} MB/s, {result['updatesPerSecond']:.0f} updates/s, "
+                  f"sweep {result['sliderSweep']['fps']:.1f} fps, orbit {result['cameraOrbit']['fps']:.1f} fps with {result['cameraOrbit']['actors']} actors, "
+                  f"{result['cameraOrbitMerged']['fps']:.1f} fps merged to {result['cameraOrbitMerged']['actors']} actors, "
+                  f"pick {result['pickSeconds'] * 1000 if result['pickSeconds'] else 0:.1f} ms, "
+                  f"{result['collisionChecksPerSecond']:.0f} collision checks/s, "
+                  f"detail levels built in {result['lodBuildSeconds']:.2f} s, "
+                  + ", ".join(f"{orbit['fps']:.1f} fps at {orbit['ratio']:g}" for orbit in result["cameraOrbitLod"]) + ", "
+                  + ", ".join(f"{farm['printers']} printers {farm['fps']:.1f} fps +{farm['extraMegabytes'] or 0:.0f} MB" for farm in result["farm"]))
+            results["runs"].append(result)
+    finally:
+        shutil.rmtree(workDir, ignore_errors=True)
+
+    with open(arguments.output, "w") as file:
+        json.dump(results, file, indent=2)
+
+# Checks if script is the main program being run
+if __name__ == '__main__':
+    main() # Runs the main function
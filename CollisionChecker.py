@@ -0,0 +1,123 @@
+# Importing all required libraries
+import numpy as np
+from vtkmodules.vtkCommonDataModel import vtkPolyData
+from vtkmodules.vtkFiltersGeneral import vtkOBBTree
+from vtkmodules.util import numpy_support # Conversion between NumPy and vtk arrays
+
+# Returns the leaf boxes of a vtkOBBTree built over polyData as centres (n, 3), unit axes (n, 3, 3) and half extents (n, 3), moved by offset
+def obbLeafBoxes(polyData, cellsPerLeaf=32, maxLevel=10, offset=(0, 0, 0)):
+    if polyData.GetNumberOfCells() == 0: # Nothing to collide with
+        return np.zeros((0, 3)), np.zeros((0, 3, 3)), np.zeros((0, 3))
+    tree = vtkOBBTree()
+    tree.SetDataSet(polyData)
+    tree.SetNumberOfCellsPerNode(cellsPerLeaf) # Nodes with fewer cells are not split
+    tree.SetMaxLevel(maxLevel)         # Limits the number of leaves on large meshes
+    tree.BuildLocator()
+    representation = vtkPolyData()
+    tree.GenerateRepresentation(-1, representation) # A negative level gathers the leaves, eight corners per box
+    corners = numpy_support.vtk_to_numpy(representation.GetPoints().GetData()).reshape(-1, 8, 3).astype(np.float64)
+
+    # The corners are the corner, then the corner moved along the longest, middle and shortest axis
+    edges = corners[:, [1, 2, 4]] - corners[:, :1] # Edge vectors along each axis
+    lengths = np.linalg.norm(edges, axis=2)
+    axes = np.divide(edges, lengths[:, :, None], out=np.zeros_like(edges), where=lengths[:, :, None] > 0)
+    flat = lengths[:, 2] == 0                      # Planar leaves have no shortest edge, their normal is used instead
+    axes[flat, 2] = np.cross(axes[flat, 0], axes[flat, 1])
+    centres = corners[:, 0] + edges.sum(axis=1) / 2 + np.asarray(offset, dtype=np.float64)
+    return centres, axes, lengths / 2
+
+# Joins several (centres, axes, half extents) box sets into one
+def joinBoxes(boxSets):
+    boxSets = list(boxSets)
+    if not boxSets:
+        return np.zeros((0, 3)), np.zeros((0, 3, 3)), np.zeros((0, 3))
+    return tuple(np.concatenate(parts) for parts in zip(*boxSets))
+
+# Checks translations of a moving group of boxes against obstacle boxes with the separating axis test, every box pair that can meet is prepared once
+# The pairs are sorted into a grid over the translation range, so a translation is only tested against the pairs in its grid cell
+class CollisionChecker:
+    # Initalises the checker for the moving boxes, which are only ever translated between translationLower and translationUpper
+    def __init__(self, movingBoxes, translationLower, translationUpper, clearance=0.0, maxGridEntries=4000000):
+        self.movingBoxes = movingBoxes
+        self.translationLower = np.asarray(translationLower, dtype=np.float64) # Smallest translation on each axis
+        self.translationUpper = np.asarray(translationUpper, dtype=np.float64) # Largest translation on each axis
+        self.clearance = clearance     # Gap boxes must keep to not count as colliding
+        self.maxGridEntries = maxGridEntries # The grid is made coarser until its cell lists hold at most this many pairs
+        self.setObstacles(joinBoxes([]))
+
+    # Prepares every moving and obstacle box pair that can meet within the translation range
+    def setObstacles(self, obstacleBoxes):
+        centresA, axesA, extentsA = self.movingBoxes
+        centresB, axesB, extentsB = obstacleBoxes
+        halfA = np.einsum("nk,nkj->nj", extentsA, np.abs(axesA)) # Axis aligned half sizes of each box
+        halfB = np.einsum("nk,nkj->nj", extentsB, np.abs(axesB))
+
+        # A pair's axis aligned boxes overlap for translations inside a box around the difference of their centres
+        pairCentres = centresB[None, :, :] - centresA[:, None, :] # Translation that puts the centres together, (moving, obstacle, 3)
+        pairHalf = halfA[:, None, :] + halfB[None, :, :] + self.clearance
+        nearest = np.clip(pairCentres, self.translationLower, self.translationUpper) # Reachable translation closest to each pair
+        a, b = np.nonzero(np.all(np.abs(nearest - pairCentres) <= pairHalf, axis=2)) # Pairs that can meet somewhere in the travel
+        self.pairCentres, self.pairHalf = pairCentres[a, b], pairHalf[a, b]
+
+        # The 15 separating axes of each pair, translation does not turn the boxes so they never change
+        cross = np.cross(axesA[a][:, :, None, :], axesB[b][:, None, :, :]).reshape(-1, 9, 3) # Edge direction pairs
+        self.pairAxes = np.concatenate([axesA[a], axesB[b], cross], axis=1) # (pairs, 15, 3)
+        radii = np.einsum("pk,pkl->pl", extentsA[a], np.abs(np.einsum("pkj,plj->pkl", axesA[a], self.pairAxes))) # Moving box projected onto each axis
+        radii += np.einsum("pk,pkl->pl", extentsB[b], np.abs(np.einsum("pkj,plj->pkl", axesB[b], self.pairAxes)))
+        self.pairRadii = radii + (self.clearance + 1e-6) * np.linalg.norm(self.pairAxes, axis=2) # Slack stops near parallel edges separating by rounding
+        self.pairOffsets = np.einsum("pj,plj->pl", self.pairCentres, self.pairAxes) # Centre distance along each axis before translating
+        self.buildGrid()
+
+    # Lists in each cell of a grid over the translation range the pairs whose axis aligned test can pass there
+    def buildGrid(self):
+        span = np.maximum(self.translationUpper - self.translationLower, 1e-9)
+        self.gridSize = 32                 # Cells along each axis, halved until the cell lists are small enough
+        while True:
+            self.cellSize = span / self.gridSize
+            lower = np.clip(np.floor((self.pairCentres - self.pairHalf - self.translationLower) / self.cellSize), 0, self.gridSize - 1).astype(np.int64)
+            upper = np.clip(np.floor((self.pairCentres + self.pairHalf - self.translationLower) / self.cellSize), 0, self.gridSize - 1).astype(np.int64)
+            sizes = upper - lower + 1      # Cells covered by each pair along each axis
+            counts = sizes.prod(axis=1)
+            if counts.sum() <= self.maxGridEntries or self.gridSize == 1:
+                break
+            self.gridSize //= 2
+
+        # Every covered cell of every pair, worked out from each entry's place within its pair's block of cells
+        pairs = np.repeat(np.arange(len(counts)), counts)
+        local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        sizes, lower = sizes[pairs], lower[pairs]
+        cells = lower[:, 0] + local // (sizes[:, 1] * sizes[:, 2])
+        cells = cells * self.gridSize + lower[:, 1] + local // sizes[:, 2] % sizes[:, 1]
+        cells = cells * self.gridSize + lower[:, 2] + local % sizes[:, 2]
+        order = np.argsort(cells, kind="stable")
+        self.cellPairs = pairs[order]      # Pairs of each cell, one cell after another
+        self.cellStarts = np.searchsorted(cells[order], np.arange(self.gridSize ** 3 + 1)) # Where each cell's pairs start in cellPairs
+
+    # Returns whether the moving boxes hit an obstacle at each of an (n, 3) array of translations
+    # A cell's pairs are tested a chunk at a time and translations already found colliding are dropped, so crowded cells stop early
+    def checkTranslations(self, translations, chunkSize=256):
+        translations = np.asarray(translations, dtype=np.float64).reshape(-1, 3)
+        colliding = np.zeros(len(translations), dtype=bool)
+        if len(self.pairCentres) * len(translations) <= 65536: # Few pairs, one test of every pair is quicker than walking the grid
+            self.testPairs(translations, np.arange(len(translations)), np.arange(len(self.pairCentres)), colliding)
+            return colliding
+        cell = np.clip(np.floor((translations - self.translationLower) / self.cellSize), 0, self.gridSize - 1).astype(np.int64) # Translations past the travel use the edge cells
+        cell = (cell[:, 0] * self.gridSize + cell[:, 1]) * self.gridSize + cell[:, 2]
+        for index in np.unique(cell):      # Loops for each grid cell holding a translation
+            remaining = np.nonzero(cell == index)[0] # Translations in the cell not yet found colliding
+            for start in range(self.cellStarts[index], self.cellStarts[index + 1], chunkSize): # Loops for each chunk of the cell's pairs
+                remaining = self.testPairs(translations, remaining, self.cellPairs[start:min(start + chunkSize, self.cellStarts[index + 1])], colliding)
+                if not len(remaining):     # Every translation in the cell collides
+                    break
+        return colliding
+
+    # Marks the translations at indices that hit an obstacle in any of pairs as colliding, returning the indices still clear
+    def testPairs(self, translations, indices, pairs, colliding):
+        near = np.all(np.abs(translations[indices, None, :] - self.pairCentres[None, pairs, :]) <= self.pairHalf[None, pairs, :], axis=2) # Axis aligned test first
+        position, pair = np.nonzero(near)
+        if len(position):
+            pair = pairs[pair]
+            separation = np.abs(self.pairOffsets[pair] - np.einsum("hj,hlj->hl", translations[indices[position]], self.pairAxes[pair])) # Centre distance along each axis
+            touching = ~np.any(separation > self.pairRadii[pair], axis=1) # No axis separates the boxes
+            colliding[indices[position[touching]]] = True
+        return indices[~colliding[indices]]
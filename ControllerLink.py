@@ -0,0 +1,264 @@
+# Importing all required libraries
+import os
+import time
+import threading
+from collections import deque
+try:
+    import serial # pyserial, only needed when a hardware controller serial port is set
+except ImportError:
+    serial = None
+
+readyLine = b"start" # Printed by Firmware.ino once it has booted, lines sent before it would be lost
+
+# Non-blocking link to the hardware controller, commands are queued by the GUI and written to the serial port on a background thread
+class ControllerLink:
+    # Initalises the controller link object
+    def __init__(self, port, baudRate=115200, maxQueue=64, maxInFlight=4, batchSize=8, ackTimeout=0.5, readyTimeout=3.0, writeTimeout=1.0):
+        if serial is None: # The link cannot work without pyserial
+            raise RuntimeError("pyserial is required to output to the hardware controller")
+        self.port = port               # Serial port name, e.g. COM3 or /dev/ttyACM0
+        self.baudRate = baudRate       # Serial baud rate, must match Firmware.ino
+        self.maxQueue = maxQueue       # Maximum number of queued commands before new ones are rejected
+        self.maxInFlight = maxInFlight # Maximum number of lines sent but not yet acknowledged by the firmware
+        self.batchSize = batchSize     # Maximum number of lines written to the port at once
+        self.ackTimeout = ackTimeout   # Seconds without an acknowledgement before the lines in flight count as lost
+        self.readyTimeout = readyTimeout # Seconds to wait for the firmware to boot after opening the port, which resets the board
+        self.writeTimeout = writeTimeout # Seconds a write may block before it is given up, so stop never hangs on a stuck port
+        self.ready = False             # Set if the firmware reported it had booted
+        self.connected = False         # Set once the port is open and the wait for the firmware to boot is over
+        self.error = None              # Message saying why the port could not be opened
+        self.connection = None         # Serial connection, opened by the writer thread
+        self.readerThread = None       # Reader thread, started once the port is open
+        self.running = False           # Set while the link threads should keep running
+
+        # Shared state, only accessed while holding self.condition
+        self.condition = threading.Condition() # Lock and wake up signal shared by the GUI and writer thread
+        self.commands = deque()        # Queued commands as (line, time queued)
+        self.pendingPosition = None    # Newest position target not yet sent as (line, time queued), older targets are replaced
+        self.inFlight = deque()        # (line number, line, time queued, time sent, is a position) of each line sent but not yet acknowledged, in send order
+        self.lineNumber = 0            # Number of the last line sent, each line starts with N and its number so acknowledgements can be matched to lines
+        self.newestPosition = 0        # Line number of the newest position target sent
+
+        # Statistics
+        self.sent = 0          # Number of lines written to the port
+        self.acknowledged = 0  # Number of lines acknowledged by the firmware
+        self.collapsed = 0     # Number of position targets replaced before they were sent
+        self.rejected = 0      # Number of commands rejected because the queue was full
+        self.lost = 0          # Number of lines never acknowledged
+        self.unconfirmed = 0   # Number of those lines that were commands, they are never sent again as the firmware may have already run them
+        self.lastLatency = 0.0 # Time in seconds from queueing to acknowledgement of the last line
+        self.maxLatency = 0.0  # Longest latency seen
+        self.totalLatency = 0.0 # Sum of every latency, used for the average
+
+    # Starts the writer thread, which opens the port, so the caller never waits for the board to reset
+    def start(self):
+        self.running = True
+        self.writerThread = threading.Thread(target=self.writeLoop, daemon=True) # Daemon threads never keep the program open
+        self.writerThread.start()
+
+    # Opens the serial port, waits for the firmware to boot and starts the reader thread, returns False if the port could not be opened
+    # Runs on the writer thread, lines sent meanwhile are queued or collapsed as usual
+    def connect(self):
+        try:
+            self.connection = serial.Serial(self.port, self.baudRate, timeout=0.1, write_timeout=self.writeTimeout) # Read timeout lets the reader thread check if it should stop
+        except (serial.SerialException, OSError, ValueError) as error: # Busy or missing port, or bad settings
+            with self.condition:
+                self.error = str(error)
+            return False
+        ready = self.waitForReady()
+        with self.condition:
+            self.ready = ready
+            self.connected = True
+        self.readerThread = threading.Thread(target=self.readLoop, daemon=True)
+        self.readerThread.start()
+        return True
+
+    # Waits up to readyTimeout for the firmware's ready line, returns False if it never came, e.g. firmware that does not print one
+    def waitForReady(self):
+        deadline = time.perf_counter() + self.readyTimeout
+        buffer = b"" # Output received so far
+        while self.running and time.perf_counter() < deadline: # Gives up early if the link is stopped
+            buffer += self.connection.read(max(self.connection.in_waiting, 1)) # Waits up to the read timeout for at least one byte
+            if readyLine in (line.strip() for line in buffer.split(b"\n")[:-1]): # Only complete lines are checked
+                return True
+        return False
+
+    # Stops the threads and closes the serial port
+    def stop(self):
+        with self.condition:
+            self.running = False        # Tells the threads to finish
+            self.condition.notify_all() # Wakes the writer thread
+        self.writerThread.join()
+        if self.readerThread:   # Only started once the port is open
+            self.readerThread.join()
+        if self.connection:     # Not set if the port could not be opened
+            self.connection.close()
+
+    # Queues a new x, y, z position target, replacing any target that has not been sent yet
+    def sendPosition(self, position):
+        line = "G0 " + " ".join(f"{axis}{value:.3f}" for axis, value in zip("XYZ", position)) + "\n" # Line-oriented position frame
+        with self.condition:
+            if self.pendingPosition is not None: # An older target is still waiting to be sent
+                self.collapsed += 1               # The older target is superseded
+            self.pendingPosition = (line, time.perf_counter())
+            self.condition.notify()               # Wakes the writer thread
+
+    # Queues any other command line, returns False if the queue is full
+    def sendCommand(self, command):
+        with self.condition:
+            if len(self.commands) >= self.maxQueue: # Backpressure, the GUI is never blocked waiting for room
+                self.rejected += 1
+                return False
+            self.commands.append((command.strip() + "\n", time.perf_counter()))
+            self.condition.notify() # Wakes the writer thread
+            return True
+
+    # Writer thread, opens the port then batches queued lines and writes them while the firmware has room for them
+    def writeLoop(self):
+        if not self.connect():
+            return
+        while True:
+            with self.condition:
+                # Waits until there is something to send and the firmware has room, or the link is stopped
+                while self.running:
+                    self.resendLost()
+                    if self.hasQueued() and len(self.inFlight) < self.maxInFlight:
+                        break
+                    self.condition.wait(self.ackTimeout / 4 if self.inFlight else None) # Wakes to check for lost lines while any are in flight
+                if not self.running:
+                    return
+
+                # Takes a batch of lines, commands are sent before the position target so they stay in order
+                batch = [] # Lines to be written together
+                while self.hasQueued() and len(self.inFlight) < self.maxInFlight and len(batch) < self.batchSize:
+                    isPosition = not self.commands
+                    if self.commands:
+                        line, queued = self.commands.popleft()
+                    else:
+                        line, queued = self.pendingPosition
+                        self.pendingPosition = None
+                    self.lineNumber += 1
+                    if isPosition:
+                        self.newestPosition = self.lineNumber
+                    batch.append(f"N{self.lineNumber} {line}")
+                    self.inFlight.append((self.lineNumber, line, queued, time.perf_counter(), isPosition)) # Tracked until the firmware acknowledges it
+                self.sent += len(batch)
+
+            try:
+                self.connection.write("".join(batch).encode()) # Written outside the lock so the GUI is never held up by the port
+            except serial.SerialTimeoutException: # The lines count as lost once their acknowledgements time out
+                pass
+
+    # Counts the lines in flight longer than ackTimeout as lost, only call while holding self.condition
+    def resendLost(self):
+        while self.inFlight and time.perf_counter() - self.inFlight[0][3] >= self.ackTimeout:
+            self.forgetLine(self.inFlight.popleft())
+
+    # Counts a line that was never acknowledged as lost, only call while holding self.condition
+    # A position target is an absolute move so it is sent again if it is still the newest, a command is only counted as unconfirmed
+    def forgetLine(self, inFlight):
+        lineNumber, line, queued, sent, isPosition = inFlight
+        self.lost += 1
+        if not isPosition:
+            self.unconfirmed += 1
+        elif lineNumber == self.newestPosition and self.pendingPosition is None:
+            self.pendingPosition = (line, queued)
+
+    # Reader thread, matches each "ok N<line number>" acknowledgement from the firmware to its line, a plain "ok" is matched to the oldest line in flight
+    def readLoop(self):
+        buffer = b"" # Partial line received so far, a read can return in the middle of a line
+        while self.running:
+            buffer += self.connection.read(max(self.connection.in_waiting, 1)) # Returns what has arrived after the timeout
+            *replies, buffer = buffer.split(b"\n")
+            for reply in replies:          # Loops for each complete line
+                words = reply.split()
+                if not words or words[0] != b"ok": # Ignores any other firmware output
+                    continue
+                lineNumber = int(words[1][1:]) if len(words) > 1 and words[1][:1] == b"N" and words[1][1:].isdigit() else None
+                with self.condition:
+                    if lineNumber is not None:
+                        while self.inFlight and self.inFlight[0][0] < lineNumber: # Earlier lines were sent first, so their acknowledgements were lost
+                            self.forgetLine(self.inFlight.popleft())
+                    if self.inFlight and (lineNumber is None or self.inFlight[0][0] == lineNumber): # Ignores acknowledgements of lines already counted as lost
+                        latency = time.perf_counter() - self.inFlight.popleft()[2] # Queue to acknowledgement time
+                        self.acknowledged += 1
+                        self.lastLatency = latency
+                        self.maxLatency = max(self.maxLatency, latency)
+                        self.totalLatency += latency
+                    self.condition.notify() # Wakes the writer thread as there is room for another line
+
+    # Checks if there are lines waiting to be sent, only call while holding self.condition
+    def hasQueued(self):
+        return bool(self.commands) or self.pendingPosition is not None
+
+    # Returns the link statistics
+    def getStatistics(self):
+        with self.condition:
+            return {"queueDepth": len(self.commands) + (self.pendingPosition is not None), # Lines waiting to be sent
+                    "inFlight": len(self.inFlight),         # Lines waiting for an acknowledgement
+                    "sent": self.sent, "acknowledged": self.acknowledged,
+                    "collapsed": self.collapsed, "rejected": self.rejected, "lost": self.lost, "unconfirmed": self.unconfirmed,
+                    "connected": self.connected, "ready": self.ready, "error": self.error,
+                    "lastLatency": self.lastLatency, "maxLatency": self.maxLatency,
+                    "averageLatency": self.totalLatency / self.acknowledged if self.acknowledged else 0.0}
+
+# Local stand-in for Firmware.ino on a pseudo terminal, prints the ready line and acknowledges each line with "ok" and its line number (unix only)
+class FirmwareEmulator:
+    # Initalises the firmware emulator object
+    def __init__(self, lineDelay=0.0, dropEvery=0, bootDelay=0.2):
+        import pty, tty                              # Pseudo terminals are only available on unix platforms
+        self.lineDelay = lineDelay                   # Simulated time in seconds the firmware takes to handle a line
+        self.dropEvery = dropEvery                   # Every dropEvery-th acknowledgement is not sent, to test lost lines, 0 sends them all
+        self.bootDelay = bootDelay                   # Seconds before the ready line is printed, the link clears its input when it opens the port
+        self.master, self.slave = pty.openpty()      # Pseudo terminal pair, the link opens the slave side
+        tty.setraw(self.slave)                       # Raw mode so nothing is echoed or translated, like a real serial port
+        self.port = os.ttyname(self.slave)           # Port name to give to ControllerLink
+        self.received = []                           # Every line the emulator has received, without its line number
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    # Emulator thread, reads lines and acknowledges them
+    def run(self):
+        time.sleep(self.bootDelay)            # Simulates the board booting after the port is opened
+        os.write(self.master, readyLine + b"\n") # Tells the link the firmware is ready
+        buffer = b"" # Partial line received so far
+        while self.running:
+            try:
+                data = os.read(self.master, 1024) # Blocks until the link writes something
+            except OSError:                       # The pseudo terminal has been closed
+                return
+            buffer += data
+            while b"\n" in buffer:                # Loops for each complete line
+                line, buffer = buffer.split(b"\n", 1)
+                number, _, text = line.decode().partition(" ")
+                numbered = number[:1] == "N" and number[1:].isdigit() # Checks if the line starts with its line number
+                self.received.append((text if numbered else line.decode()).strip())
+                time.sleep(self.lineDelay)        # Simulates the firmware handling the line
+                if not self.dropEvery or len(self.received) % self.dropEvery: # Checks if this acknowledgement should be lost
+                    os.write(self.master, f"ok {number}\n".encode() if numbered else b"ok\n") # Acknowledges the line
+
+    # Stops the emulator and closes the pseudo terminal
+    def stop(self):
+        self.running = False
+        os.close(self.master)
+        os.close(self.slave)
+
+# Sends a burst of position targets to a firmware emulator and prints the link statistics
+def main():
+    emulator = FirmwareEmulator(lineDelay=0.002, dropEvery=100) # 2 ms per line, roughly a busy controller, with the odd acknowledgement lost
+    link = ControllerLink(emulator.port)
+    link.start()
+    for i in range(1000):                 # Much faster than the controller can keep up with
+        link.sendPosition([i % 255, i % 212, i % 210])
+        time.sleep(0.0005)
+    link.sendCommand("G28")               # Commands are never collapsed
+    time.sleep(1.0)                       # Lets the link drain and time out the lines whose acknowledgement was lost
+    print(link.getStatistics())
+    print(f"Last line received: {emulator.received[-1]}")
+    link.stop()
+    emulator.stop()
+
+# Checks if script is the main program being run
+if __name__ == '__main__':
+    main() # Runs the main function
@@ -71,17 +71,48 @@ void setup() {
     digitalWrite(Z_ENABLE_PIN, LOW);
     digitalWrite(E_ENABLE_PIN, LOW);
     digitalWrite(Q_ENABLE_PIN, LOW);
+
+    // tell the visualiser the board has booted, opening the port resets the board and lines sent before this are lost:
+    Serial.println("start");
 }
 
+unsigned long lineNumber = 0;  // number the visualiser puts at the start of the line as N<number>
+bool numbered = false;         // set if the line started with a line number
+bool readingNumber = false;    // set while the digits of the line number are being read
+bool lineStart = true;         // set until the first byte of the line has been read
+
 void loop() {
-    // send data only when you receive data:
-    if (Serial.available() > 0) {
-        // read the incoming byte:
+    // read the incoming line from the visualiser one byte at a time, only the line number is kept:
+    while (Serial.available() > 0) {
         char incomingByte = Serial.read();
 
-        // say what you got:
-        Serial.print("I received: ");
-        Serial.println(incomingByte);
+        if (incomingByte == '\n') {
+            // acknowledge every complete line with its number so the visualiser can match the reply to the line:
+            if (numbered) {
+                Serial.print("ok N");
+                Serial.println(lineNumber);
+            }
+            else {
+                Serial.println("ok");
+            }
+            lineNumber = 0;
+            numbered = false;
+            readingNumber = false;
+            lineStart = true;
+        }
+        else {
+            if (lineStart && incomingByte == 'N') {
+                numbered = true;
+                readingNumber = true;
+            }
+            else if (readingNumber && isDigit(incomingByte)) {
+                lineNumber = lineNumber * 10 + (incomingByte - '0');
+            }
+            else {
+                readingNumber = false;
+            }
+            lineStart = false;
+        }
     }
 
 /*    if (millis() % 1000 < 500)
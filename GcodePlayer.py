@@ -0,0 +1,276 @@
+# Importing all required libraries
+import os
+import multiprocessing
+from itertools import islice
+import numpy as np
+
+travelFeed = 3000.0 # Feed rate in mm/min used before the G-code sets one
+
+# Layer index record, the byte offset a layer starts at and the machine state needed to start parsing from there
+layerRecord = np.dtype([("offset", np.int64), ("z", np.float64), ("state", np.float64, 11)])
+
+# Parser state of a G-code file, positions are machine positions (logical position plus the G92 offset)
+class GcodeState:
+    # Initalises the G-code state object
+    def __init__(self):
+        self.position = [0.0, 0.0, 0.0] # Machine x, y, z position
+        self.e = 0.0                    # Machine extruder position
+        self.feed = travelFeed          # Current feed rate in mm/min
+        self.absolute = True            # G90 absolute or G91 relative x, y, z
+        self.absoluteE = True           # M82 absolute or M83 relative extruder
+        self.offsets = [0.0, 0.0, 0.0, 0.0] # G92 offsets for x, y, z, e
+
+    # Packs the state into a flat array for the layer index
+    def toArray(self):
+        return np.array(self.position + [self.e, self.feed, self.absolute, self.absoluteE] + self.offsets)
+
+    # Makes a state from an array made by toArray
+    @staticmethod
+    def fromArray(array):
+        state = GcodeState()
+        state.position = [float(value) for value in array[0:3]]
+        state.e, state.feed = float(array[3]), float(array[4])
+        state.absolute, state.absoluteE = bool(array[5]), bool(array[6])
+        state.offsets = [float(value) for value in array[7:11]]
+        return state
+
+# Splits the parameters of a G-code line into a dictionary of letter to value, skipping any without a number
+def parseParameters(words):
+    parameters = {} # Initialises the parameters dictionary
+    for word in words:
+        try:
+            parameters[word[:1].upper()] = float(word[1:])
+        except ValueError: # Parameters such as the W in "G28 W" have no value
+            parameters[word[:1].upper()] = None
+    return parameters
+
+# Streams the moves of a G-code file from offset, yielding (line offset, x, y, z, extruder change, feed) after each move
+def readMoves(file, state, offset=0):
+    file.seek(offset)   # Moves to the start of the first line to read
+    for line in file:   # Reads one line at a time so the whole file is never in memory
+        lineOffset = offset     # Byte offset of this line
+        offset += len(line)     # Byte offset of the next line
+        words = line.split(b";", 1)[0].split() # Removes comments and splits the line into words
+        if not words:
+            continue
+        command = words[0].upper() # G-code command, e.g. G1
+
+        # Linear moves
+        if command in (b"G0", b"G1", b"G00", b"G01"):
+            parameters = parseParameters(words[1:])
+            for i, axis in enumerate([b"X", b"Y", b"Z"]): # Axis positions
+                if parameters.get(axis) is not None:
+                    value = parameters[axis]
+                    state.position[i] = value + state.offsets[i] if state.absolute else state.position[i] + value
+            startE = state.e                              # Extruder position before the move
+            if parameters.get(b"E") is not None:          # Extruder position
+                value = parameters[b"E"]
+                state.e = value + state.offsets[3] if state.absoluteE else state.e + value
+            if parameters.get(b"F") is not None:          # Feed rate, kept until changed
+                state.feed = parameters[b"F"]
+            yield (lineOffset, *state.position, state.e - startE, state.feed)
+
+        # Home the given axes, or all of them
+        elif command == b"G28":
+            parameters = parseParameters(words[1:])
+            axes = [i for i, axis in enumerate([b"X", b"Y", b"Z"]) if axis in parameters] or [0, 1, 2]
+            for i in axes:                # Loops for each homed axis
+                state.position[i] = 0.0   # Homed axes move to machine zero
+                state.offsets[i] = 0.0    # Homing clears the G92 offset
+            yield (lineOffset, *state.position, 0.0, travelFeed)
+
+        # Set the logical position without moving
+        elif command == b"G92":
+            parameters = {axis: value for axis, value in parseParameters(words[1:]).items() if value is not None}
+            parameters = parameters or {b"X": 0.0, b"Y": 0.0, b"Z": 0.0, b"E": 0.0} # No parameters sets every axis to zero
+            for i, axis in enumerate([b"X", b"Y", b"Z"]):
+                if axis in parameters:
+                    state.offsets[i] = state.position[i] - parameters[axis] # Offset so the current machine position reads as the given value
+            if b"E" in parameters:
+                state.offsets[3] = state.e - parameters[b"E"]
+
+        # Positioning modes
+        elif command == b"G90":
+            state.absolute, state.absoluteE = True, True   # G90 also sets the extruder to absolute
+        elif command == b"G91":
+            state.absolute, state.absoluteE = False, False # G91 also sets the extruder to relative
+        elif command == b"M82":
+            state.absoluteE = True
+        elif command == b"M83":
+            state.absoluteE = False
+
+# Scans the whole file once and returns the layer index, a layer starts on the Z move before the first extrusion at a new height
+def buildLayerIndex(fileName):
+    layers = []             # Initialises the layer list
+    state = GcodeState()    # Parser state for the scan
+    previous = list(state.position) # Position before the current move
+    candidate = None        # Z move that may start a new layer
+    layerZ = None           # Height of the last layer found
+    with open(fileName, "rb") as file:
+        for offset, x, y, z, extruded, feed in readMoves(file, state):
+            if z != previous[2]:                         # The move changes height
+                snapshot = state.toArray()               # State before the move, which only changed the position and extruder
+                snapshot[0:3] = previous
+                snapshot[3] -= extruded
+                candidate = (offset, z, snapshot)        # Only becomes a layer once something is printed at this height
+            if extruded > 0 and candidate is not None and candidate[1] != layerZ: # First extrusion at a new height
+                layers.append(candidate)
+                layerZ = candidate[1]
+                candidate = None
+            previous = [x, y, z]
+    return np.array(layers, dtype=layerRecord)
+
+# Loads the layer index saved next to the G-code file, or builds and saves it if the file has changed since
+def loadLayerIndex(fileName):
+    indexFile = fileName + ".layers.npy" # Layer index is stored alongside the G-code file
+    if os.path.exists(indexFile) and os.path.getmtime(indexFile) >= os.path.getmtime(fileName):
+        return np.load(indexFile)
+    layers = buildLayerIndex(fileName)
+    try:
+        with open(indexFile + ".tmp", "wb") as file: # Written under another name so a scan stopped part way never leaves a broken index
+            np.save(file, layers)
+        os.replace(indexFile + ".tmp", indexFile)
+    except OSError: # The G-code may be in a read only location, the index is just rebuilt next time
+        pass
+    return layers
+
+# Plays back a G-code file as x, y, z positions sampled at a fixed simulation timestep
+class GcodePlayer:
+    # Initalises the G-code player object
+    def __init__(self, fileName, timestep=0.01, batchSize=4096, buildIndex=True):
+        self.fileName = fileName   # G-code file being played
+        self.timestep = timestep   # Simulation timestep in seconds
+        self.batchSize = batchSize # Number of moves read from the file at a time
+        self.layers = None         # Layer index, set once the background scan finishes
+        self.indexPool = None      # Process building the layer index, None once it has finished or if there is no index
+        self.file = open(fileName, "rb")
+        self.startFrom(0, GcodeState()) # Starts at the beginning of the file
+
+        # Builds the layer index in a separate process so playback can start straight away without competing for the GIL
+        # Players that never seek, such as the farm printers', skip it rather than starting a process each
+        if buildIndex:
+            self.indexPool = multiprocessing.Pool(1)
+            self.indexResult = self.indexPool.apply_async(loadLayerIndex, (fileName,))
+
+    # Checks if the layer index has finished building, collecting it if so, always False for a player without an index
+    def layerIndexReady(self):
+        if self.indexPool and self.indexResult.ready(): # The scan has just finished
+            self.layers = self.indexResult.get()
+            self.indexPool.close()
+            self.indexPool = None
+        return self.layers is not None
+
+    # Restarts playback from a byte offset with the given parser state
+    def startFrom(self, offset, state):
+        self.moves = readMoves(self.file, state, offset) # Move generator
+        self.finished = False                            # Set once the last move has been played
+        self.time = 0.0        # Simulation time in seconds
+        self.pending = 0.0     # Simulation time not yet covered by a whole timestep
+
+        # Segment buffer, each segment runs from its start to end position between its start and end times
+        self.starts = np.array([state.position], dtype=np.float64) # Start positions
+        self.ends = np.array([state.position], dtype=np.float64)   # End positions
+        self.startTimes = np.zeros(1)                              # Simulation start times
+        self.endTimes = np.zeros(1)                                # Simulation end times
+        self.extruding = np.zeros(1, dtype=bool)                   # Whether each segment extrudes
+        self.feeds = np.zeros(1)                                   # Feed rate of each segment in mm/min
+        self.offsets = np.array([offset], dtype=np.int64)          # Byte offset of the line each segment came from
+        self.segment = 0                                           # Buffer index of the segment being played
+        self.position = self.ends[-1].copy()                       # Current simulated position
+        self.completedExtrusions = (np.zeros((0, 3)), np.zeros((0, 3)), np.zeros(0)) # Starts, ends and feeds of the extruding segments finished by the last advance
+
+    # Reads the next batch of moves into the segment buffer, keeping only segments that have not finished yet
+    def loadSegments(self):
+        batch = np.array(list(islice(self.moves, self.batchSize)), dtype=np.float64).reshape(-1, 6) # Next moves from the file
+        if len(batch) == 0:         # The end of the file has been reached
+            return False
+
+        ends = batch[:, 1:4]                                  # End position of each move
+        starts = np.vstack([self.ends[-1:], ends[:-1]])       # Each move starts where the previous one ended
+        feeds = batch[:, 5]
+        lengths = np.maximum(np.linalg.norm(ends - starts, axis=1), np.abs(batch[:, 4])) # Extruder only moves still take time
+        endTimes = self.endTimes[-1] + np.cumsum(lengths / (np.maximum(feeds, 1.0) / 60.0)) # Feed rates are in mm/min
+        startTimes = np.concatenate([self.endTimes[-1:], endTimes[:-1]]) # Each move starts when the previous one ends
+
+        keep = self.endTimes > self.time # Segments still being played
+        self.starts = np.vstack([self.starts[keep], starts])
+        self.ends = np.vstack([self.ends[keep], ends])
+        self.startTimes = np.concatenate([self.startTimes[keep], startTimes])
+        self.endTimes = np.concatenate([self.endTimes[keep], endTimes])
+        self.extruding = np.concatenate([self.extruding[keep], batch[:, 4] > 0])
+        self.feeds = np.concatenate([self.feeds[keep], feeds])
+        self.offsets = np.concatenate([self.offsets[keep], batch[:, 0].astype(np.int64)])
+        return True
+
+    # Advances playback by the given simulation time, returning every timestep position passed as an (n, 3) array
+    def advance(self, seconds):
+        self.pending += seconds                    # Adds the time to any left over from the last call
+        steps = int(self.pending / self.timestep)  # Whole timesteps to simulate
+        self.completedExtrusions = (np.zeros((0, 3)), np.zeros((0, 3)), np.zeros(0)) # Nothing finished yet
+        if steps == 0 or self.finished:
+            return np.zeros((0, 3))
+        self.pending -= steps * self.timestep
+        self.beforeAdvance = (self.time, self.position.copy(), self.pending) # State before these timesteps, restored by holdAt
+        times = self.time + self.timestep * np.arange(1, steps + 1) # Simulation time of each timestep
+
+        # Makes sure the buffer covers every timestep
+        while self.endTimes[-1] < times[-1]:
+            if not self.loadSegments():            # Out of moves
+                times = times[times <= self.endTimes[-1]]
+                self.finished = True
+                break
+        if len(times) == 0:
+            return np.zeros((0, 3))
+        endTime = np.inf if self.finished else times[-1] # The last segments of the file all finish once playback does
+        finished = self.extruding & (self.endTimes > self.time) & (self.endTimes <= endTime) # Extruding segments finished during these timesteps
+        self.completedExtrusions = (self.starts[finished], self.ends[finished], self.feeds[finished])
+        self.time = times[-1]
+
+        # Interpolates every timestep position at once
+        index = np.minimum(np.searchsorted(self.endTimes, times), len(self.endTimes) - 1) # Segment each timestep falls in
+        startTimes = self.startTimes[index]                                              # Start time of those segments
+        durations = self.endTimes[index] - startTimes
+        fraction = np.divide(times - startTimes, durations, out=np.ones_like(times), where=durations > 0)[:, None]
+        positions = self.starts[index] + (self.ends[index] - self.starts[index]) * fraction
+        self.segment = int(index[-1])
+        self.position = positions[-1]
+        self.lastTimes = times                     # Kept so holdAt can rewind to any of these timesteps
+        return positions
+
+    # Rewinds the last advance so only its timesteps before index were played, playback then resumes at the timestep at index
+    def holdAt(self, index):
+        previousTime, previousPosition, pending = self.beforeAdvance
+        self.finished = False                      # The moves after the held timestep are still to be played
+        self.pending = pending                     # Time past the last timestep is kept, the held timesteps are played again
+        self.time = float(self.lastTimes[index - 1]) if index > 0 else previousTime # Last timestep that was played
+        self.segment = min(int(np.searchsorted(self.endTimes, self.time)), len(self.endTimes) - 1)
+        self.position = self.positionAt(self.time, self.segment) if index > 0 else previousPosition
+        finished = self.extruding & (self.endTimes > previousTime) & (self.endTimes <= self.time) # Only extrusion finished before the held timestep
+        self.completedExtrusions = (self.starts[finished], self.ends[finished], self.feeds[finished])
+
+    # Returns the position at a simulation time within the given segment
+    def positionAt(self, time, segment):
+        duration = self.endTimes[segment] - self.startTimes[segment]
+        fraction = (time - self.startTimes[segment]) / duration if duration > 0 else 1.0
+        return self.starts[segment] + (self.ends[segment] - self.starts[segment]) * fraction
+
+    # Returns the layer being played, or None if the layer index is not ready
+    def currentLayer(self):
+        if not self.layerIndexReady():
+            return None
+        return max(int(np.searchsorted(self.layers["offset"], self.offsets[self.segment], side="right")) - 1, 0)
+
+    # Jumps to the start of the given layer, returns False if the layer index is not ready or the layer does not exist
+    def seekLayer(self, layer):
+        if not self.layerIndexReady() or not 0 <= layer < len(self.layers):
+            return False
+        record = self.layers[layer]
+        self.startFrom(int(record["offset"]), GcodeState.fromArray(record["state"])) # Parsing restarts at the layer without reading anything before it
+        return True
+
+    # Closes the G-code file and stops the layer index scan if it is still running
+    def close(self):
+        if self.indexPool:          # Ends the scan process rather than leaving it to finish
+            self.indexPool.terminate()
+            self.indexPool = None
+        self.file.close()
@@ -0,0 +1,152 @@
+# Importing all required libraries
+import numpy as np
+from vtkmodules.vtkRenderingCore import vtkHardwareSelector
+from vtkmodules.vtkCommonDataModel import vtkDataObject, vtkSelectionNode
+from vtkmodules.util import numpy_support # Conversion between NumPy and vtk arrays
+import SceneCompaction
+
+# Returns the bounds of every item in the scene cache arrays as an (n, 6) array ordered like vtk's GetBounds, empty items get inverted bounds
+def itemBounds(arrays):
+    points, records = arrays[0], arrays[4]
+    bounds = np.empty((len(records), 6))
+    bounds[:, 0::2], bounds[:, 1::2] = np.inf, -np.inf # Inverted bounds are never hit or contained
+    used = np.nonzero(records["pointEnd"] > records["pointStart"])[0] # Items with points
+    if len(used):
+        starts = records["pointStart"][used]            # Each item's points are one run of the points array
+        bounds[used, 0::2] = np.minimum.reduceat(points, starts)
+        bounds[used, 1::2] = np.maximum.reduceat(points, starts)
+    return bounds
+
+# Returns the item numbers as the space separated ranges used by XItems, YItems and ZItems, e.g. "62-76 385-420"
+def formatItemRanges(items):
+    items = np.unique(np.asarray(list(items), dtype=np.int64)) # Sorted item numbers
+    breaks = np.nonzero(np.diff(items) != 1)[0] + 1        # Starts of each run of consecutive items
+    return " ".join(f"{run[0]}-{run[-1]}" for run in np.split(items, breaks) if len(run))
+
+# Bounding box hierarchy over the printer items, used to find the items a ray or box can touch without testing every item
+class BoundsTree:
+    # Initalises the tree, bounds is an (n, 6) array of item bounds as given by itemBounds
+    def __init__(self, bounds, leafSize=4):
+        self.lower = bounds[:, 0::2]  # Minimum corner of each item
+        self.upper = bounds[:, 1::2]  # Maximum corner of each item
+        self.leafSize = leafSize      # Most items held by a leaf node
+        self.nodeLower, self.nodeUpper, self.nodeChildren, self.nodeItems = [], [], [], [] # Per node boxes, children and leaf items
+        valid = np.nonzero(np.all(self.lower <= self.upper, axis=1))[0] # Empty items are left out of the tree
+        if len(valid):
+            self.buildNode(valid)
+        self.nodeLower, self.nodeUpper = np.array(self.nodeLower).reshape(-1, 3), np.array(self.nodeUpper).reshape(-1, 3)
+
+    # Adds a node holding items, splitting it at the median centre along its longest axis, and returns the node index
+    def buildNode(self, items):
+        index = len(self.nodeChildren)
+        self.nodeLower.append(self.lower[items].min(axis=0)) # Node box covers every item in it
+        self.nodeUpper.append(self.upper[items].max(axis=0))
+        self.nodeChildren.append(None)
+        self.nodeItems.append(None)
+        if len(items) <= self.leafSize:  # Small enough to test the items directly
+            self.nodeItems[index] = items
+            return index
+        centres = (self.lower[items] + self.upper[items]) / 2
+        axis = np.argmax(centres.max(axis=0) - centres.min(axis=0)) # Longest spread of item centres
+        order = np.argsort(centres[:, axis], kind="stable")
+        half = len(items) // 2
+        self.nodeChildren[index] = (self.buildNode(items[order[:half]]), self.buildNode(items[order[half:]]))
+        return index
+
+    # Returns the items whose boxes the ray from origin along direction passes through
+    def rayItems(self, origin, direction):
+        origin = np.asarray(origin, dtype=float)
+        direction = np.where(np.abs(direction) < 1e-12, 1e-12, direction) # Axis parallel rays would divide by zero
+        inverse = 1 / direction
+
+        # Slab test, the ray hits a box if it is inside all three slabs at once in front of the origin
+        def hits(lower, upper):
+            near, far = (lower - origin) * inverse, (upper - origin) * inverse
+            return np.maximum(np.minimum(near, far).max(axis=-1), 0) <= np.maximum(near, far).min(axis=-1)
+        return self.query(hits)
+
+    # Returns the items whose boxes lie inside the box from lower to upper
+    def containedItems(self, lower, upper):
+        lower, upper = np.asarray(lower), np.asarray(upper)
+        overlaps = lambda nodeLower, nodeUpper: np.all((nodeLower <= upper) & (nodeUpper >= lower), axis=-1) # Nodes that could hold a contained item
+        items = self.query(overlaps)
+        return items[np.all((self.lower[items] >= lower) & (self.upper[items] <= upper), axis=1)]
+
+    # Walks the tree through the nodes accepted by test and returns the leaf items it accepts
+    def query(self, test):
+        found = []                       # Item arrays from the accepted leaves
+        stack = [0] if len(self.nodeChildren) else []
+        while stack:                     # Loops until every accepted node has been visited
+            index = stack.pop()
+            if not test(self.nodeLower[index], self.nodeUpper[index]): # Skips the whole subtree
+                continue
+            if self.nodeChildren[index] is None: # Leaf, the items are tested one by one
+                items = self.nodeItems[index]
+                found.append(items[test(self.lower[items], self.upper[items])])
+            else:
+                stack.extend(self.nodeChildren[index])
+        return np.concatenate(found) if found else np.zeros(0, dtype=np.int64)
+
+# Picks printer items under the mouse with vtkHardwareSelector, only the actors whose items the ray can touch are drawn for the pick
+class ItemPicker:
+    # Initalises the picker for the items in actorList drawn by drawnActors, the items must be at their untranslated position
+    def __init__(self, renderer, actorList, drawnActors, arrays):
+        self.renderer = renderer
+        self.actorList = actorList
+        self.tree = BoundsTree(itemBounds(arrays)) # Spatial index of the items
+        self.selector = vtkHardwareSelector()
+        self.selector.SetRenderer(renderer)
+        self.selector.SetFieldAssociation(vtkDataObject.FIELD_ASSOCIATION_CELLS) # Cell ids map back to items in merged actors
+
+        # Drawn actor of each item, merged items share their material's actor
+        self.itemActors = list(actorList)
+        for actor in drawnActors:        # Loops for each drawn actor
+            itemArray = actor.GetMapper().GetInput().GetCellData().GetArray("ItemIndex") # Only merged actors have this array
+            if itemArray is not None:
+                for item in np.unique(numpy_support.vtk_to_numpy(itemArray)):
+                    self.itemActors[item] = actor
+
+    # Returns the world space ray through display position x, y
+    def displayRay(self, x, y):
+        ends = []
+        for depth in (0, 1):             # Near and far clipping planes
+            self.renderer.SetDisplayPoint(x, y, depth)
+            self.renderer.DisplayToWorld()
+            point = self.renderer.GetWorldPoint()
+            ends.append(np.array(point[:3]) / point[3])
+        return ends[0], ends[1] - ends[0]
+
+    # Returns the item at display position x, y, or None if there is no item there
+    def pick(self, x, y):
+        candidates = {self.itemActors[item] for item in self.tree.rayItems(*self.displayRay(x, y))} # Actors the ray can touch
+        if not candidates:               # Nothing under the mouse
+            return None
+
+        # Only the candidate actors are drawn into the selection buffers, every other prop is made unpickable for the pick
+        props = self.renderer.GetViewProps()
+        props = [props.GetItemAsObject(i) for i in range(props.GetNumberOfItems())]
+        pickable = [prop.GetPickable() for prop in props] # Restored after the pick
+        for prop in props:
+            prop.SetPickable(prop in candidates)
+        self.selector.SetArea(x, y, x, y) # A single pixel
+        selection = self.selector.Select()
+        for prop, state in zip(props, pickable):
+            prop.SetPickable(state)
+
+        # Maps the picked cell back to its item
+        if not selection.GetNumberOfNodes(): # The ray only passed through empty space in the boxes
+            return None
+        node = selection.GetNode(0)
+        actor = node.GetProperties().Get(vtkSelectionNode.PROP())
+        if actor is None:
+            return None
+        return SceneCompaction.getItemIndex(actor, node.GetSelectionList().GetValue(0), self.actorList)
+
+    # Suggests the items lying inside the combined bounds of the given items, grown by tolerance, e.g. the parts fixed to the bed once the bed is picked
+    def suggestItems(self, items, tolerance=1.0):
+        items = np.asarray(list(items), dtype=np.int64)
+        if not len(items):
+            return set()
+        lower = self.tree.lower[items].min(axis=0) - tolerance
+        upper = self.tree.upper[items].max(axis=0) + tolerance
+        return set(self.tree.containedItems(lower, upper).tolist()) - set(items.tolist())
@@ -0,0 +1,47 @@
+# Importing all required libraries
+import os
+from vtkmodules.vtkFiltersCore import vtkTriangleFilter, vtkQuadricDecimation, vtkPolyDataNormals
+import SceneCache
+
+# Fraction of each item's triangles kept at each detail level, finest first
+lodRatios = (0.5, 0.2, 0.05)
+minTriangles = 64 # Items are never reduced below this many triangles, fewer loses their shape
+
+# Returns the directory of a detail level's scene cache, stored inside the full detail cache so it is removed along with it
+def levelDirectory(cacheDir, ratio):
+    return os.path.join(cacheDir, f"lod{round(ratio * 100)}")
+
+# Reduces polyData to about keep of its triangles with quadric decimation, recomputing the normals if it had them
+def decimate(polyData, keep, hasNormals):
+    triangles = vtkTriangleFilter()        # Quadric decimation only works on triangles
+    triangles.SetInputData(polyData)
+    decimation = vtkQuadricDecimation()
+    decimation.SetInputConnection(triangles.GetOutputPort())
+    decimation.SetTargetReduction(1 - keep) # Fraction of triangles to remove
+    decimation.VolumePreservationOn()      # Stops thin parts shrinking away
+    output = decimation
+    if hasNormals:                         # Moved points no longer match the stored normals
+        output = vtkPolyDataNormals()
+        output.SetInputConnection(decimation.GetOutputPort())
+        output.ConsistencyOff()            # The model's winding is kept as it is
+    output.Update()
+    return output.GetOutput()
+
+# Builds the scene cache of each detail level that is not stored yet and returns the level directories, coarsest last
+# Every level keeps the item order of the full detail cache, so item numbers and static item merging work on them unchanged
+def buildLevels(cacheDir):
+    levelDirs = [levelDirectory(cacheDir, ratio) for ratio in lodRatios]
+    missing = [(ratio, levelDir) for ratio, levelDir in zip(lodRatios, levelDirs) if not SceneCache.isCached(levelDir)]
+    if missing:                            # Only built once, later launches load the stored levels
+        actors = SceneCache.loadScene(cacheDir) # Full detail actors
+        records = SceneCache.loadArrays(cacheDir)[4]
+        for ratio, levelDir in missing:    # Loops for each level still to be built
+            levelActors = []               # Decimated actors in the original order
+            for actor, record in zip(actors, records): # Loops for each item
+                polyData = actor.GetMapper().GetInput()
+                keep = max(ratio, minTriangles / max(polyData.GetNumberOfCells(), 1)) # Small items keep more of their triangles
+                if keep < 1:                   # Items already at the minimum are kept whole
+                    polyData = decimate(polyData, keep, record["hasNormals"])
+                levelActors.append(SceneCache.makeActor(polyData, record)) # Same material and visibility as the full item
+            SceneCache.saveScene(levelDir, levelActors)
+    return levelDirs
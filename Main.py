@@ -1,18 +1,45 @@
 # Importing all required libraries
+import time
+launchTime = time.perf_counter() # Start of the program, used to time startup
 import os
 import sys
-from configobj import ConfigObj
-import time
 import threading
+import traceback
+from configobj import ConfigObj
 from functools import partial
-import vtk # Visualisation toolkit
+from vtkmodules.vtkCommonTransforms import vtkTransform # Only the vtk modules used are imported, the vtk package imports every module
+from vtkmodules.vtkRenderingCore import vtkRenderer, vtkActor, vtkPolyDataMapper, vtkTextActor
+from vtkmodules.vtkIOImport import vtkOBJImporter
+from vtkmodules.vtkInteractionStyle import vtkInteractorStyleTrackballCamera
+import vtkmodules.vtkRenderingOpenGL2 # OpenGL rendering backend for the render window, renderer, actors and mappers
+import vtkmodules.vtkRenderingFreeType # Font rendering for the profiler overlay's text actor
+import ObjectRebuild # Process pool .obj rebuild engine
+import SceneCache    # Binary cache of the imported printer model
+import SceneCompaction # Per material merging of static printer items
+import LevelOfDetail  # Decimated printer model detail levels drawn while interacting
+import ItemPicker     # Spatial index and hardware picking for the printer model setup
+import PrinterFarm    # Extra printers sharing the printer model geometry
+import ControllerLink # Serial link to the hardware controller
+import GcodePlayer    # Streaming G-code playback
+import Toolpath       # Printed extrusion layer
+import StlLoader      # Binary STL loading for bed models
+import Profiler       # Hot path timings for debug mode
+import MotionRecorder # Binary log and replay of printer position updates
+import CollisionChecker # Travel limit and bed model collision checks before positions are sent
+import numpy as np
 from PyQt5.QtWidgets import QApplication, QMainWindow, QFrame, QVBoxLayout
-from vtk.qt.QVTKRenderWindowInteractor import QVTKRenderWindowInteractor
+from vtkmodules.qt.QVTKRenderWindowInteractor import QVTKRenderWindowInteractor
 from PyQt5.QtWidgets import QApplication, QMainWindow, QDockWidget, QVBoxLayout, QPushButton, QWidget, QSlider, QLabel
-from PyQt5.QtCore import Qt, pyqtSignal  # This is to use Qt.LeftDockWidgetArea
+from PyQt5.QtWidgets import QComboBox, QSpinBox, QFileDialog, QCheckBox, QHBoxLayout, QInputDialog
+from PyQt5.QtCore import Qt, pyqtSignal, QTimer  # This is to use Qt.LeftDockWidgetArea
 
 # Definition of the main window class
 class MainWindow(QMainWindow):
+    printerModelReady = pyqtSignal(list, list, list) # Emitted by the model thread with the printer model actors, the actors to draw and the actors of each axis
+    detailLevelsReady = pyqtSignal(list)       # Emitted by the model thread with the actors of each decimated detail level
+    movingBoxesReady = pyqtSignal(object)      # Emitted by the model thread with the leaf boxes of the X items for the collision checker
+    printerModelFailed = pyqtSignal(str)       # Emitted by the model thread with the error if loading stopped part way
+
     # Initalises the main window object
     def __init__(self):
         super().__init__()
@@ -22,10 +49,37 @@ class MainWindow(QMainWindow):
         resolution = config["SETUP"]["WindowResolution"].split("x")      # Get initial resolution from config file
         self.setGeometry(20, 20, int(resolution[0]), int(resolution[1])) # Set initial window position & size
 
+        # Profiler, the hot path methods are only wrapped in debug mode so there is no cost otherwise
+        self.profiler = None
+        if debug:                   # Only timed in debug mode
+            self.profiler = Profiler.Profiler() # Ring buffer of stage timings
+            self.profiler.instrument(self, ["updateLabel", "convert", "updatePrinterPosition", "sendToController", # Position update path
+                                            "importPrinterModel", "RebuildPrinterModel", "loadSceneActors"])     # Model import stages, run on the model thread
+            self.renderStage = self.profiler.stageNumber("Render") # Frames are timed by the render window's start and end events
+
         # vtk and menu setup
-        self.setupVtkWindow() # Runs setup function for the renderer
-        self.addMenuBar()     # Runs setup function for the menu bar
-        self.addDockToolbar() # Runs setup function for the toolbar dock
+        self.setupVtkWindow()       # Runs setup function for the renderer
+        self.setupControllerLink()  # Connects to the hardware controller
+        self.setupMotionRecorder()  # Starts the motion log before the dock sets the first position
+        self.addMenuBar()           # Runs setup function for the menu bar
+        self.addDockToolbar()       # Runs setup function for the toolbar dock
+        if self.profiler:           # Checks if the profiler is running
+            self.setupProfilerOverlay() # Shows the stage timings over the printer model
+
+    # Stops the hardware controller link when the window is closed
+    def closeEvent(self, event):
+        if self.controllerLink:            # Checks if the link is running
+            self.controllerLink.stop()     # Stops the link threads and closes the serial port
+        if self.firmwareEmulator:          # Checks if the firmware emulator is running
+            self.firmwareEmulator.stop()   # Closes the emulator's pseudo terminal
+        if self.gcodePlayer:               # Checks if a G-code file is loaded
+            self.gcodePlayer.close()       # Closes the G-code file
+        for instance in self.farm:         # Loops for each farm printer
+            if instance.player:            # Checks if the printer is playing a G-code file
+                instance.player.close()    # Closes the G-code file
+        if self.motionRecorder:            # Checks if position updates are being recorded
+            self.motionRecorder.stop()     # Writes the last records and closes the motion log
+        super().closeEvent(event)
 
     # Method to set up the VTK window
     def setupVtkWindow(self):
@@ -36,28 +90,34 @@ class MainWindow(QMainWindow):
         self.vtkWidget.setFocusPolicy(Qt.StrongFocus)
         self.vl.addWidget(self.vtkWidget) # Adds the VTK render window interactor to the layout self.vl
 
-        # Retrieves and prepares the printer model for importing and rendering
-        self.getFileNames() # Get the printer model file names from the provided directory
-        if (int(config["PRINTER_MODEL"]["rebuildPrinterModel"])): # Rebuilds the processed object file when set to import a new printer
-            self.RebuildPrinterModel() # Calls to rebuild the printer model
-
-        # Object setup
-        model = vtk.vtkOBJImporter()       # Source object to read .stl files
-        model.SetFileName("processed.obj") # Sets the file name of the obj to be converted and viewed
-        filePath = config["PRINTER_MODEL"]["3DPrinterModelDirectory"] + "\\" + self.mtlFile # Generates the relative file address
-        model.SetFileNameMTL(filePath)     # Sets the mtl file for the obj
-        model.Read()                       # Read and import the OBJ data
-
-        # Add the imported graphics to the renderer
-        model.SetRenderWindow(self.vtkWidget.GetRenderWindow()) # Setting the renderer for the 'model' object to be rendered in
-        model.Update() # Updates the model object and converts the stl to vtk format
+        # Starts loading the printer model in the background, the window is shown with an empty scene until it is ready
+        self.getFileNames()                 # Get the printer model file names from the provided directory
+        self.itemRanges = self.generateItemRanges() # Retrieves item ranges from the config and makes them into an array, needed by the model thread
+        self.renderer = vtkRenderer()       # The printer model actors are added to this renderer once loaded
+        self.printerModelReady.connect(self.attachPrinterModel) # Qt passes the actors across to the GUI thread
+        self.detailLevelsReady.connect(self.attachDetailLevels) # Decimated levels follow once they are built or loaded
+        self.interactionFPS = int(config["SETUP"]["interactionFPS"]) # Frame rate to hold while dragging, 0 always draws full detail
+        self.movingBoxesReady.connect(self.attachMovingBoxes)        # X item boxes follow the printer model
+        self.printerModelFailed.connect(self.showPrinterModelError)  # Errors on the model thread are shown in the status bar
+        self.collisionCheck = int(config["HARDWARE_CONTROLLER"]["collisionCheck"]) # Set to hold back moves outside the travel or into a bed model
+        self.itemsSetup = None              # Item picker of the printer model setup, None when the setup is not running
+        self.startModelThread()             # Loads the printer model in the background
 
         # Prepare rendering and interaction for printer model
-        self.renderer = model.GetRenderer()                                # Gets the renderer for the model for later use
         self.vtkWidget.GetRenderWindow().AddRenderer(self.renderer)        # Adds the self.renderer to the QVTKRenderWindowInteractor's VTK render window to be displayed in PyQt
         self.interactor = self.vtkWidget.GetRenderWindow().GetInteractor() # Gets the QVTKRenderWindowInteractor's interactor for later use
+        self.renderScheduler = RenderScheduler(self.vtkWidget.GetRenderWindow(), int(config["SETUP"]["maxFPS"])) # Coalesces render requests into at most one render per frame
+        self.interactor.EnableRenderOff()  # Stops the interactor rendering directly, it still fires a render event instead
+        self.interactor.AddObserver("RenderEvent", self.renderScheduler.requestRender) # Routes the interactor's renders (pan, rotate and repaints) through the scheduler
         self.customStyle = CustomInteractorStyle()           # Sets custom interactor variable
         self.interactor.SetInteractorStyle(self.customStyle) # Sets custom interactor style
+        self.firstFrameLogged = False # Set once the time to the first frame has been logged
+        self.startupObserver = self.vtkWidget.GetRenderWindow().AddObserver("EndEvent", self.logStartupFrame) # Times the startup frames
+        self.interacting = False      # Set while the view or a slider is being dragged
+        self.renderStart = 0.0        # Start time of the frame being rendered
+        self.fullDetailSeconds = 0.0  # Render time of the last full detail frame
+        self.vtkWidget.GetRenderWindow().AddObserver("StartEvent", self.renderStarted)  # Times each frame to choose the detail level
+        self.vtkWidget.GetRenderWindow().AddObserver("EndEvent", self.renderFinished)
 
         # Adjust camera and lighting
         self.camera = self.renderer.GetActiveCamera() # Get camera object
@@ -70,18 +130,23 @@ class MainWindow(QMainWindow):
         self.frame.setLayout(self.vl)     # Sets self.vl QVBoxLayout instance to be displayed inside self.frame, arranged vertically
         self.setCentralWidget(self.frame) # Sets self.frame as the central widget of the main window, making it the primary content area
 
-        # Extracting actors from the renderer
-        self.actors = self.renderer.GetActors()     # Gets a list of all the actors that are a part of the scene managed by this renderer
-        self.itemRanges = self.generateItemRanges() # Retrieves item ranges from the config and makes them into an array
-
-        # Preparing to generate actor list
-        self.actors.InitTraversal()                     # Sets up the collection of actors to be iterated through
-        self.actorCollection = vtk.vtkActorCollection() # Creates actor collection object
+        # Axis transforms, the printer model items are linked to them once the model has loaded
+        self.axisTransforms = [vtkTransform() for direction in range(3)] # One long lived transform for each of x, y, and z items
 
-        # Generating actor collection object for future reference
-        for item in range(self.actors.GetNumberOfItems()): # Cycles through the number of items (number of nets in the object file)
-            self.actor = self.actors.GetNextActor()        # Sets self.actor to the current actor in the list
-            self.actorCollection.AddItem(self.actor)       # Adds each actor in turn to the actor collection list
+        # Printed toolpath, drawn on the bed so it moves with the Y items
+        self.toolpath = Toolpath.ToolpathLayer(tubes=bool(int(config["PLAYBACK"]["toolpathTubes"]))) # One growing polydata for all printed extrusion
+        self.toolpath.actor.SetUserTransform(self.axisTransforms[1]) # Shares the bed's Y axis transform
+        self.renderer.AddActor(self.toolpath.actor)                   # Adds the toolpath to the scene
+        self.bedModels = []  # Actors of the parts loaded onto the bed
+        self.collisionChecker = None # X item against bed model checker, None until there are bed models to hit
+        self.movingBoxes = None      # Leaf boxes of the X items, built on the model thread after each printer model load
+        self.heldMoves = 0           # Number of positions held back from the controller
+        self.farm = []       # Printers drawn beside the main printer, sharing its geometry
+        self.farmSize = 1    # Number of printers in the view, including the main printer
+        self.farmTimer = QTimer(self) # Timer that advances the farm printers' G-code playback
+        self.farmTimer.setInterval(int(1000 / int(config["SETUP"]["maxFPS"]))) # One playback step per frame
+        self.farmTimer.timeout.connect(self.farmStep)
+        self.bedCursor = None # Real x, y position for the next part and the depth of the current row, None until a part is loaded
 
         # Setting initial printer position
         XPos = int(config["DEFAULT"]["XPosition"]) # Get initial X position
@@ -90,6 +155,178 @@ class MainWindow(QMainWindow):
         self.defaultPosition = [XPos, YPos, ZPos]        # Create position coordinate list
         self.updatePrinterPosition(self.defaultPosition) # Update printer position with coordinate list
 
+    # Starts loading the printer model on the model thread, the window is shown with an empty scene until it is ready
+    def startModelThread(self):
+        self.printerModelLoaded = False     # Set once the printer model is in the scene
+        self.modelThread = threading.Thread(target=self.loadPrinterModel, daemon=True) # Daemon thread never keeps the program open
+        self.modelThread.start()
+        self.statusBar().showMessage("Loading printer model...") # Shows the model is on its way
+
+    # Removes the printer model from the scene and loads it again, used when the X, Y and Z items change
+    def reloadPrinterModel(self):
+        for actor in self.detailLevels[self.detailLevel][1]: # Loops for each drawn printer model actor
+            self.renderer.RemoveActor(actor)
+        self.clearFarm()                    # Farm printers share the old actors' mappers, they are rebuilt once the model has loaded
+        self.startModelThread()
+
+    # Model thread, loads the printer model and hands its actors to the GUI thread, followed by its detail levels
+    def loadPrinterModel(self):
+        try:
+            cacheDir = self.importPrinterModel() # Scene cache of the printer model
+            self.cacheDir = cacheDir             # Kept for the printer model setup
+            self.printerModelReady.emit(*self.loadSceneActors(cacheDir)) # attachPrinterModel is run on the GUI thread with the actors
+            if self.collisionCheck:              # The X item boxes take a moment to build, so they are built here rather than on the GUI thread
+                arrays = SceneCache.loadArrays(cacheDir)
+                xItems = [item for item in sorted(self.getAxisItems()[0]) if arrays[4][item]["visible"]] # Visible X items
+                self.movingBoxesReady.emit(CollisionChecker.obbLeafBoxes(SceneCompaction.mergeItems(arrays, xItems).GetMapper().GetInput()))
+            if self.interactionFPS:              # Detail levels are only needed to hold a frame rate
+                levelDirs = LevelOfDetail.buildLevels(cacheDir) # Decimated once and stored with the scene cache
+                self.detailLevelsReady.emit([self.loadSceneActors(levelDir) for levelDir in levelDirs])
+        except Exception as error:               # Anything raised here would otherwise only reach stderr and leave the loading message up
+            traceback.print_exc()                # Full traceback for debugging
+            self.printerModelFailed.emit(f"{type(error).__name__}: {error}")
+
+    # Shows an error from the model thread in the status bar, runs on the GUI thread
+    def showPrinterModelError(self, message):
+        self.statusBar().showMessage(f"Loading the printer model failed: {message}") # Replaces the loading message and stays up until the next one
+
+    # Loads the scene cache in cacheDir, returning the actor of each item, the actors to draw and the actors of each axis, runs on the model thread
+    def loadSceneActors(self, cacheDir):
+        if int(config["PRINTER_MODEL"]["mergeStaticItems"]): # Checks if items should be merged
+            return SceneCompaction.loadMergedScene(cacheDir, self.getAxisItems()) # One actor per material for each axis and for everything that never moves
+        actors = SceneCache.loadScene(cacheDir) # One actor per net in the object file
+        return actors, actors, [[actors[i] for i in sorted(items)] for items in self.getAxisItems()] # Every actor is drawn
+
+    # Adds the loaded printer model actors to the scene, runs on the GUI thread
+    def attachPrinterModel(self, actors, drawnActors, axisActors):
+        for actor in drawnActors:         # Loops for each actor to draw
+            self.renderer.AddActor(actor) # Adds the actor to the renderer
+        self.actorList = actors           # Direct list of the actors (one per net in the object file) so items can be indexed without walking the collection, None for merged items
+        self.drawnActors = drawnActors    # Merged moving and static items, and any hidden items
+        self.axisActors = axisActors      # Actors on each of the X, Y and Z axes
+        self.detailLevels = [(actors, drawnActors, axisActors)] # Item, drawn and axis actors of each detail level, full detail first
+        self.detailLevel = 0              # Index of the detail level in the renderer
+        self.levelSwitched = False        # Set until the first frame at a new detail level has been drawn
+        if debug:                         # Only shown in debug mode
+            print(f"Printer model: {len(actors)} items drawn as {len(drawnActors)} actors")
+        self.setupAxisTransforms()        # Links the X, Y and Z item actors to their axis transforms
+        self.printerModelLoaded = True
+        self.movingBoxes = None           # The X items may have changed, their boxes follow from the model thread
+        self.collisionChecker = None
+        if self.farmSize > 1:             # Checks if a printer farm is shown
+            self.buildFarm()              # Adds the farm printers
+        if self.statusBar().currentMessage() == "Loading printer model...": # Keeps any message shown while the model loaded, e.g. the controller port failing
+            self.statusBar().clearMessage()   # Clears the loading message
+        self.renderScheduler.requestRender() # Shows the model on the next frame
+
+    # Sets the leaf boxes of the X items and checks them against any bed models already loaded, runs on the GUI thread
+    def attachMovingBoxes(self, boxes):
+        self.movingBoxes = boxes
+        self.collisionChecker = None      # Rebuilt with the new boxes
+        self.updateCollisionChecker()
+
+    # Adds the decimated detail levels of the printer model, they are only put in the renderer while interacting, runs on the GUI thread
+    def attachDetailLevels(self, levels):
+        for actors, drawnActors, axisActors in levels: # Loops for each detail level
+            self.linkAxisTransforms(axisActors) # The level's moving items follow the same axis transforms
+        for instance in self.farm:          # Loops for each farm printer
+            instance.addLevels(levels)      # Farm printers switch detail level with the main printer
+        self.detailLevels += levels
+
+    # Records the start time of each frame
+    def renderStarted(self, *args):
+        self.renderStart = time.perf_counter()
+
+    # Records the render time of full detail frames, and moves to a coarser detail level if an interactive frame was too slow
+    def renderFinished(self, *args):
+        seconds = time.perf_counter() - self.renderStart # Time taken to render the frame
+        if self.profiler:                   # Checks if the profiler is running
+            self.profiler.record(self.renderStage, self.renderStart, seconds) # Every frame is a Render sample, however it was asked for
+        if not self.printerModelLoaded:     # Nothing to choose between yet
+            return
+        if self.levelSwitched:              # The first frame at a level also uploads its geometry, so it is not a fair measure
+            self.levelSwitched = False
+        elif self.detailLevel == 0:
+            self.fullDetailSeconds = seconds
+        elif self.interacting and seconds * self.interactionFPS > 1 and self.detailLevel < len(self.detailLevels) - 1:
+            self.setDetailLevel(self.detailLevel + 1) # Still too slow, the next frame is drawn coarser
+
+    # Switches to the finest detail level expected to render at interactionFPS, called when a drag starts
+    def startInteraction(self):
+        self.interacting = True
+        if not self.printerModelLoaded or not self.interactionFPS: # Nothing to switch
+            return
+        level = 0           # Full detail is kept if it is quick enough
+        ratios = (1,) + LevelOfDetail.lodRatios[:len(self.detailLevels) - 1] # Triangles kept by each loaded level
+        while level < len(ratios) - 1 and self.fullDetailSeconds * ratios[level] * self.interactionFPS > 1: # Render time scales with the triangle count
+            level += 1      # Tries the next coarser level
+        self.setDetailLevel(level)
+
+    # Returns to full detail, called when a drag ends
+    def endInteraction(self):
+        self.interacting = False
+        if self.printerModelLoaded: # Checks if there is a printer model to switch
+            self.setDetailLevel(0)
+
+    # Swaps the printer model actors in the renderer for those of the given detail level
+    def setDetailLevel(self, level):
+        if level == self.detailLevel:       # Already drawn at this level
+            return
+        for actor in self.detailLevels[self.detailLevel][1]: # Loops for each drawn actor of the current level
+            self.renderer.RemoveActor(actor)
+        for actor in self.detailLevels[level][1]:            # Loops for each drawn actor of the new level
+            self.renderer.AddActor(actor)
+        for instance in self.farm:                           # Loops for each farm printer
+            for actor in instance.levels[self.detailLevel]:
+                self.renderer.RemoveActor(actor)
+            for actor in instance.levels[level]:
+                self.renderer.AddActor(actor)
+        self.detailLevel = level
+        self.levelSwitched = True
+        self.renderScheduler.requestRender() # Shows the new level on the next frame
+
+    # Logs the time to the first frame, and the time to interactive once the printer model has been drawn
+    def logStartupFrame(self, *args):
+        elapsed = time.perf_counter() - launchTime # Time since the program started
+        if not self.firstFrameLogged:              # Checks if this is the first frame
+            self.firstFrameLogged = True
+            print(f"Time to first frame: {elapsed:.2f} s", flush=True)
+        if self.printerModelLoaded:                # Checks if this frame is the first with the printer model
+            print(f"Time to interactive: {elapsed:.2f} s", flush=True)
+            self.vtkWidget.GetRenderWindow().RemoveObserver(self.startupObserver) # Only the startup frames are timed
+
+    # Makes sure the printer model is in the scene cache, importing it when the model files have changed, and returns the cache directory, runs on the model thread
+    def importPrinterModel(self):
+        # Scene cache lookup
+        modelDirectory = config["PRINTER_MODEL"]["3DPrinterModelDirectory"]     # Directory holding the source model files
+        sourceFiles = [os.path.join(modelDirectory, self.objFile), os.path.join(modelDirectory, self.mtlFile)] # Source .obj and .mtl files
+        cacheKey = SceneCache.hashFiles(sourceFiles, os.path.join("sceneCache", "stamp.json")) # Hash of the source model files
+        cacheDir = os.path.join("sceneCache", cacheKey)                         # Directory the cache for these model files is stored in
+        if not int(config["PRINTER_MODEL"]["rebuildPrinterModel"]) and SceneCache.isCached(cacheDir): # Uses the cache unless a rebuild is requested
+            return cacheDir # The cache is up to date
+
+        # The model files have changed (or a rebuild was requested) so the processed object file is out of date
+        self.RebuildPrinterModel() # Calls to rebuild the printer model
+
+        # Object setup
+        model = vtkOBJImporter()       # Source object to read .stl files
+        model.SetFileName("processed.obj") # Sets the file name of the obj to be converted and viewed
+        filePath = config["PRINTER_MODEL"]["3DPrinterModelDirectory"] + "\\" + self.mtlFile # Generates the relative file address
+        model.SetFileNameMTL(filePath)     # Sets the mtl file for the obj
+
+        # Imports into the importer's own hidden renderer, the GUI's render window must only be used on the GUI thread
+        model.Update() # Reads the model object and converts the obj to vtk format
+        renderer = model.GetRenderer() # Gets the renderer holding the imported actors
+        actors = renderer.GetActors()  # Gets the imported actors
+        actors.InitTraversal()         # Sets up the collection of actors to be iterated through
+        actorList = [actors.GetNextActor() for i in range(actors.GetNumberOfItems())] # Actors in the original order
+        renderer.RemoveAllViewProps()  # The hidden renderer no longer holds the actors when it is deleted
+
+        # Stores the imported scene for the next launch
+        SceneCache.saveScene(cacheDir, actorList) # Saves the actors in order
+        SceneCache.removeStaleCaches(cacheDir)    # Deletes caches of previous model files
+        return cacheDir # The cached actors only hold their own points, the imported ones all share the whole model's points
+
     # Method to reset camera position and focus
     def resetCameraView(self):
         coord = config["DEFAULT"]["cameraPosition"].split(" ")               # Gets camera position from config file
@@ -98,7 +335,7 @@ class MainWindow(QMainWindow):
         self.camera.SetFocalPoint(int(coord[0]), int(coord[1]), int(coord[2])) # Set focal point
         self.upDirection = int(config["DEFAULT"]["upDirection"]) # Gets up direction from config file
         self.cameraSetViewUp()                                   # Sets camera direction
-        self.renderer.GetRenderWindow().Render()                 # Updates renderer
+        self.renderScheduler.requestRender()                     # Updates renderer on the next frame
 
     # Sets the camera's up direction as specified in the config file
     def cameraSetViewUp(self):
@@ -116,28 +353,49 @@ class MainWindow(QMainWindow):
             case 5:                             # -z
                 self.camera.SetViewUp(0, 0, -1) # Set the up direction for camera
 
+    # Links the printer model's axis actors to their axis transforms, with every actor on an axis sharing that axis's transform
+    def setupAxisTransforms(self):
+        self.linkAxisTransforms(self.axisActors)
+
+    # Links each list of actors in axisActors to the transform of its axis (x, y, and z)
+    def linkAxisTransforms(self, axisActors):
+        for direction, actors in enumerate(axisActors): # Loops for each axis
+            for actor in actors:                        # Loops for each actor on the axis
+                actor.SetUserTransform(self.axisTransforms[direction]) # Links the actor to its axis transform
+
+    # Returns the set of item numbers on each of the X, Y and Z axes
+    def getAxisItems(self):
+        return [{i for itemRange in item for i in range(itemRange[0], itemRange[1] + 1)} for item in self.itemRanges]
+
     # Method to update position with position x, y, z list
     def updatePrinterPosition(self, position):
-        for direction, item in enumerate(self.itemRanges): # Loops for each value in self.itemRanges (3 for items x, y, and z)
-            for itemRange in item:                         # Loops for each range in item
-                for i in range(itemRange[0], itemRange[1]+1):            # Loops for each value inbetweem the selected numbers
-                    self.actor = self.actorCollection.GetItemAsObject(i) # Gets the actor object for each value
-                    transform = vtk.vtkTransform()                       # Create a vtkTransform object for translation
-                    match direction:                                         # Checks for each case of direction
-                        case 0:                                              # Extruder movement ± X and ± Z
-                            transform.Translate(position[0], 0, position[2]) # Translates in the X and Z direction
-                        case 1:                                              # Bed movement ± Y
-                            transform.Translate(0, position[1], 0)           # Translates in the Y direction
-                        case 2:                                              # Gantry movement ± Z
-                            transform.Translate(0, 0, position[2])           # Translates in the Z direction
-
-                    # Updating vtk
-                    self.actor.SetUserTransform(transform) # Update actor with transform changes
-        self.renderer.GetRenderWindow().Render()           # Updates renderer
+        setAxisTranslations(self.axisTransforms, position) # Moves every actor on each axis at once
+        self.renderScheduler.requestRender() # Updates renderer on the next frame
+
+    # Opens the serial link to the hardware controller when a serial port is set
+    def setupControllerLink(self):
+        self.controllerLink = None   # Positions are printed out when there is no link
+        self.firmwareEmulator = None # Local stand-in for the firmware, only used when serialPort is set to emulator
+        port = config["HARDWARE_CONTROLLER"]["serialPort"]         # Gets the serial port from the config file
+        if not int(config["HARDWARE_CONTROLLER"]["outputToController"]) or not port: # Checks if the link is needed
+            return
+
+        try:
+            if port == "emulator":                                 # Checks if the firmware emulator should be used
+                self.firmwareEmulator = ControllerLink.FirmwareEmulator() # Starts the emulator on a pseudo terminal
+                port = self.firmwareEmulator.port                  # Connects the link to the emulator
+            self.controllerLink = ControllerLink.ControllerLink(port, int(config["HARDWARE_CONTROLLER"]["baudRate"]))
+            self.controllerLink.start()                            # Starts the link thread, the port is opened there so the window never waits on it
+        except (RuntimeError, OSError, ImportError) as error:      # Missing pyserial or no pseudo terminal support
+            print(f"Hardware controller link unavailable, printing positions instead: {error}")
+            self.controllerLink = None
 
     # Sends the position data to the hardware controller
     def sendToController(self, position):
         if int(config["HARDWARE_CONTROLLER"]["outputToController"]):
+            if self.controllerLink:                      # Checks if the serial link is running
+                self.controllerLink.sendPosition(position) # Queues the position, this never blocks the GUI
+                return
             str = ["X", "Y", "Z"] # Array to assist coord printout
             for i in range(3):    # Loops three times for each coord
                 print(f"{str[i]} = {position[i]}") # Prints out the coordinate and the value later to be changed to send data to controller
@@ -158,24 +416,370 @@ class MainWindow(QMainWindow):
     def addMenuBar(self):
         # Create a menu bar
         menuBar = self.menuBar()                # Adding menu bar to PyQt window
+        fileMenu = menuBar.addMenu("File")      # Adding file menu to menu bar
         viewMenu = menuBar.addMenu("View")      # Adding view menu to menu bar
         optionMenu = menuBar.addMenu("Options") # Adding options menu to menu bar
 
+        # Adds G-code opening to file menu
+        self.openGcodeAction = fileMenu.addAction("Open G-code...")  # Adding open G-code item to file menu
+        self.openGcodeAction.triggered.connect(self.openGcode)       # Runs openGcode method each time the action is triggered
+
+        # Adds motion log replay to file menu
+        self.openMotionLogAction = fileMenu.addAction("Open Motion Log...") # Adding open motion log item to file menu
+        self.openMotionLogAction.triggered.connect(self.openMotionLog)      # Runs openMotionLog method each time the action is triggered
+
+        # Adds bed model loading to file menu
+        self.loadBedModelAction = fileMenu.addAction("Load Bed Model...")   # Adding load bed model item to file menu
+        self.loadBedModelAction.triggered.connect(self.openBedModels)        # Runs openBedModels method each time the action is triggered
+        self.clearBedModelsAction = fileMenu.addAction("Clear Bed Models")  # Adding clear bed models item to file menu
+        self.clearBedModelsAction.triggered.connect(self.clearBedModels)     # Runs clearBedModels method each time the action is triggered
+
+        # Adds printer farm to file and view menus
+        self.openFarmGcodeAction = fileMenu.addAction("Open Farm G-code...") # Adding open farm G-code item to file menu
+        self.openFarmGcodeAction.triggered.connect(self.openFarmGcode)       # Runs openFarmGcode method each time the action is triggered
+        self.printerFarmAction = viewMenu.addAction("Printer Farm...")       # Adding printer farm item to view menu
+        self.printerFarmAction.triggered.connect(self.askFarmSize)           # Runs askFarmSize method each time the action is triggered
+
         # Adds dock toggle to view menu
         self.toggleDockAction = viewMenu.addAction("Toggle Dock")          # Adding toggle item to view menu
         self.toggleDockAction.triggered.connect(self.toggleDockVisibility) # Runs toggleDockVisibility method each time the action is triggered
 
+        # Adds the profiler overlay and trace export to the view and file menus in debug mode
+        if self.profiler:                                                       # Checks if the profiler is running
+            self.profilerOverlayAction = viewMenu.addAction("Profiler Overlay") # Adding profiler overlay toggle to view menu
+            self.profilerOverlayAction.setCheckable(True)
+            self.profilerOverlayAction.setChecked(True)                         # Shown from the start in debug mode
+            self.profilerOverlayAction.toggled.connect(self.toggleProfilerOverlay) # Runs toggleProfilerOverlay method each time the action is toggled
+            self.exportProfileAction = fileMenu.addAction("Export Profile...")  # Adding export profile item to file menu
+            self.exportProfileAction.triggered.connect(self.exportProfile)      # Runs exportProfile method each time the action is triggered
+
         # Adds initial printer model setup to options menu
         self.printerModelSetup = optionMenu.addAction("Run Printer Model Setup") # Adding run printer model setup action to options menu
         self.printerModelSetup.triggered.connect(self.printerItemsSetup)         # Runs printer items setup
 
+    # Asks the user for STL files and loads them onto the bed
+    def openBedModels(self):
+        fileNames, _ = QFileDialog.getOpenFileNames(self, "Load Bed Model", "", "STL (*.stl);;All files (*)") # File picker dialog, several parts can be chosen at once
+        for fileName in fileNames:       # Loops for each chosen file
+            self.loadBedModel(fileName)  # Loads the part onto the bed
+
+    # Loads an STL part and places it on the bed next to the parts already loaded, laid out in rows
+    def loadBedModel(self, fileName):
+        if self.nozzleTipPosition is None: # Parts would be placed relative to a made up nozzle position, so the collision checks would be wrong
+            self.statusBar().showMessage("Set nozzleTipPosition in settings.ini to load bed models", 5000)
+            return
+        polyData = StlLoader.loadStl(fileName) # Reads the part, binary files are read a chunk of triangle records at a time
+        xMin, xMax, yMin, yMax, zMin, zMax = polyData.GetBounds() # Size of the part
+        gap = 5                                 # Real distance in mm between parts
+
+        # Finds the real position of the part's corner, starting a new row when the part would go past the end of the x travel
+        if self.bedCursor is None:                               # First part starts at the bed's origin corner
+            self.bedCursor = [self.sliders[0][2], self.sliders[1][2], 0]
+        elif self.bedCursor[0] + (xMax - xMin) > self.sliders[0][3]:
+            self.bedCursor = [self.sliders[0][2], self.bedCursor[1] + self.bedCursor[2] + gap, 0]
+        corner = self.toToolpathCoordinates(np.array([[self.bedCursor[0], self.bedCursor[1], 0]]))[0] # Corner on the bed in the bed's coordinates
+        self.bedCursor[0] += (xMax - xMin) + gap                 # Next part goes to the right
+        self.bedCursor[2] = max(self.bedCursor[2], yMax - yMin)  # Row depth is the deepest part in the row
+
+        # Actor, the part sits on the bed surface and shares the bed's Y axis transform
+        mapper = vtkPolyDataMapper()
+        mapper.SetInputData(polyData)
+        actor = vtkActor()
+        actor.SetMapper(mapper)
+        actor.GetProperty().SetColor(0.905882, 0.443137, 0.027451) # Orange filament
+        actor.SetPosition(corner[0] - xMin, corner[1] - yMax, corner[2] - zMin) # Real y increases towards negative simulated y over the bed
+        actor.SetUserTransform(self.axisTransforms[1])           # Moves with the bed
+        self.renderer.AddActor(actor)                            # Adds the part to the scene
+        self.bedModels.append(actor)
+        self.updateCollisionChecker()                            # The toolhead must now clear the part
+        self.renderScheduler.requestRender()                     # Updates renderer on the next frame
+
+    # Removes every part from the bed
+    def clearBedModels(self):
+        for actor in self.bedModels:        # Loops for each part
+            self.renderer.RemoveActor(actor)
+        self.bedModels = []
+        self.bedCursor = None               # The next part starts back at the corner
+        self.updateCollisionChecker()       # Nothing left on the bed to hit
+        self.renderScheduler.requestRender() # Updates renderer on the next frame
+
+    # Prepares the collision checker for the X items against the bed models
+    def updateCollisionChecker(self):
+        if self.movingBoxes is None:        # Only the travel limits are checked until the X item boxes are built
+            return
+        if not self.bedModels:              # Only the travel limits are checked
+            self.collisionChecker = None
+            return
+        if self.collisionChecker is None:
+            simulated = [sorted(slider[4:6]) for slider in self.sliders] # Simulated travel of each axis
+            lower = (simulated[0][0], -simulated[1][1], simulated[2][0]) # The bed moves in Y, so the X items move the opposite way over it
+            upper = (simulated[0][1], -simulated[1][0], simulated[2][1])
+            self.collisionChecker = CollisionChecker.CollisionChecker(self.movingBoxes, lower, upper)
+        self.collisionChecker.setObstacles(CollisionChecker.joinBoxes( # Each part is placed by its actor position
+            CollisionChecker.obbLeafBoxes(actor.GetMapper().GetInput(), offset=actor.GetPosition()) for actor in self.bedModels))
+
+    # Returns which of an (n, 3) array of real positions are outside the travel limits and which would put the X items into a bed model
+    def checkMoves(self, positionsReal):
+        positionsReal = np.asarray(positionsReal, dtype=np.float64).reshape(-1, 3)
+        lower = np.array([slider[2] for slider in self.sliders]) # Real travel limits
+        upper = np.array([slider[3] for slider in self.sliders])
+        outside = np.any((positionsReal < lower) | (positionsReal > upper), axis=1)
+        colliding = np.zeros(len(positionsReal), dtype=bool)
+        if self.collisionChecker:           # Checks if there are bed models to hit
+            colliding = self.collisionChecker.checkTranslations(self.toSimulatedCoordinates(positionsReal) * (1, -1, 1)) # X items relative to the bed
+        return outside, colliding
+
+    # Shows a held back move in the status bar
+    def reportHeldMove(self, positionReal, outside):
+        self.heldMoves += 1
+        reason = "outside the travel limits" if outside else "the toolhead would hit a bed model"
+        self.statusBar().showMessage(f"Move to X {positionReal[0]:.2f} Y {positionReal[1]:.2f} Z {positionReal[2]:.2f} held back, {reason} ({self.heldMoves} held)", 5000)
+
+    # Returns whether a real position may be sent to the controller, reporting it if not
+    def moveAllowed(self, positionReal):
+        if not self.collisionCheck:         # Every move is sent
+            return True
+        outside, colliding = self.checkMoves(positionReal)
+        if outside[0] or colliding[0]:
+            self.reportHeldMove(positionReal, outside[0])
+            return False
+        return True
+
+    # Asks the user how many printers to show
+    def askFarmSize(self):
+        count, accepted = QInputDialog.getInt(self, "Printer Farm", "Number of printers:", self.farmSize, 1, 64) # Count dialog, the main printer counts as one
+        if accepted:
+            self.setFarmSize(count)
+
+    # Shows count printers, the main printer and count - 1 farm printers beside it
+    def setFarmSize(self, count):
+        self.farmSize = count
+        if self.printerModelLoaded:        # Otherwise the farm is built once the printer model has loaded
+            self.clearFarm()
+            self.buildFarm()
+
+    # Adds the farm printers in a grid beside the main printer, sharing its mappers and materials
+    def buildFarm(self):
+        bounds = np.array([actor.GetBounds() for actor in self.drawnActors if actor.GetVisibility()]) # Bounds of the printer model's actors
+        spacing = (1.2 * (bounds[:, 1].max() - bounds[:, 0].min()), 1.2 * (bounds[:, 3].max() - bounds[:, 2].min())) # Printer size with a gap
+        for offset in PrinterFarm.gridOffsets(self.farmSize, spacing)[1:]: # The first place is the main printer's
+            instance = PrinterFarm.PrinterInstance(offset)
+            instance.addLevels(self.detailLevels)  # Actors for every loaded detail level
+            setAxisTranslations(instance.axisTransforms, self.defaultPosition) # Starts at the default position
+            for actor in instance.levels[self.detailLevel]: # Draws the printer at the current detail level
+                self.renderer.AddActor(actor)
+            self.farm.append(instance)
+        self.renderScheduler.requestRender()
+
+    # Removes the farm printers
+    def clearFarm(self):
+        for instance in self.farm:         # Loops for each farm printer
+            for actor in instance.levels[self.detailLevel]:
+                self.renderer.RemoveActor(actor)
+            if instance.player:            # Checks if the printer is playing a G-code file
+                instance.player.close()
+        self.farm = []
+        self.farmTimer.stop()
+        self.renderScheduler.requestRender()
+
+    # Asks the user for G-code files and plays them on the farm printers in order, printers given more than one file play them one after another
+    def openFarmGcode(self):
+        if not self.farm:                  # Checks if there are farm printers
+            self.statusBar().showMessage("Set the number of printers with View > Printer Farm first", 3000)
+            return
+        fileNames, _ = QFileDialog.getOpenFileNames(self, "Open Farm G-code", "", "G-code (*.gcode *.gco *.g);;All files (*)") # Several files can be chosen at once
+        for i, instance in enumerate(self.farm[:len(fileNames)]): # Loops for each printer given a file
+            instance.queue = fileNames[i::len(self.farm)] # With more files than printers, the extra files queue up behind the first ones
+            self.playNextFarmFile(instance)
+        if fileNames:
+            self.farmTimer.start()
+
+    # Starts the next queued G-code file on a farm printer, closing the one it was playing
+    def playNextFarmFile(self, instance):
+        if instance.player:                # Checks if the printer is already playing a file
+            instance.player.close()
+        timestep = 1 / float(config["PLAYBACK"]["simulationRate"]) # Fixed simulation timestep in seconds
+        instance.player = GcodePlayer.GcodePlayer(instance.queue.pop(0), timestep, buildIndex=False) # Farm printers never seek, so no layer index process is started
+        instance.lastPlaybackTime = time.perf_counter() # Playback time is measured from now
+
+    # Advances the farm printers' playback, every printer that moved is drawn by the same frame
+    def farmStep(self):
+        now = time.perf_counter()          # Current time
+        speed = float(self.speedBox.currentText().rstrip("x")) # Farm printers use the main playback speed
+        playing = False                    # Set if any printer still has moves to play
+        for instance in self.farm:         # Loops for each farm printer
+            if instance.player and instance.player.finished and instance.queue: # Moves on to the printer's next file
+                self.playNextFarmFile(instance)
+            if not instance.player or instance.player.finished: # Idle printer
+                continue
+            positions = instance.player.advance((now - instance.lastPlaybackTime) * speed) # Simulates every timestep in the elapsed time
+            instance.lastPlaybackTime = now
+            if len(positions):             # Checks if at least one timestep passed
+                setAxisTranslations(instance.axisTransforms, [self.convert(i, positions[-1][i]) for i in range(3)]) # Moves the printer to its newest position
+            playing = True
+        self.renderScheduler.requestRender() # One render for every printer moved in this step
+        if not playing:                    # Every file has finished
+            self.farmTimer.stop()
+
+    # Adds the text overlay showing the profiler's stage timings and frame rate, refreshed twice a second
+    def setupProfilerOverlay(self):
+        self.profilerText = vtkTextActor()               # 2D text drawn over the scene
+        self.profilerText.SetDisplayPosition(10, 10)     # Bottom left corner
+        self.profilerText.PickableOff()                  # Never picked in the printer model setup
+        textProperty = self.profilerText.GetTextProperty()
+        textProperty.SetFontFamilyToCourier()            # Fixed width so the columns line up
+        textProperty.SetFontSize(12)
+        textProperty.SetColor(1, 1, 1)                   # White text
+        textProperty.SetBackgroundColor(0, 0, 0)         # On a dark box so it can be read over the model
+        textProperty.SetBackgroundOpacity(0.5)
+        self.renderer.AddViewProp(self.profilerText)
+        self.profilerTimer = QTimer(self)                # Timer that refreshes the overlay
+        self.profilerTimer.timeout.connect(self.updateProfilerOverlay)
+        self.profilerTimer.start(500)
+
+    # Refreshes the overlay text, shown by the next frame rather than asking for one so an idle window stays idle
+    def updateProfilerOverlay(self):
+        self.profilerText.SetInput(self.profiler.summaryText())
+
+    # Shows or hides the profiler overlay
+    def toggleProfilerOverlay(self, visible):
+        self.profilerText.SetVisibility(visible)
+        if visible:
+            self.profilerTimer.start(500)
+        else:
+            self.profilerTimer.stop()    # Nothing to refresh while hidden
+        self.renderScheduler.requestRender() # Updates renderer on the next frame
+
+    # Asks the user for a file name and writes the profiler's samples to it as a Chrome trace
+    def exportProfile(self):
+        fileName, _ = QFileDialog.getSaveFileName(self, "Export Profile", "profile.json", "Chrome trace (*.json);;All files (*)") # File picker dialog
+        if fileName:                     # Checks a file was chosen
+            count = self.profiler.exportChromeTrace(fileName)
+            self.statusBar().showMessage(f"Exported {count} samples to {os.path.basename(fileName)}", 3000)
+
     # Method to toggle the dock visibility
     def toggleDockVisibility(self):
         # Toggle the visibility of the dock widget
         self.dockWidget.setVisible(not self.dockWidget.isVisible()) # Toggles the dock visibility
 
+    # Opens the printer model setup, clicking parts of the printer assigns them to the X, Y or Z items
     def printerItemsSetup(self):
-        print("Here1") # Have object continuously moving to identify
+        if self.itemsSetup:                # Already running
+            return
+        if not self.printerModelLoaded:    # Checks if there is a printer model to pick from
+            self.statusBar().showMessage("The printer model is still loading", 3000)
+            return
+
+        # Items are picked at their untranslated position, where the spatial index is built, so the position controls are paused
+        if self.gcodePlayer and self.playbackTimer.isActive(): # Checks if a G-code file is playing
+            self.togglePlayback()          # Pauses playback
+        if self.replayTimer.isActive():    # Checks if a motion log is replaying
+            self.toggleReplay()            # Pauses the replay
+        self.dockWidgetContents.setEnabled(False) # Stops the sliders moving the printer during the setup
+        self.updatePrinterPosition([0, 0, 0])     # Moves every item back to its untranslated position
+        self.setupArrays = SceneCache.loadArrays(self.cacheDir) # Cache arrays, used for the item bounds and the highlights
+        self.itemsSetup = ItemPicker.ItemPicker(self.renderer, self.actorList, self.drawnActors, self.setupArrays)
+        self.setupGroups = self.getAxisItems() # Starts from the current items
+        self.setupOverlays = [None, None, None] # Highlight actor of each axis
+
+        # Setup dock, made the first time the setup is run
+        if not hasattr(self, "setupDock"):
+            self.setupDock = QDockWidget("Printer Model Setup", self)   # Dock holding the setup controls
+            self.setupDock.setFeatures(QDockWidget.NoDockWidgetFeatures) # Only closed with Save or Cancel
+            setupContents = QWidget()
+            setupLayout = QVBoxLayout()
+            instructions = QLabel("Click parts of the printer to add them to or remove them from the chosen axis", self)
+            instructions.setWordWrap(True)
+            setupLayout.addWidget(instructions)
+            self.setupAxis = QComboBox()                   # Axis that clicked parts are assigned to
+            self.setupAxis.addItems(["X items", "Y items", "Z items"])
+            setupLayout.addWidget(self.setupAxis)
+            self.setupLabel = QLabel("", self)             # Number of items on each axis
+            setupLayout.addWidget(self.setupLabel)
+            suggestButton = QPushButton("Suggest Items")   # Adds the items inside the chosen axis's parts
+            suggestButton.clicked.connect(self.suggestSetupItems)
+            setupLayout.addWidget(suggestButton)
+            saveButton = QPushButton("Save")               # Writes the items to settings.ini
+            saveButton.clicked.connect(self.saveItemsSetup)
+            setupLayout.addWidget(saveButton)
+            cancelButton = QPushButton("Cancel")           # Leaves the items as they were
+            cancelButton.clicked.connect(self.closeItemsSetup)
+            setupLayout.addWidget(cancelButton)
+            setupLayout.addStretch()
+            setupContents.setLayout(setupLayout)
+            self.setupDock.setWidget(setupContents)
+            self.addDockWidget(Qt.RightDockWidgetArea, self.setupDock)
+        self.setupDock.show()
+        self.updateSetupOverlays()         # Highlights the current items
+
+    # Toggles the item at display position x, y on the chosen axis, called by left clicks during the setup
+    def pickSetupItem(self, x, y):
+        item = self.itemsSetup.pick(x, y)  # Item under the mouse
+        if item is None:                   # Clicked on empty space
+            return
+        group = self.setupGroups[self.setupAxis.currentIndex()]
+        if item in group:                  # Clicking an item again removes it
+            group.remove(item)
+        else:
+            for otherGroup in self.setupGroups: # An item can only be on one axis
+                otherGroup.discard(item)
+            group.add(item)
+        self.statusBar().showMessage(f"Item {item}", 3000) # Shows the item number picked
+        self.updateSetupOverlays()
+
+    # Adds the items lying inside the chosen axis's parts, e.g. the screws and clips fixed to the bed
+    def suggestSetupItems(self):
+        axis = self.setupAxis.currentIndex()
+        taken = set().union(*self.setupGroups)  # Items already on an axis are left where they are
+        suggestions = self.itemsSetup.suggestItems(self.setupGroups[axis]) - taken
+        self.setupGroups[axis] |= suggestions
+        self.statusBar().showMessage(f"Added {len(suggestions)} suggested items to the {self.setupAxis.currentText()}", 3000)
+        self.updateSetupOverlays()
+
+    # Redraws the highlights of the X, Y and Z items and their item counts
+    def updateSetupOverlays(self):
+        colours = [(1, 0.2, 0.2), (0.2, 0.8, 0.2), (0.2, 0.4, 1)] # X red, Y green and Z blue
+        for axis, group in enumerate(self.setupGroups): # Loops for each axis
+            if self.setupOverlays[axis]:                 # Removes the old highlight
+                self.renderer.RemoveActor(self.setupOverlays[axis])
+                self.setupOverlays[axis] = None
+            if group:
+                overlay = SceneCompaction.mergeItems(self.setupArrays, sorted(group)) # One actor drawn over every item on the axis
+                overlay.GetProperty().SetColor(colours[axis])
+                overlay.GetProperty().SetOpacity(1)
+                overlay.VisibilityOn()                   # Hidden items are highlighted too
+                overlay.PickableOff()                    # Picks go through to the printer model
+                overlay.GetMapper().SetRelativeCoincidentTopologyPolygonOffsetParameters(-2, -2) # Drawn in front of the items it covers
+                self.renderer.AddActor(overlay)
+                self.setupOverlays[axis] = overlay
+        self.setupLabel.setText("\n".join(f"{name}: {len(group)} items" for name, group in zip("XYZ", self.setupGroups)))
+        self.renderScheduler.requestRender()
+
+    # Writes the X, Y and Z items to settings.ini as ranges and reloads the printer model with them
+    def saveItemsSetup(self):
+        if not all(self.setupGroups):      # Every axis needs at least one item
+            self.statusBar().showMessage("Every axis needs at least one item", 3000)
+            return
+        if self.modelThread.is_alive():    # The detail levels of the current items are still being built
+            self.statusBar().showMessage("The printer model is still loading", 3000)
+            return
+        for key, group in zip(("XItems", "YItems", "ZItems"), self.setupGroups): # Loops for each axis
+            config["PRINTER_MODEL"][key] = ItemPicker.formatItemRanges(group)
+        config.write()                     # Writes the config save to the settings.ini file
+        self.closeItemsSetup()
+        self.itemRanges = self.generateItemRanges() # Item ranges from the new settings
+        self.reloadPrinterModel()          # Static item merging and the axis transforms depend on the items
+
+    # Closes the printer model setup and moves the printer back to the slider position
+    def closeItemsSetup(self):
+        for overlay in self.setupOverlays: # Removes the highlights
+            if overlay:
+                self.renderer.RemoveActor(overlay)
+        self.setupDock.hide()
+        self.itemsSetup = None
+        self.setupArrays = None
+        self.dockWidgetContents.setEnabled(True)
+        self.updatePrinterPosition([self.convert(i, self.sliders[i][1].value()) for i in range(3)]) # Slider position, not sent to the controller as it has not changed
 
     # Method to add a dock toolbar to the main window
     def addDockToolbar(self):
@@ -216,21 +820,330 @@ class MainWindow(QMainWindow):
             self.sliders[i][1].setMaximum(realMax)  # Sets slider maximum value
             self.sliders[i][1].setValue(defaultVal) # Sets slider starting value
             self.sliders[i][1].setTickInterval(1)   # Sets slider tick interval
-            self.sliders[i][1].valueChanged.connect(self.updateLabel) # Sets updateLabel method to run on change
+            self.sliders[i][1].valueChanged.connect(lambda value: self.updateLabel()) # Sets updateLabel method to run on change, it reads every slider itself
+            self.sliders[i][1].sliderPressed.connect(self.startInteraction) # Draws a coarser printer model while the slider is dragged
+            self.sliders[i][1].sliderReleased.connect(self.endInteraction)  # Returns to full detail on release
 
             # Add widgets to layout
             self.dockWidgetLayout.addWidget(self.sliders[i][0]) # Adds label to dock widget
             self.dockWidgetLayout.addWidget(self.sliders[i][1]) # Adds slider to dock widget
 
         self.updateLabel() # Updates slider labels
+        self.addPlaybackControls() # Adds the G-code playback controls
+        self.addReplayControls()   # Adds the motion log replay controls
+
+        # Adds hardware controller link statistics to the layout
+        if self.controllerLink: # Only shown when the serial link is running
+            self.controllerLabel = QLabel("", self)                  # Make Qt label object
+            self.dockWidgetLayout.addWidget(self.controllerLabel)    # Adds label to dock widget
+            self.controllerTimer = QTimer(self)                      # Timer to refresh the statistics
+            self.controllerTimer.timeout.connect(self.updateControllerLabel) # Updates the label each time the timer runs out
+            self.controllerTimer.start(500)                          # Refreshes twice a second
+            self.updateControllerLabel()                             # Sets the initial label text
 
         # Sets dock widgets layout
         self.dockWidgetContents.setLayout(self.dockWidgetLayout)   # Set the layout to the widget
         self.dockWidget.setWidget(self.dockWidgetContents)         # Add the widget to the dock widget
         self.addDockWidget(Qt.LeftDockWidgetArea, self.dockWidget) # Add the dock widget to the main window
 
+    # Updates the hardware controller link statistics label, or reports the port could not be opened
+    def updateControllerLabel(self):
+        stats = self.controllerLink.getStatistics() # Gets the current link statistics
+        if stats["error"]:                          # The port could not be opened
+            self.controllerTimer.stop()             # Nothing more to refresh
+            self.controllerLink.stop()
+            self.controllerLink = None              # Positions are printed out instead
+            self.controllerLabel.setText("Controller not connected")
+            self.statusBar().showMessage(f"Could not open the hardware controller port, printing positions instead: {stats['error']}")
+            return
+        if not stats["connected"]:                  # Still waiting for the board to boot
+            self.controllerLabel.setText(f"Controller connecting... ({stats['queueDepth']} queued)")
+            return
+        self.controllerLabel.setText(f"Controller queue: {stats['queueDepth']} ({stats['inFlight']} in flight, {stats['lost']} lost, {stats['unconfirmed']} commands unconfirmed)\n"
+                                     f"Latency: {stats['lastLatency'] * 1000:.1f} ms (max {stats['maxLatency'] * 1000:.1f} ms)")
+
+    # Adds the G-code playback controls to the dock layout
+    def addPlaybackControls(self):
+        self.gcodePlayer = None  # G-code player, set once a file is opened
+        self.playbackLabel = QLabel("No G-code loaded", self) # Make Qt label object for the playback status
+        self.playbackLabel.setAlignment(Qt.AlignCenter)        # Center align the label text
+        self.dockWidgetLayout.addWidget(self.playbackLabel)    # Adds label to dock widget
+
+        # Play and pause button
+        self.playButton = QPushButton("Play")                  # Adds play button
+        self.playButton.setEnabled(False)                      # Disabled until a G-code file is opened
+        self.playButton.clicked.connect(self.togglePlayback)   # When pressed plays or pauses playback
+        self.dockWidgetLayout.addWidget(self.playButton)       # Adds button to widget
+
+        # Playback speed multiplier
+        self.speedBox = QComboBox(self)                        # Make Qt drop down object
+        self.speedBox.addItems(["0.5x", "1x", "2x", "5x", "10x", "50x", "100x"]) # Speed multipliers
+        self.speedBox.setCurrentText("1x")                     # Plays at normal speed by default
+        self.dockWidgetLayout.addWidget(self.speedBox)         # Adds drop down to dock widget
+
+        # Layer seeking, enabled once the layer index has been built
+        self.layerBox = QSpinBox(self)                         # Make Qt spin box object for the layer number
+        self.layerBox.setEnabled(False)                        # Disabled until the layer index is ready
+        self.dockWidgetLayout.addWidget(self.layerBox)         # Adds spin box to dock widget
+        self.layerButton = QPushButton("Go To Layer")          # Adds go to layer button
+        self.layerButton.setEnabled(False)                     # Disabled until the layer index is ready
+        self.layerButton.clicked.connect(self.seekLayer)       # When pressed jumps to the selected layer
+        self.dockWidgetLayout.addWidget(self.layerButton)      # Adds button to widget
+
+        # Toolpath display, colouring and the range of layers shown
+        self.feedColourBox = QCheckBox("Colour toolpath by feed rate", self) # Make Qt check box object
+        self.feedColourBox.toggled.connect(self.toolpathColourChanged)       # Recolours the toolpath when toggled
+        self.dockWidgetLayout.addWidget(self.feedColourBox)                  # Adds check box to dock widget
+        toolpathLayout = QHBoxLayout()                      # Lines up the layer range widgets horizontally
+        toolpathLayout.addWidget(QLabel("Layers", self))    # Label for the layer range
+        self.toolpathFirstBox = QSpinBox(self)              # First layer shown
+        self.toolpathLastBox = QSpinBox(self)               # Last layer shown
+        self.toolpathLastBox.setMinimum(-1)                 # -1 shows every layer up to the newest
+        self.toolpathLastBox.setSpecialValueText("All")     # Shows All instead of -1
+        self.toolpathLastBox.setValue(-1)
+        for box in (self.toolpathFirstBox, self.toolpathLastBox): # Loops for each layer range spin box
+            box.valueChanged.connect(self.toolpathLayersChanged)  # Updates the visible layers on change
+            toolpathLayout.addWidget(box)
+        self.dockWidgetLayout.addLayout(toolpathLayout)     # Adds the layer range to the dock widget
+
+        # Timers
+        self.playbackTimer = QTimer(self)                      # Timer that advances playback each frame
+        self.playbackTimer.setInterval(int(1000 / int(config["SETUP"]["maxFPS"]))) # One playback step per frame
+        self.playbackTimer.timeout.connect(self.playbackStep)   # Advances playback each time the timer runs out
+        self.layerIndexTimer = QTimer(self)                    # Timer that checks if the layer index has been built
+        self.layerIndexTimer.timeout.connect(self.checkLayerIndex) # Checks the layer index each time the timer runs out
+
+    # Adds the motion log replay controls to the dock layout
+    def addReplayControls(self):
+        self.motionReplay = None # Motion log replay, set once a log is opened
+        self.replayLabel = QLabel("No motion log loaded", self) # Make Qt label object for the replay status
+        self.replayLabel.setAlignment(Qt.AlignCenter)           # Center align the label text
+        self.dockWidgetLayout.addWidget(self.replayLabel)       # Adds label to dock widget
+
+        # Scrub slider over the whole log in milliseconds, any point of a long log is found with a binary search
+        self.replaySlider = QSlider(Qt.Horizontal, self)         # Make Qt slider object
+        self.replaySlider.setEnabled(False)                      # Disabled until a motion log is opened
+        self.replaySlider.valueChanged.connect(self.seekReplay)  # Jumps the replay when moved
+        self.replaySlider.sliderPressed.connect(self.startInteraction) # Draws a coarser printer model while scrubbing
+        self.replaySlider.sliderReleased.connect(self.endInteraction)
+        self.dockWidgetLayout.addWidget(self.replaySlider)       # Adds slider to dock widget
+
+        # Play and pause button, the replay uses the playback speed multiplier
+        self.replayButton = QPushButton("Play Replay")           # Adds replay button
+        self.replayButton.setEnabled(False)                      # Disabled until a motion log is opened
+        self.replayButton.clicked.connect(self.toggleReplay)     # When pressed plays or pauses the replay
+        self.dockWidgetLayout.addWidget(self.replayButton)       # Adds button to widget
+
+        # Timer
+        self.replayTimer = QTimer(self)                          # Timer that advances the replay each frame
+        self.replayTimer.setInterval(int(1000 / int(config["SETUP"]["maxFPS"]))) # One replay step per frame
+        self.replayTimer.timeout.connect(self.replayStep)        # Advances the replay each time the timer runs out
+
+    # Opens a new motion log in the recordings directory if recording is turned on
+    def setupMotionRecorder(self):
+        self.motionRecorder = None  # Motion log writer, None when position updates are not recorded
+        if int(config["PLAYBACK"]["recordMotion"]): # Checks if position updates should be recorded
+            os.makedirs("recordings", exist_ok=True)
+            fileName = os.path.join("recordings", time.strftime("motion-%Y%m%d-%H%M%S.bin")) # One log per launch
+            self.motionRecorder = MotionRecorder.MotionRecorder(fileName)
+            self.motionRecorder.start() # Starts the writer thread
+
+    # Asks the user for a motion log and loads it
+    def openMotionLog(self):
+        fileName, _ = QFileDialog.getOpenFileName(self, "Open Motion Log", "recordings", "Motion log (*.bin);;All files (*)") # File picker dialog
+        if fileName:                     # Checks a file was chosen
+            self.loadMotionLog(fileName) # Loads the chosen file
+
+    # Loads a motion log ready to be replayed, the printer is moved to its first record
+    def loadMotionLog(self, fileName):
+        try:
+            records = MotionRecorder.loadRecording(fileName) # Memory mapped, so opening a long log is instant
+        except ValueError as error:      # Not a motion log
+            self.statusBar().showMessage(str(error), 5000)
+            return
+        if not len(records):             # Nothing was recorded
+            self.statusBar().showMessage(f"{os.path.basename(fileName)} has no position updates", 5000)
+            return
+        self.replayTimer.stop()          # Stops the current replay
+        self.replayButton.setText("Play Replay")
+        self.replayButton.setEnabled(True)
+        self.replayFile = os.path.basename(fileName)
+        self.motionReplay = MotionRecorder.MotionReplay(records)
+        self.replaySlider.blockSignals(True) # The range change would seek
+        self.replaySlider.setRange(0, int((self.motionReplay.endTime - self.motionReplay.startTime) * 1000))
+        self.replaySlider.blockSignals(False)
+        self.replaySlider.setEnabled(True)
+        self.showReplayRecord(self.motionReplay.seek(self.motionReplay.startTime))
+
+    # Moves the simulated printer to a recorded position, it is not sent to the controller or recorded again
+    def showReplayRecord(self, record):
+        self.updatePrinterPosition(list(record["simulated"])) # The position the visualiser showed at the time
+        self.replaySlider.blockSignals(True)                  # Stops the slider calling seekReplay
+        self.replaySlider.setValue(int((self.motionReplay.time - self.motionReplay.startTime) * 1000))
+        self.replaySlider.blockSignals(False)
+        real = record["real"]                                 # Real position sent to the controller, unless it was held back
+        self.replayLabel.setText(f"{self.replayFile}\n{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(record['time']))}\n"
+                                 f"X {real[0]:.2f} Y {real[1]:.2f} Z {real[2]:.2f}{' (held)' if record['held'] else ''}")
+
+    # Plays or pauses the motion log replay
+    def toggleReplay(self):
+        if self.replayTimer.isActive():  # Checks if replaying
+            self.replayTimer.stop()      # Pauses the replay
+            self.replayButton.setText("Play Replay")
+            return
+        if self.playbackTimer.isActive(): # G-code playback would fight the replay for the printer position
+            self.togglePlayback()
+        if self.motionReplay.finished:   # Starts again from the beginning once the end has been reached
+            self.motionReplay.seek(self.motionReplay.startTime)
+        self.lastReplayTime = time.perf_counter() # Replay time is measured from now
+        self.replayTimer.start()         # Starts the replay
+        self.replayButton.setText("Pause Replay")
+
+    # Advances the replay by the time since the last step, scaled by the speed multiplier
+    def replayStep(self):
+        now = time.perf_counter()        # Current time
+        speed = float(self.speedBox.currentText().rstrip("x")) # Gets the speed multiplier
+        self.showReplayRecord(self.motionReplay.advance((now - self.lastReplayTime) * speed))
+        self.lastReplayTime = now
+        if self.motionReplay.finished:   # Checks if the end of the log has been reached
+            self.toggleReplay()          # Pauses the replay
+
+    # Jumps the replay to the scrub slider's position
+    def seekReplay(self, value):
+        self.showReplayRecord(self.motionReplay.seek(self.motionReplay.startTime + value / 1000))
+
+    # Asks the user for a G-code file and loads it
+    def openGcode(self):
+        fileName, _ = QFileDialog.getOpenFileName(self, "Open G-code", "", "G-code (*.gcode *.gco *.g);;All files (*)") # File picker dialog
+        if fileName:                # Checks a file was chosen
+            self.loadGcode(fileName) # Loads the chosen file
+
+    # Loads a G-code file ready to be played
+    def loadGcode(self, fileName):
+        if self.gcodePlayer:              # Checks if a file is already loaded
+            self.playbackTimer.stop()     # Stops the current playback
+            self.gcodePlayer.close()      # Closes the current file
+        timestep = 1 / float(config["PLAYBACK"]["simulationRate"])      # Fixed simulation timestep in seconds
+        self.gcodePlayer = GcodePlayer.GcodePlayer(fileName, timestep) # Opens the file and starts building the layer index
+        self.playButton.setText("Play")   # Playback starts paused
+        self.playButton.setEnabled(True)  # Allows playback to start
+        self.layerBox.setEnabled(False)   # Layer seeking waits for the new layer index
+        self.layerButton.setEnabled(False)
+        self.playbackLabel.setText(f"{os.path.basename(fileName)}\nBuilding layer index...") # Shows the loaded file
+        if self.nozzleTipPosition is None:   # Playback still moves the printer, only the toolpath is missing
+            self.statusBar().showMessage("The printed toolpath is not drawn until nozzleTipPosition is set in settings.ini", 5000)
+        self.layerIndexTimer.start(250)   # Checks for the layer index four times a second
+
+    # Enables layer seeking once the layer index has been built
+    def checkLayerIndex(self):
+        if self.gcodePlayer.layerIndexReady():                          # Checks if the layer index is ready
+            self.layerIndexTimer.stop()                                 # Stops checking
+            self.layerBox.setRange(0, max(len(self.gcodePlayer.layers) - 1, 0)) # Sets the layer range
+            self.layerBox.setEnabled(len(self.gcodePlayer.layers) > 0)  # Enables seeking if there are any layers
+            self.layerButton.setEnabled(len(self.gcodePlayer.layers) > 0)
+            self.updatePlaybackLabel()                                  # Shows the layer count
+
+    # Plays or pauses G-code playback
+    def togglePlayback(self):
+        if self.playbackTimer.isActive():      # Checks if playing
+            self.playbackTimer.stop()          # Pauses playback
+            self.playButton.setText("Play")
+        else:
+            if self.replayTimer.isActive():    # A motion log replay would fight playback for the printer position
+                self.toggleReplay()
+            self.lastPlaybackTime = time.perf_counter() # Playback time is measured from now
+            self.playbackTimer.start()         # Starts playback
+            self.playButton.setText("Pause")
+
+    # Jumps playback to the layer selected in the layer spin box
+    def seekLayer(self):
+        if self.gcodePlayer.seekLayer(self.layerBox.value()): # Restarts parsing at the layer's byte offset
+            self.lastPlaybackTime = time.perf_counter()       # Playback time is measured from now
+            layerZ = self.gcodePlayer.layers[self.layerBox.value()]["z"] # Height of the layer being jumped to
+            if self.nozzleTipPosition is not None:            # Checks if the toolpath is drawn
+                self.toolpath.truncateAtHeight(self.toToolpathCoordinates(np.array([[0, 0, layerZ]]))[0, 2]) # Removes printed layers from that height up
+                self.toolpath.flush(force=True)               # Shows the removal straight away
+            self.setPrinterPosition(list(self.gcodePlayer.position)) # Moves straight to the start of the layer
+            self.updatePlaybackLabel()
+
+    # Advances playback by the time since the last step, scaled by the speed multiplier
+    def playbackStep(self):
+        now = time.perf_counter()                 # Current time
+        elapsed = now - self.lastPlaybackTime     # Real time since the last step
+        self.lastPlaybackTime = now
+        speed = float(self.speedBox.currentText().rstrip("x"))      # Gets the speed multiplier
+        positions = self.gcodePlayer.advance(elapsed * speed)       # Simulates every timestep in the elapsed time
+        held = False                              # Set if a position of this step was held back
+        if self.collisionCheck and len(positions): # Checks every timestep of this step at once
+            outside, colliding = self.checkMoves(positions)
+            flagged = outside | colliding
+            if flagged.any():
+                first = int(np.argmax(flagged))   # First position that must not be sent
+                self.reportHeldMove(positions[first], outside[first])
+                positions = positions[:first]     # Playback stops just before it
+                self.gcodePlayer.holdAt(first)    # Rewinds the player so resuming starts at the held position, dropping extrusion after it
+                held = True
+            else:
+                upcoming = self.gcodePlayer.ends[self.gcodePlayer.segment + 1:self.gcodePlayer.segment + 65] # Ends of the next 64 moves
+                outside, colliding = self.checkMoves(upcoming)
+                if outside.any() or colliding.any(): # Warns before playback gets there
+                    self.statusBar().showMessage(f"Collision or travel limit ahead in {int(np.argmax(outside | colliding)) + 1} moves", 1000)
+        if self.nozzleTipPosition is not None:    # The toolpath is only drawn once the nozzle tip has been measured
+            starts, ends, feeds = self.gcodePlayer.completedExtrusions  # Extrusion finished during those timesteps
+            self.toolpath.addSegments(self.toToolpathCoordinates(starts), self.toToolpathCoordinates(ends), feeds) # Adds it to the printed toolpath
+            if self.toolpath.flush():             # Pushes new toolpath segments to vtk a few times a second
+                self.renderScheduler.requestRender() # Redraws with the new segments
+        if len(positions):                        # Checks if at least one timestep passed
+            self.setPrinterPosition(list(positions[-1])) # Shows the newest position
+        self.updatePlaybackLabel()
+        self.toolpathFirstBox.setMaximum(max(self.toolpath.getStatistics()["layers"] - 1, 0)) # Allows every printed layer to be chosen
+        self.toolpathLastBox.setMaximum(max(self.toolpath.getStatistics()["layers"] - 1, 0))
+        if held or self.gcodePlayer.finished:     # Checks if a move was held back or the end of the file has been reached
+            self.togglePlayback()                 # Pauses playback
+
+    # Turns toolpath colouring by feed rate on or off
+    def toolpathColourChanged(self, enabled):
+        self.toolpath.setColourByFeed(enabled) # Switches the toolpath colouring
+        self.renderScheduler.requestRender()   # Updates renderer on the next frame
+
+    # Shows only the toolpath layers selected in the layer range spin boxes
+    def toolpathLayersChanged(self):
+        first, last = self.toolpathFirstBox.value(), self.toolpathLastBox.value() # Gets the layer range
+        if first == 0 and last == -1:           # The whole toolpath is selected
+            self.toolpath.setVisibleLayers(None)
+        else:
+            self.toolpath.setVisibleLayers(first, None if last == -1 else last)
+        self.renderScheduler.requestRender()    # Updates renderer on the next frame
+
+    # Converts (n, 3) real positions into simulated positions, the same mapping as convert applied to every position at once
+    def toSimulatedCoordinates(self, positions):
+        simulated = np.empty((len(positions), 3)) # Initialises the simulated positions
+        for i in range(3):                        # Loops three times for x, y, z
+            realSpan = self.sliders[i][3] - self.sliders[i][2]
+            simSpan = self.sliders[i][5] - self.sliders[i][4]
+            simulated[:, i] = self.sliders[i][4] + (positions[:, i] - self.sliders[i][2]) / realSpan * simSpan
+        return simulated
+
+    # Converts (n, 3) real positions of the nozzle into the bed's untranslated coordinates, where the toolpath is drawn
+    def toToolpathCoordinates(self, positions):
+        simulated = self.toSimulatedCoordinates(positions) # Axis transform translations of each position
+        simulated[:, 1] *= -1                     # The bed moves rather than the nozzle in Y, so the nozzle moves the opposite way over the bed
+        return simulated + self.nozzleTipPosition # Offsets by the nozzle tip at the zero position
+
+    # Updates the playback status label
+    def updatePlaybackLabel(self):
+        name = os.path.basename(self.gcodePlayer.fileName) # Name of the G-code file
+        layer = self.gcodePlayer.currentLayer()            # Layer being played, None while the index is building
+        if layer is None:
+            self.playbackLabel.setText(f"{name}\nBuilding layer index...")
+        else:
+            self.playbackLabel.setText(f"{name}\nLayer {layer} of {len(self.gcodePlayer.layers)}")
+
     # Generates movement ranges list
     def generateMovementRanges(self):
+        nozzleTip = config["PRINTER_MODEL"]["nozzleTipPosition"].split() # Nozzle tip with the printer at its zero position, blank until it has been measured
+        self.nozzleTipPosition = np.array([float(value) for value in nozzleTip]) if nozzleTip else None # Without it the toolpath and bed models cannot be placed
+
         # Real ranges
         xSliderPhysical = config["PRINTER_MODEL"]["XSliderPhysical"].split(" ") # Get x real slider range
         ySliderPhysical = config["PRINTER_MODEL"]["YSliderPhysical"].split(" ") # Get y real slider range
@@ -259,15 +1172,28 @@ class MainWindow(QMainWindow):
 
     # Updates the label of the x, y, and z sliders
     def updateLabel(self):
-        positionSim = []      # Initalises the position array
-        positionReal = []      # Initalises the position array
+        positionReal = []  # Initalises the position array
         for i in range(3): # Loops three times for x, y, z
-            positionReal.append(self.sliders[i][1].value())         # Get current position of slider
-            positionSim.append(self.convert(i, positionReal[i]))    # Converts current position to match simulated ranges and adds to position list
-            self.sliders[i][0].setText(f"Value: {positionReal[i]}") # Sets slider label to current position
+            positionReal.append(self.sliders[i][1].value()) # Get current position of slider
+        self.setPrinterPosition(positionReal) # Moves the printer to the slider position
+
+    # Moves the simulated printer to a real position and sends it to the hardware controller
+    def setPrinterPosition(self, positionReal):
+        positionSim = []   # Initalises the position array
+        for i in range(3): # Loops three times for x, y, z
+            positionSim.append(self.convert(i, positionReal[i]))              # Converts current position to match simulated ranges and adds to position list
+            self.sliders[i][0].setText(f"Value: {round(positionReal[i], 2)}") # Sets slider label to current position
+            if self.sliders[i][1].value() != round(positionReal[i]):          # Checks if the slider is behind, e.g. during G-code playback
+                self.sliders[i][1].blockSignals(True)                         # Stops the slider calling updateLabel
+                self.sliders[i][1].setValue(round(positionReal[i]))           # Moves the slider to the position
+                self.sliders[i][1].blockSignals(False)
 
         self.updatePrinterPosition(positionSim) # Updates the simulated printer position with generated coordinates
-        self.sendToController(positionReal)     # Sends the real printer position with generated coordinates
+        allowed = self.moveAllowed(positionReal) # Checks the move is inside the travel and clear of the bed models
+        if allowed:
+            self.sendToController(positionReal) # Sends the real printer position with generated coordinates
+        if self.motionRecorder:                 # Checks if position updates are being recorded
+            self.motionRecorder.record(positionReal, positionSim, held=not allowed) # Queues the update for the motion log, marking moves that were never sent
 
     # Rebuilds the printer object file to be compatible with vtk
     def RebuildPrinterModel(self):
@@ -280,37 +1206,15 @@ class MainWindow(QMainWindow):
 
     # Opens originalFile, processes it to work with vtk and outputs to processedFile
     def rebuildObjectFile(self, originalFile, processedFile):
-        # Open and process input model data and opening output file
-        file = open(originalFile)      # Opens the model file as read only
-        content = file.readlines() # Reads the model file into the content variable
-        file.close()               # Closes the original model file
-        length = len(content)      # Calculates the number of lines in the variable
-
-        # Setting up threading variables
-        numThreads = int(config["SETUP"]["CPUThreads"]) # Gets the number
-        chunkSize = length // numThreads                # Calculate a chunk size relative to the number of threads being used
-        threads = []                                    # Initialises the threads list
-        outputLines = [[] for i in range(numThreads)]   # Loops to make a list of empty arrays for each thread used
-
-        # Setting up threading actions
-        for i in range(numThreads):   # Loops for each thread used
-            startLine = i * chunkSize # Calculates the start line based on the chunkSize
-            if i < numThreads - 1:    # True for every time apart from the last loop
-                endLine = (i + 1) * chunkSize # Sets the end of the chunk to the beginning of the next
-            else:                     # For the last loop
-                endLine = length      # Sets the end of the chunk to the end of the file
-            thread = threading.Thread(target=self.processChunk, args=(i, startLine, endLine, content, outputLines)) # Makes a new thead object with a target and arguments ready to run
-            threads.append(thread) # adds the thread object to the list threads
-            thread.start()         # starts all the created thread objects
-
-        # Wait for all threads to finish
-        for thread in threads: # Cycles through each thread in threads
-            thread.join() # Joins the thread to the main thread
-
-        # Write to the output file in the original order
-        with open(processedFile, "w") as output: # Makes and opens processedFile document as write only
-            for buffer in outputLines:             # Cycles through each line stored in outputBuffers
-                output.writelines(buffer)          # Writes each line to the output file
+        mtlPath = config["PRINTER_MODEL"]["3DPrinterModelDirectory"] + "\\" + self.mtlFile # Generates the relative file directory for the .mtl file
+        numProcesses = int(config["SETUP"]["CPUThreads"])                                # Gets the number of worker processes to use
+        stats = ObjectRebuild.rebuildObjectFile(originalFile, processedFile, mtlPath, numProcesses) # Streams the model file through the process pool
+
+        # Rebuild statistics printout
+        if debug: # Only shown in debug mode
+            parentPeak, workerPeak = ("n/a" if stats[key] is None else f"{stats[key]:.1f} MB" for key in ("parentPeakRSS", "workerPeakRSS")) # Peak memory may not be available on every platform
+            print(f"Rebuilt {stats['megabytes']:.1f} MB in {stats['seconds']:.2f} s ({stats['throughput']:.1f} MB/s), {stats['chunks']} chunks, "
+                  f"peak RSS {parentPeak} more in this process and {workerPeak} in the largest worker")
 
     # Generates a structured array of items in the object file
     def generateItemRanges(self):
@@ -330,24 +1234,57 @@ class MainWindow(QMainWindow):
             output.append(subOutput) # Appends subOutput to the end of output
         return output                # Returns structured array
 
-    # Function to process the printer obj to a compatible format for the vtk library
-    def processChunk(self, chunkId, startLine, endLine, content, outputLines):
-        for i in range(startLine, endLine): # Loops for each line this thread has to process
-            output = ""                     # Initialises the output variable
-            currentLine = content[i].split(" ") # Splits the line by spaces
-            if (currentLine[0] == "mtllib"):    # Checks if the first section of the current line is mtllib, relating to the material library
-                filePath = (config["PRINTER_MODEL"]["3DPrinterModelDirectory"] + "\\" + self.mtlFile) # Generates the relative file directory for the .mtl file
-                output += currentLine[0] + " " + filePath + "\n" # Re-writes the correct .mtl file in its place
-            elif (currentLine[0] == "vt"):                       # Checks if the first section of the current line is vt, relating to texture mapping
-                output += currentLine[0] + " " + currentLine[1] + " " + currentLine[2] + "\n" # Writes the vt line with the correct formating
-            else:                                     # For all other first sections, the line remains unchanged
-                for j in range(len(currentLine) - 1): # Loops for the number of sections in the current line minus one
-                    output += currentLine[j] + " "    # Builds the current line
-                output += currentLine[-1]             # Adds the end of the current line separately to remove space at the end of the line
-            outputLines[chunkId].append(output)       # Appends the output line to the outputBuffers array
+# Frame coalescing render scheduler, the scene is marked dirty on each change and rendered at most once per frame
+class RenderScheduler:
+    # Initalises the render scheduler object
+    def __init__(self, renderWindow, maxFPS):
+        self.renderWindow = renderWindow   # Render window to be rendered
+        self.frameInterval = 1.0 / maxFPS  # Minimum time in seconds between frames
+        self.timer = QTimer()              # Timer used to wait for the next frame
+        self.timer.setSingleShot(True)     # Only started when there is something to render
+        self.timer.setTimerType(Qt.PreciseTimer)      # Millisecond accurate timing
+        self.timer.timeout.connect(self.renderFrame) # Renders the frame when the timer runs out
+        self.dirty = False                 # Set when the scene has changed since the last frame
+        self.dirtySince = 0.0              # Time the scene was first marked dirty
+        self.lastFrame = -self.frameInterval # Time the last frame was rendered
+
+        # Counters
+        self.requests = 0        # Number of render requests
+        self.framesRendered = 0  # Number of frames rendered
+        self.coalescedFrames = 0 # Number of requests merged into an already pending frame
+        self.droppedFrames = 0   # Number of frame intervals missed because a render took too long
+        self.maxLatency = 0.0    # Longest time in seconds between a change and it being rendered
+
+    # Marks the scene dirty and schedules a frame, extra arguments allow this to be used as a vtk observer
+    def requestRender(self, *args):
+        self.requests += 1          # Counts the request
+        if self.dirty:              # A frame is already pending
+            self.coalescedFrames += 1 # The change will be drawn by the pending frame
+            return
+        self.dirty = True                      # Marks the scene as changed
+        self.dirtySince = time.perf_counter()  # Records when the change was made
+        wait = self.lastFrame + self.frameInterval - self.dirtySince # Time left until the next frame is allowed
+        self.timer.start(max(0, int(wait * 1000)))                   # Renders straight away if the last frame was long enough ago
+
+    # Renders the newest state of the scene
+    def renderFrame(self):
+        if not self.dirty:          # Nothing has changed
+            return
+        self.dirty = False          # Cleared before rendering so changes made during the render get their own frame
+        start = time.perf_counter() # Frame start time
+        self.maxLatency = max(self.maxLatency, start - self.dirtySince) # Tracks the worst latency
+        self.renderWindow.Render()  # Renders the scene
+        self.lastFrame = start      # Frame timing is measured from the start of the render
+        self.framesRendered += 1    # Counts the frame
+        self.droppedFrames += int((time.perf_counter() - start) // self.frameInterval) # Frames that could not be shown while rendering
+
+    # Returns the scheduler counters
+    def getStatistics(self):
+        return {"requests": self.requests, "framesRendered": self.framesRendered, "coalescedFrames": self.coalescedFrames,
+                "droppedFrames": self.droppedFrames, "maxLatency": self.maxLatency}
 
 # Custom interactor style class
-class CustomInteractorStyle(vtk.vtkInteractorStyleTrackballCamera):
+class CustomInteractorStyle(vtkInteractorStyleTrackballCamera):
     # Initalises the custom interactor style object
     def __init__(self, parent=None):
         # Listen setup events and initial parameters
@@ -356,9 +1293,18 @@ class CustomInteractorStyle(vtk.vtkInteractorStyleTrackballCamera):
         self.AddObserver("MouseWheelForwardEvent", self.mouseWheelForwardEvent)     # Add event listener for mouse scroll forward
         self.AddObserver("MouseWheelBackwardEvent", self.mouseWheelBackwardEvent)   # Add event listener for mouse scroll backward
         self.AddObserver("MouseMoveEvent", self.mouseMoveEvent)                     # Add event listener for mouse movement
+        self.AddObserver("LeftButtonPressEvent", self.leftButtonPressEvent)         # Add event listener for left mouse button pressed
         self.isPanning = False  # Set panning to false
         self.isRotating = False # Set rotating to false
 
+    # Left mouse button press method, picks printer items during the printer model setup and rotates otherwise
+    def leftButtonPressEvent(self, obj, event):
+        if mainWin.itemsSetup:     # Checks if the printer model setup is running
+            mainWin.pickSetupItem(*self.GetInteractor().GetEventPosition()) # Picks the item under the mouse
+        else:
+            self.OnLeftButtonDown() # Default trackball behaviour
+        return
+
     # Middle mouse button press method
     def middleButtonPressEvent(self, obj, event):
         if self.GetInteractor().GetShiftKey(): # Check if shift is pressed
@@ -367,6 +1313,7 @@ class CustomInteractorStyle(vtk.vtkInteractorStyleTrackballCamera):
         else:                      # If shift not pressed
             self.isPanning = True  # Sets panning to true
             self.StartPan()        # Starts panning object
+        mainWin.startInteraction() # Draws a coarser printer model while dragging
         return
 
     # Middle mouse button release method
@@ -377,6 +1324,7 @@ class CustomInteractorStyle(vtk.vtkInteractorStyleTrackballCamera):
         if self.isRotating:         # Checks if rotating
             self.isRotating = False # Sets rotating to false
             self.EndRotate()        # End rotate
+        mainWin.endInteraction()    # Returns to full detail
         return
 
     # Mouse move method
@@ -391,17 +1339,26 @@ class CustomInteractorStyle(vtk.vtkInteractorStyleTrackballCamera):
         # Mouse wheel forward method
     def mouseWheelForwardEvent(self, obj, event):
         camera = self.GetInteractor().GetRenderWindow().GetRenderers().GetFirstRenderer().GetActiveCamera() # Get active camera from render window
-        camera.Zoom(1.1111)                             # Zoom in
-        self.GetInteractor().GetRenderWindow().Render() # Update renderer
+        camera.Zoom(1.1111)          # Zoom in
+        self.GetInteractor().Render() # Update renderer through the render scheduler
         return
 
     # Mouse wheel backward method
     def mouseWheelBackwardEvent(self, obj, event):
         camera = self.GetInteractor().GetRenderWindow().GetRenderers().GetFirstRenderer().GetActiveCamera() # Get active camera from render window
-        camera.Zoom(0.9)                                # Zoom out
-        self.GetInteractor().GetRenderWindow().Render() # Update renderer
+        camera.Zoom(0.9)             # Zoom out
+        self.GetInteractor().Render() # Update renderer through the render scheduler
         return
 
+# Sets the x, y, and z axis transforms to a simulated position
+def setAxisTranslations(axisTransforms, position):
+    translations = [(position[0], 0, position[2]), # Extruder movement ± X and ± Z
+                    (0, position[1], 0),           # Bed movement ± Y
+                    (0, 0, position[2])]           # Gantry movement ± Z
+    for transform, translation in zip(axisTransforms, translations): # Loops for each axis transform
+        transform.Identity()             # Clears the previous translation
+        transform.Translate(translation) # Translates every actor on this axis at once
+
 # Reads and runs setup for the config variable
 def getConfig(configFile): # Runs the config setup for the program
     # Config setup
@@ -413,12 +1370,13 @@ def getConfig(configFile): # Runs the config setup for the program
     debug = int(config["SETUP"]["DEBUG"]) # Sets the debug variable to the integer value in the config file
 
     # Lists the config file to the user
+    lines = []                # Config listing, printed in one write so startup carries straight on
     for section in config:    # Loops for each section in the config file
-        print(f"[{section}]") # Prints the section name for each section
+        lines.append(f"[{section}]") # Adds the section name for each section
         for key, value in config[section].items():  # Loops for each value in the section
-            print(f"{key} = {value}")               # Prints the key and value for each value
-        print()                                     # This adds empty line for better readability
-    time.sleep(int(config["SETUP"]["configDelay"])) # Waits for defined time to let the user read the config
+            lines.append(f"{key} = {value}")        # Adds the key and value for each value
+        lines.append("")                            # This adds empty line for better readability
+    print("\n".join(lines), flush=True)            # Prints the config without waiting for the user to read it
 
 # Main function of the script
 def main():
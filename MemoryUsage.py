@@ -0,0 +1,54 @@
+# Importing all required libraries
+import os
+import sys
+
+# Returns the peak resident memory in MB of this process, or None if unavailable
+def getPeakRSS():
+    try:
+        import resource # Only available on unix platforms
+    except ImportError:
+        return getPeakRSSWindows()
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * maxRSSScale()
+
+# Returns the largest peak resident memory in MB of any finished worker process, or None if unavailable (windows)
+# This is the peak of the single largest worker, not a total, as the processes do not all peak at the same time
+def getWorkerPeakRSS():
+    try:
+        import resource # Only available on unix platforms
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * maxRSSScale()
+
+# Returns the factor that turns ru_maxrss into MB, it is in bytes on macOS and KB on linux
+def maxRSSScale():
+    return 1 / (1024 * 1024) if sys.platform == "darwin" else 1 / 1024
+
+# Windows fallback for getPeakRSS, only covers this process
+def getPeakRSSWindows():
+    try:
+        import ctypes
+        from ctypes import wintypes
+    except ImportError:
+        return None
+
+    class ProcessMemoryCounters(ctypes.Structure): # Mirrors the PROCESS_MEMORY_COUNTERS structure
+        _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+    counters = ProcessMemoryCounters()           # Structure to be filled in by windows
+    counters.cb = ctypes.sizeof(counters)        # Windows requires the structure size to be set
+    process = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+        return None
+    return counters.PeakWorkingSetSize / (1024 * 1024)
+
+# Returns the current memory of this process in MB, read from /proc on linux, None where that is not available
+def getCurrentRSS():
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024) # Resident pages
+    except (OSError, ValueError, AttributeError):
+        return None
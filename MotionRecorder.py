@@ -0,0 +1,114 @@
+# Importing all required libraries
+import os
+import time
+import threading
+from collections import deque
+import numpy as np
+
+# Layout of a motion log, a header followed by one fixed size record per position update
+headerRecord = np.dtype([("magic", "S8"), ("version", np.uint32), ("recordSize", np.uint32), ("created", np.float64)])
+motionRecord = np.dtype([("time", np.float64),           # Wall clock time of the update in seconds since the epoch
+                         ("real", np.float64, 3),        # Real x, y, z position sent to the controller
+                         ("simulated", np.float64, 3),   # Simulated x, y, z position shown in the visualiser
+                         ("held", np.bool_)])            # Set if the position was held back from the controller by the collision check
+magic = b"PGMOTION" # Marks a file as a motion log
+version = 2         # Raised whenever the record layout changes
+
+# Appends position updates to a motion log, records are queued by the GUI and written in batches on a background thread
+class MotionRecorder:
+    # Initalises the recorder, opening fileName and writing its header if it is a new file
+    def __init__(self, fileName, batchSize=1024, flushSeconds=1.0):
+        self.fileName = fileName         # Motion log file
+        self.batchSize = batchSize       # Records queued before the writer thread is woken early
+        self.flushSeconds = flushSeconds # Longest time a record waits before it is written
+        self.condition = threading.Condition() # Lock and wake up signal shared by the GUI and writer thread
+        self.pending = deque()           # Records not yet written, only accessed while holding self.condition
+        self.written = 0                 # Number of records written to the file
+        self.running = False             # Set while the writer thread should keep running
+        newFile = not os.path.exists(fileName) or os.path.getsize(fileName) == 0
+        if not newFile:
+            readHeader(fileName)         # Only appends to a log with the same record layout
+        self.file = open(fileName, "ab")
+        if newFile:
+            self.file.write(np.array([(magic, version, motionRecord.itemsize, time.time())], dtype=headerRecord).tobytes())
+            self.file.flush()
+
+    # Starts the writer thread
+    def start(self):
+        self.running = True
+        self.writerThread = threading.Thread(target=self.writeLoop, daemon=True) # Daemon thread never keeps the program open
+        self.writerThread.start()
+
+    # Writes every queued record, stops the writer thread and closes the file
+    def stop(self):
+        with self.condition:
+            self.running = False        # Tells the writer thread to finish
+            self.condition.notify()     # Wakes the writer thread
+        self.writerThread.join()
+        self.file.close()
+
+    # Queues one position update, this never blocks the GUI on the disk
+    def record(self, real, simulated, held=False):
+        entry = (time.time(), tuple(real), tuple(simulated), held)
+        with self.condition:
+            self.pending.append(entry)
+            if len(self.pending) >= self.batchSize: # A full batch is written straight away
+                self.condition.notify()
+
+    # Writer thread, writes the queued records once a batch is full or flushSeconds has passed
+    def writeLoop(self):
+        while True:
+            with self.condition:
+                if self.running and len(self.pending) < self.batchSize:
+                    self.condition.wait(self.flushSeconds) # Woken early by a full batch or stop
+                batch = list(self.pending)
+                self.pending.clear()
+                running = self.running
+            if batch:                    # Written outside the lock so the GUI can keep queueing
+                self.file.write(np.array(batch, dtype=motionRecord).tobytes())
+                self.file.flush()
+                self.written += len(batch)
+            if not running:              # Every queued record has been written
+                return
+
+# Reads and checks the header of a motion log, raising ValueError if the file is not a motion log this version can read
+def readHeader(fileName):
+    header = np.fromfile(fileName, dtype=headerRecord, count=1)
+    if len(header) == 0 or header[0]["magic"] != magic:
+        raise ValueError(f"{fileName} is not a motion log")
+    if header[0]["version"] != version or header[0]["recordSize"] != motionRecord.itemsize:
+        raise ValueError(f"{fileName} is motion log version {header[0]['version']}, only version {version} can be read")
+    return header[0]
+
+# Returns the records of a motion log as a memory mapped structured array, only the pages read are loaded however long the log
+def loadRecording(fileName):
+    readHeader(fileName)
+    count = (os.path.getsize(fileName) - headerRecord.itemsize) // motionRecord.itemsize # A record cut short by a crash is left out
+    if count == 0:                       # np.memmap cannot map an empty array
+        return np.zeros(0, dtype=motionRecord)
+    return np.memmap(fileName, dtype=motionRecord, mode="r", offset=headerRecord.itemsize, shape=(count,))
+
+# Plays back a motion log, finding the position at any time with a binary search on the record times
+class MotionReplay:
+    # Initalises the replay at the start of records
+    def __init__(self, records):
+        self.records = records
+        self.times = records["time"]     # Record times, in order as they were written
+        self.startTime = float(self.times[0]) if len(records) else 0.0
+        self.endTime = float(self.times[-1]) if len(records) else 0.0
+        self.time = self.startTime       # Current replay time
+        self.finished = len(records) == 0 # Set once the replay reaches the end of the log
+
+    # Returns the index of the newest record at or before time
+    def indexAt(self, time):
+        return max(int(np.searchsorted(self.times, time, side="right")) - 1, 0)
+
+    # Jumps the replay to time and returns the record there
+    def seek(self, time):
+        self.time = min(max(time, self.startTime), self.endTime)
+        self.finished = self.time >= self.endTime
+        return self.records[self.indexAt(self.time)]
+
+    # Moves the replay on by seconds of recorded time and returns the record there
+    def advance(self, seconds):
+        return self.seek(self.time + seconds)
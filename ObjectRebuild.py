@@ -0,0 +1,67 @@
+# Importing all required libraries
+import os
+import re
+import mmap
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from MemoryUsage import getPeakRSS, getWorkerPeakRSS
+
+# Line patterns that need rewriting for the vtk .obj importer
+vtLine = re.compile(rb"(\nvt [^ \r\n]* [^ \r\n]*) [^\r\n]*") # Texture coordinate lines with extra values, only the first two values are kept
+mtllibLine = re.compile(rb"\nmtllib [^\r\n]*")                 # Material library lines, replaced with the correct .mtl path
+
+# Splits the file into byte ranges of roughly chunkSize that start and end on line boundaries
+def findChunkRanges(fileName, chunkSize):
+    fileSize = os.path.getsize(fileName) # Gets the size of the file in bytes
+    ranges = []                          # Initialises the ranges list
+    if fileSize == 0:                    # An empty file has nothing to split
+        return ranges
+
+    with open(fileName, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data: # Memory maps the file so only the scanned pages are read
+        start = 0                                               # First chunk starts at the beginning of the file
+        while start < fileSize:                                 # Loops until the whole file is covered
+            end = data.find(b"\n", min(start + chunkSize, fileSize) - 1) # Finds the end of the line the chunk boundary falls on
+            end = fileSize if end == -1 else end + 1            # Includes the newline, or runs to the end of the file for the last line
+            ranges.append((start, end))                         # Adds the byte range to the list
+            start = end                                         # Next chunk starts straight after this one
+    return ranges # Returns the list of (start, end) byte ranges
+
+# Process pool worker, rewrites the mtllib and vt lines of one byte range of the file
+def processChunk(fileName, start, end, mtlPath):
+    with open(fileName, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data: # Each worker maps the file itself so no data is sent between processes
+        chunk = data[start:end] # Copies only this worker's byte range out of the map
+
+    # The patterns match on the preceding newline as a literal prefix is far quicker to search for than a line anchor
+    chunk = b"\n" + chunk                     # Gives the first line of the chunk a preceding newline to match on
+    if b"\nmtllib " in chunk:                 # The material library is normally only named once in the file
+        mtllib = b"\nmtllib " + mtlPath.encode()          # Replacement material library line
+        chunk = mtllibLine.sub(lambda match: mtllib, chunk) # Re-writes the correct .mtl file in place of the original
+    chunk = vtLine.sub(lambda match: match.group(1), chunk) # Writes the vt lines with the correct formatting
+    return chunk[1:]                                        # Removes the added newline
+
+# Opens originalFile, processes it to work with vtk and streams it to processedFile, returning throughput statistics
+def rebuildObjectFile(originalFile, processedFile, mtlPath, numProcesses, chunkSize=8 * 1024 * 1024):
+    startTime = time.perf_counter()                       # Start time for the throughput calculation
+    basePeakRSS = getPeakRSS()                            # Peak memory of this process before the rebuild
+    ranges = findChunkRanges(originalFile, chunkSize)     # Byte ranges aligned to line boundaries
+    maxPending = numProcesses * 2                         # Limits how many processed chunks can be held in memory at once
+
+    with ProcessPoolExecutor(max_workers=numProcesses) as executor, open(processedFile, "wb") as output:
+        pending = deque()                                 # Chunks submitted but not yet written, in file order
+        for start, end in ranges:                         # Loops for each chunk of the file
+            pending.append(executor.submit(processChunk, originalFile, start, end, mtlPath)) # Queues the chunk on the process pool
+            if len(pending) >= maxPending:                # Once enough chunks are in flight
+                output.write(pending.popleft().result())  # Waits for and writes the oldest chunk to keep the original order
+        while pending:                                    # Writes out the remaining chunks
+            output.write(pending.popleft().result())
+
+    # Throughput statistics
+    seconds = time.perf_counter() - startTime             # Total time taken
+    megabytes = os.path.getsize(originalFile) / (1024 * 1024) # Size of the original model file in MB
+    return {"megabytes": megabytes,
+            "seconds": seconds,
+            "throughput": megabytes / seconds if seconds > 0 else 0.0, # MB/s
+            "parentPeakRSS": None if basePeakRSS is None else getPeakRSS() - basePeakRSS, # MB the rebuild raised this process's peak by, or None if unavailable
+            "workerPeakRSS": getWorkerPeakRSS(),          # MB of the largest worker process, or None if unavailable
+            "chunks": len(ranges)}
@@ -0,0 +1,42 @@
+# Importing all required libraries
+import math
+from vtkmodules.vtkCommonTransforms import vtkTransform
+from vtkmodules.vtkRenderingCore import vtkActor
+
+# Returns the offset of each of count printers laid out in a square grid, spacing apart in x and y, the first printer stays where it is
+def gridOffsets(count, spacing):
+    columns = math.ceil(math.sqrt(count)) # Printers per row
+    return [((i % columns) * spacing[0], (i // columns) * spacing[1], 0) for i in range(count)]
+
+# One printer of the farm, drawing the shared printer model mappers and materials through its own transforms
+class PrinterInstance:
+    # Initalises the printer instance at the given offset from the main printer
+    def __init__(self, offset):
+        self.placement = vtkTransform()   # Moves the whole printer to its place in the farm
+        self.placement.Translate(offset)
+        self.axisTransforms = [vtkTransform() for direction in range(3)] # This printer's x, y, and z transforms
+        self.levels = []                  # Actors of each detail level
+        self.player = None                # G-code player feeding this printer's position, None when idle
+        self.queue = []                   # G-code files to play on this printer once the current one finishes
+        self.lastPlaybackTime = 0.0       # Time of the last playback step
+
+    # Adds actors sharing the mappers and materials of each detail level's drawn actors, levels holds the item, drawn and axis actors of each level
+    def addLevels(self, levels):
+        for actors, drawnActors, axisActors in levels: # Loops for each detail level
+            actorAxis = {actor: axis for axis, axisList in enumerate(axisActors) for actor in axisList} # Axis of each moving actor
+            levelActors = []              # This printer's actors for the level
+            for template in drawnActors:  # Loops for each actor of the main printer
+                actor = vtkActor()
+                actor.SetMapper(template.GetMapper())     # Geometry and its graphics buffers are shared, not copied
+                actor.SetProperty(template.GetProperty()) # Material is shared too
+                actor.SetVisibility(template.GetVisibility())
+                axis = actorAxis.get(template)
+                if axis is None:          # Static actor, only placed
+                    actor.SetUserTransform(self.placement)
+                else:                     # Moving actor, placed then moved by its axis
+                    transform = vtkTransform()
+                    transform.Concatenate(self.placement) # Concatenated transforms follow later changes to either one
+                    transform.Concatenate(self.axisTransforms[axis])
+                    actor.SetUserTransform(transform)
+                levelActors.append(actor)
+            self.levels.append(levelActors)
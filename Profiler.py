@@ -0,0 +1,98 @@
+# Importing all required libraries
+import os
+import json
+import time
+import functools
+import threading
+import numpy as np
+
+# Times named stages of the program into a fixed size ring buffer, the oldest samples are overwritten once it is full
+class Profiler:
+    # Initalises the profiler with room for capacity samples
+    def __init__(self, capacity=65536):
+        self.capacity = capacity                    # Samples kept
+        self.starts = np.zeros(capacity)            # perf_counter time each sample started
+        self.durations = np.zeros(capacity)         # Seconds each sample took
+        self.stages = np.zeros(capacity, dtype=np.int32)  # Stage number of each sample
+        self.threads = np.zeros(capacity, dtype=np.int64) # Thread each sample ran on, the model loads on its own thread
+        self.count = 0                              # Samples recorded since the start, the next sample goes at count % capacity
+        self.names = []                             # Name of each stage number
+        self.lock = threading.Lock()                # The GUI and model threads both record samples
+        self.origin = time.perf_counter()           # Trace timestamps are measured from here
+
+    # Returns the stage number of a stage name, adding it if it is new
+    def stageNumber(self, name):
+        with self.lock:
+            if name not in self.names:
+                self.names.append(name)
+            return self.names.index(name)
+
+    # Adds one sample of a stage that started at start and took seconds
+    def record(self, stage, start, seconds):
+        with self.lock:
+            index = self.count % self.capacity # Ring buffer position
+            self.starts[index] = start
+            self.durations[index] = seconds
+            self.stages[index] = stage
+            self.threads[index] = threading.get_ident()
+            self.count += 1
+
+    # Returns function wrapped so each call is recorded as a sample of the named stage
+    def wrap(self, function, name):
+        stage = self.stageNumber(name)
+        record, clock = self.record, time.perf_counter # Looked up once rather than on every call
+
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(stage, start, clock() - start)
+        return timed
+
+    # Replaces each named method of owner with a timed one, only the owner object is changed and not its class
+    def instrument(self, owner, methodNames):
+        for name in methodNames:    # Loops for each method to time
+            setattr(owner, name, self.wrap(getattr(owner, name), name)) # Instance attributes are found before the class's methods
+
+    # Returns the stage, start, duration and thread arrays of the samples held, oldest first
+    def samples(self):
+        with self.lock:
+            held = min(self.count, self.capacity)  # Samples in the buffer
+            order = (np.arange(held) + self.count - held) % self.capacity # Buffer positions from oldest to newest
+            return self.stages[order], self.starts[order], self.durations[order], self.threads[order]
+
+    # Returns the p50 and p99 in seconds and the call count of each stage in the buffer, and the frames per second over the last second
+    def summary(self):
+        stages, starts, durations, threads = self.samples()
+        rows = []                   # Name, p50, p99 and count of each stage with samples
+        for stage, name in enumerate(list(self.names)): # Loops for each stage
+            stageDurations = durations[stages == stage]
+            if len(stageDurations):
+                p50, p99 = np.percentile(stageDurations, [50, 99])
+                rows.append((name, p50, p99, len(stageDurations)))
+        fps = 0.0
+        if "Render" in self.names:  # Frames are the Render samples
+            fps = float(np.count_nonzero((stages == self.names.index("Render")) & (starts > time.perf_counter() - 1))) # Frames started in the last second
+        return rows, fps
+
+    # Returns the summary as a text table for the on screen overlay
+    def summaryText(self):
+        rows, fps = self.summary()
+        lines = [f"{'Stage':<22}{'p50 ms':>9}{'p99 ms':>9}{'calls':>8}"]
+        for name, p50, p99, count in rows:
+            lines.append(f"{name:<22}{p50 * 1000:>9.2f}{p99 * 1000:>9.2f}{count:>8}")
+        lines.append(f"FPS {fps:.1f}")
+        return "\n".join(lines)
+
+    # Writes the samples held as a Chrome trace JSON file, which can be opened in chrome://tracing or Perfetto
+    def exportChromeTrace(self, fileName):
+        stages, starts, durations, threads = self.samples()
+        threadNumbers = {thread: i for i, thread in enumerate(np.unique(threads).tolist())} # Short thread ids for the trace viewer
+        events = [{"name": self.names[stage], "ph": "X", "pid": os.getpid(), "tid": threadNumbers[thread],
+                   "ts": (start - self.origin) * 1e6, "dur": duration * 1e6} # Complete events, times are in microseconds
+                  for stage, start, duration, thread in zip(stages.tolist(), starts.tolist(), durations.tolist(), threads.tolist())]
+        with open(fileName, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+        return len(events)
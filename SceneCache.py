@@ -0,0 +1,163 @@
+# Importing all required libraries
+import os
+import json
+import shutil
+import hashlib
+import numpy as np
+from vtkmodules.vtkCommonCore import vtkPoints
+from vtkmodules.vtkCommonDataModel import vtkPolyData, vtkCellArray
+from vtkmodules.vtkRenderingCore import vtkActor, vtkPolyDataMapper
+from vtkmodules.util import numpy_support # Conversion between NumPy and vtk arrays
+
+cacheVersion = 1 # Increase when the stored layout changes so older caches are rebuilt
+
+# Per actor record, holding where the actor's data sits in the shared arrays and its material
+actorRecord = np.dtype([("pointStart", np.int64), ("pointEnd", np.int64),   # Rows of points.npy (and normals.npy) used by the actor
+                        ("offsetStart", np.int64), ("offsetEnd", np.int64), # Entries of offsets.npy used by the actor, one more than its cell count
+                        ("connectivityStart", np.int64), ("connectivityEnd", np.int64), # Entries of connectivity.npy used by the actor
+                        ("hasNormals", np.bool_),                           # Whether the actor's rows of normals.npy are valid
+                        ("diffuseColor", np.float64, 3), ("ambientColor", np.float64, 3), ("specularColor", np.float64, 3),
+                        ("diffuse", np.float64), ("ambient", np.float64), ("specular", np.float64),
+                        ("specularPower", np.float64), ("opacity", np.float64), ("visible", np.bool_)])
+
+# Generates the cache key from the contents of the given files, reusing the last hash while their size and modified time are unchanged
+def hashFiles(fileNames, stampFile):
+    stamps = [[os.path.abspath(name), os.path.getsize(name), os.path.getmtime(name)] for name in fileNames] # Size and modified time of each file
+
+    # Reuses the previous hash if none of the files have changed
+    if os.path.exists(stampFile):                   # Checks for a previous stamp
+        with open(stampFile) as file:
+            previous = json.load(file)              # Reads the previous stamp
+        if previous["stamps"] == stamps and previous["version"] == cacheVersion:
+            return previous["hash"]                 # Files are unchanged so the hash is too
+
+    # Hashes the file contents in blocks so large models are never held in memory
+    digest = hashlib.blake2b(digest_size=16)        # Fast hash, 16 bytes is plenty for a cache key
+    digest.update(str(cacheVersion).encode())       # Includes the cache layout version in the key
+    for name in fileNames:                          # Loops for each file
+        with open(name, "rb") as file:
+            for block in iter(lambda: file.read(1024 * 1024), b""): # Reads the file 1 MB at a time
+                digest.update(block)
+    key = digest.hexdigest()                        # Hex string used as the cache directory name
+
+    # Saves the stamp for the next launch
+    os.makedirs(os.path.dirname(stampFile) or ".", exist_ok=True)
+    with open(stampFile, "w") as file:
+        json.dump({"version": cacheVersion, "stamps": stamps, "hash": key}, file)
+    return key
+
+# Checks if a complete cache exists in cacheDir
+def isCached(cacheDir):
+    return os.path.exists(os.path.join(cacheDir, "actors.npy")) # actors.npy is written last so its presence means the cache is complete
+
+# Stores the geometry, materials and order of the given actors in cacheDir
+def saveScene(cacheDir, actors):
+    points, normals, connectivity, offsets = [], [], [], [] # Per actor arrays to be joined
+    records = np.zeros(len(actors), dtype=actorRecord)      # Per actor records
+    pointCount = 0  # Running total of stored points
+    offsetCount = 0 # Running total of stored offsets
+    connectivityCount = 0 # Running total of stored connectivity entries
+
+    for i, actor in enumerate(actors):           # Loops for each actor in render order
+        polyData = actor.GetMapper().GetInput()  # Gets the geometry of the actor
+        cellOffsets = numpy_support.vtk_to_numpy(polyData.GetPolys().GetOffsetsArray()).astype(np.int64)
+        cellConnectivity = numpy_support.vtk_to_numpy(polyData.GetPolys().GetConnectivityArray())
+
+        # The importer gives every actor the whole model's points, so only the points the actor's cells use are kept
+        used, cellConnectivity = np.unique(cellConnectivity, return_inverse=True) # Used point ids and the connectivity renumbered to match
+        numPoints = len(used)                    # Number of points in the actor
+        if numPoints:                            # Empty nets have no point array
+            points.append(numpy_support.vtk_to_numpy(polyData.GetPoints().GetData())[used].astype(np.float32))
+        vtkNormals = polyData.GetPointData().GetNormals() # Normals are optional in an .obj file
+        hasNormals = vtkNormals is not None and numPoints > 0
+        normals.append(numpy_support.vtk_to_numpy(vtkNormals)[used].astype(np.float32) if hasNormals else np.zeros((numPoints, 3), np.float32))
+        offsets.append(cellOffsets if len(cellOffsets) else np.zeros(1, np.int64)) # An empty cell array still needs its leading zero offset
+        connectivity.append(cellConnectivity.astype(np.int64).reshape(-1))
+
+        # Record
+        prop = actor.GetProperty() # Gets the material of the actor
+        records[i] = (pointCount, pointCount + numPoints, offsetCount, offsetCount + len(offsets[-1]),
+                      connectivityCount, connectivityCount + len(connectivity[-1]), hasNormals,
+                      prop.GetDiffuseColor(), prop.GetAmbientColor(), prop.GetSpecularColor(),
+                      prop.GetDiffuse(), prop.GetAmbient(), prop.GetSpecular(),
+                      prop.GetSpecularPower(), prop.GetOpacity(), actor.GetVisibility())
+        pointCount += numPoints
+        offsetCount += len(offsets[-1])
+        connectivityCount += len(connectivity[-1])
+
+    # Writes the arrays into a temporary directory then swaps it into place so a partial cache is never read
+    tempDir = cacheDir + ".tmp"
+    shutil.rmtree(tempDir, ignore_errors=True)
+    os.makedirs(tempDir)
+    np.save(os.path.join(tempDir, "points.npy"), np.concatenate(points) if points else np.zeros((0, 3), np.float32))
+    np.save(os.path.join(tempDir, "normals.npy"), np.concatenate(normals) if normals else np.zeros((0, 3), np.float32))
+    np.save(os.path.join(tempDir, "connectivity.npy"), np.concatenate(connectivity) if connectivity else np.zeros(0, np.int64))
+    np.save(os.path.join(tempDir, "offsets.npy"), np.concatenate(offsets) if offsets else np.zeros(0, np.int64))
+    np.save(os.path.join(tempDir, "actors.npy"), records)
+    shutil.rmtree(cacheDir, ignore_errors=True)
+    os.replace(tempDir, cacheDir)
+
+# Removes every cache in the parent directory of cacheDir apart from cacheDir itself
+def removeStaleCaches(cacheDir):
+    parent = os.path.dirname(cacheDir) or "."     # Directory holding all the caches
+    for name in os.listdir(parent):               # Loops for each entry in the directory
+        path = os.path.join(parent, name)
+        if os.path.isdir(path) and os.path.abspath(path) != os.path.abspath(cacheDir):
+            shutil.rmtree(path, ignore_errors=True) # Deletes the old cache
+
+# Memory maps the arrays stored in cacheDir, returning the points, normals, connectivity, offsets and actor records
+def loadArrays(cacheDir):
+    def load(name): # Memory maps one of the cache arrays, copy on write so vtk is free to use the memory
+        try:
+            return np.load(os.path.join(cacheDir, name), mmap_mode="c")
+        except ValueError:                                   # Empty arrays cannot be memory mapped
+            return np.load(os.path.join(cacheDir, name))
+    return load("points.npy"), load("normals.npy"), load("connectivity.npy"), load("offsets.npy"), np.load(os.path.join(cacheDir, "actors.npy"))
+
+# Builds a polygon vtkPolyData around the given arrays without copying them, normals may be None
+def makePolyData(points, normals, offsets, connectivity):
+    polyData = vtkPolyData() # Geometry container
+    actorPoints = vtkPoints()
+    actorPoints.SetData(numpy_support.numpy_to_vtk(points, deep=False))
+    polyData.SetPoints(actorPoints)
+    if normals is not None:
+        polyData.GetPointData().SetNormals(numpy_support.numpy_to_vtk(normals, deep=False))
+    cells = vtkCellArray()
+    cells.SetData(numpy_support.numpy_to_vtkIdTypeArray(offsets, deep=False),
+                  numpy_support.numpy_to_vtkIdTypeArray(connectivity, deep=False))
+    polyData.SetPolys(cells)
+    return polyData
+
+# Builds an actor drawing polyData with the material stored in record
+def makeActor(polyData, record):
+    mapper = vtkPolyDataMapper()
+    mapper.SetInputData(polyData)
+    actor = vtkActor()
+    actor.SetMapper(mapper)
+    prop = actor.GetProperty()
+    prop.SetDiffuseColor(record["diffuseColor"])
+    prop.SetAmbientColor(record["ambientColor"])
+    prop.SetSpecularColor(record["specularColor"])
+    prop.SetDiffuse(record["diffuse"])
+    prop.SetAmbient(record["ambient"])
+    prop.SetSpecular(record["specular"])
+    prop.SetSpecularPower(record["specularPower"])
+    prop.SetOpacity(record["opacity"])
+    actor.SetVisibility(bool(record["visible"]))
+    return actor
+
+# Loads the actors stored in cacheDir, the arrays are memory mapped and shared with vtk without copying
+# Only the actors in items are built if given, the rest of the list is None
+def loadScene(cacheDir, items=None):
+    points, normals, connectivity, offsets, records = loadArrays(cacheDir)
+    actors = []                 # Initialises the actors list
+    for i, record in enumerate(records): # Loops for each actor in render order
+        if items is not None and i not in items: # Skips actors that are not wanted
+            actors.append(None)
+            continue
+        pointStart, pointEnd = record["pointStart"], record["pointEnd"]
+        polyData = makePolyData(points[pointStart:pointEnd], normals[pointStart:pointEnd] if record["hasNormals"] else None,
+                                offsets[record["offsetStart"]:record["offsetEnd"]],
+                                connectivity[record["connectivityStart"]:record["connectivityEnd"]])
+        actors.append(makeActor(polyData, record))
+    return actors
@@ -0,0 +1,67 @@
+# Importing all required libraries
+import numpy as np
+from vtkmodules.util import numpy_support # Conversion between NumPy and vtk arrays
+import SceneCache
+
+# Returns the material of an item's cache record as a hashable key, items with the same key can be drawn as one
+def materialKey(record):
+    return (tuple(record["diffuseColor"]), tuple(record["ambientColor"]), tuple(record["specularColor"]),
+            float(record["diffuse"]), float(record["ambient"]), float(record["specular"]),
+            float(record["specularPower"]), float(record["opacity"]), bool(record["hasNormals"])) # Shading differs with and without normals
+
+# Merges the polygons of the given items into one actor, the ItemIndex cell array holds the item each cell came from
+def mergeItems(arrays, items):
+    points, normals, connectivity, offsets, records = arrays # Memory mapped cache arrays
+    itemPoints, itemNormals, itemOffsets, itemConnectivity, itemIndex = [], [], [np.zeros(1, np.int64)], [], [] # Per item arrays to be joined
+    pointCount = 0        # Running total of merged points
+    connectivityCount = 0 # Running total of merged connectivity entries
+    for item in items:    # Loops for each item in the original order
+        record = records[item]
+        pointStart, pointEnd = record["pointStart"], record["pointEnd"]
+        cellOffsets = offsets[record["offsetStart"]:record["offsetEnd"]]
+        cellConnectivity = connectivity[record["connectivityStart"]:record["connectivityEnd"]]
+        itemPoints.append(points[pointStart:pointEnd])
+        itemNormals.append(normals[pointStart:pointEnd])
+        itemOffsets.append(cellOffsets[1:] + connectivityCount) # Leading zero is shared, the rest move past the earlier items
+        itemConnectivity.append(cellConnectivity + pointCount)  # Point ids move past the earlier items' points
+        itemIndex.append(np.full(len(cellOffsets) - 1, item, dtype=np.int32))
+        pointCount += pointEnd - pointStart
+        connectivityCount += len(cellConnectivity)
+
+    # Merged actor, items are grouped by whether they have normals so every item has them or none do
+    polyData = SceneCache.makePolyData(np.concatenate(itemPoints), np.concatenate(itemNormals) if records[items[0]]["hasNormals"] else None,
+                                       np.concatenate(itemOffsets), np.concatenate(itemConnectivity))
+    itemArray = numpy_support.numpy_to_vtk(np.concatenate(itemIndex), deep=False)
+    itemArray.SetName("ItemIndex")             # Maps a picked cell back to the original item
+    polyData.GetCellData().AddArray(itemArray) # Added rather than set as scalars so it never colours the actor
+    return SceneCache.makeActor(polyData, records[items[0]]) # Every item in the group has this material
+
+# Loads the scene in cacheDir with the items merged into one actor per material for each group of items that move together
+# axisItems holds the items of each axis, every other item is static, hidden items stay as their own actors
+# Returns the actor of each item (None for merged items), the list of actors to draw and the actors of each axis
+def loadMergedScene(cacheDir, axisItems):
+    arrays = SceneCache.loadArrays(cacheDir) # Memory mapped cache arrays
+    itemAxis = {item: axis for axis, items in enumerate(axisItems) for item in items} # Axis of each moving item
+    separate = set() # Items drawn as their own actor
+    groups = {}      # Items grouped by axis and material, static items use the axis after the last
+    for item, record in enumerate(arrays[4]): # Loops for each item record
+        if not record["visible"]:             # Hidden items keep their own visibility
+            separate.add(item)
+        else:
+            groups.setdefault((itemAxis.get(item, len(axisItems)), materialKey(record)), []).append(item)
+    actors = SceneCache.loadScene(cacheDir, separate) # Only the separate items get their own vtk objects
+    axisActors = [[actors[item] for item in sorted(items) if item in separate] for items in axisItems] # Hidden moving items still follow their axis
+    drawnActors = [actor for actor in actors if actor is not None]
+    for (axis, key), items in groups.items(): # One actor per material for each axis and for the static items
+        actor = mergeItems(arrays, items)
+        drawnActors.append(actor)
+        if axis < len(axisItems):             # Moving group
+            axisActors[axis].append(actor)
+    return actors, drawnActors, axisActors
+
+# Returns the original item index of a picked cell, using the ItemIndex array of merged actors
+def getItemIndex(actor, cellId, actors):
+    itemArray = actor.GetMapper().GetInput().GetCellData().GetArray("ItemIndex") # Only merged actors have this array
+    if itemArray is not None:
+        return int(itemArray.GetValue(cellId))
+    return actors.index(actor) if actor in actors else None # Unmerged items are looked up directly
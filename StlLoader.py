@@ -0,0 +1,159 @@
+# Importing all required libraries
+import os
+import sys
+import time
+import numpy as np
+from vtkmodules.vtkCommonCore import vtkPoints
+from vtkmodules.vtkCommonDataModel import vtkPolyData, vtkCellArray
+from vtkmodules.vtkIOGeometry import vtkSTLReader
+from vtkmodules.util import numpy_support # Conversion between NumPy and vtk arrays
+from concurrent.futures import ProcessPoolExecutor
+from MemoryUsage import getPeakRSS
+
+# Binary STL layout, an 80 byte header and a triangle count followed by one 50 byte record per triangle
+headerSize = 84
+stlTriangle = np.dtype([("normal", "<f4", 3), ("vertices", "<f4", (3, 3)), ("attributes", "<u2")]) # Packed, no padding between records
+
+# Checks if the file is a binary STL by matching its size to the triangle count in the header
+def isBinaryStl(fileName):
+    fileSize = os.path.getsize(fileName)  # Gets the size of the file in bytes
+    if fileSize < headerSize:             # Too small to hold the header
+        return False
+    with open(fileName, "rb") as file:
+        file.seek(80)                     # Skips the header text
+        count = int(np.frombuffer(file.read(4), "<u4")[0]) # Number of triangles in the file
+    return fileSize == headerSize + count * stlTriangle.itemsize
+
+# Returns a 64 bit hash of the bits of each (n, 3) float32 corner, equal corners have equal hashes
+def hashCorners(corners):
+    bits = corners.view(np.uint32)        # Bit patterns of the coordinates, equal points have equal bits
+    key = bits[:, 0].astype(np.uint64)    # Packs x and y into one integer
+    key <<= np.uint64(32)
+    key |= bits[:, 1]
+    key *= np.uint64(0x9E3779B97F4A7C15)  # Mixes the bits so z can be folded in
+    key ^= bits[:, 2]
+    return key
+
+# Streams the triangle corners of a binary STL a chunk of records at a time, yielding the index of the chunk's first corner and its (n, 3) corners
+# Only one chunk of records is held at once, so neither the file nor every corner is ever in memory
+def readCorners(fileName, chunkSize=65536):
+    count = (os.path.getsize(fileName) - headerSize) // stlTriangle.itemsize # Number of triangle records
+    with open(fileName, "rb") as file:
+        file.seek(headerSize)             # Skips the header
+        for start in range(0, count, chunkSize): # Loops for each chunk of records
+            records = np.fromfile(file, dtype=stlTriangle, count=min(chunkSize, count - start))
+            yield start * 3, records["vertices"].reshape(-1, 3) + np.float32(0.0) # Adding zero turns -0.0 into 0.0 so both have the same bits
+
+# Merges the equal triangle corners of a binary STL into unique points, returning the points and the point index of each corner
+# The corners are sorted by their hash, a plain integer sort is far quicker than sorting 12 byte rows, and the file is read twice
+# rather than holding every corner, once to hash the corners and once to pick out the points
+def mergeVertices(fileName, chunkSize=1 << 20):
+    count = 3 * ((os.path.getsize(fileName) - headerSize) // stlTriangle.itemsize) # Number of corners
+    key = np.empty(count, dtype=np.uint64) # Hash of each corner
+    for start, corners in readCorners(fileName):
+        key[start:start + len(corners)] = hashCorners(corners)
+    order = np.argsort(key)               # Equal corners end up next to each other
+    first = np.empty(count, dtype=bool)   # Marks the first corner of each group of equal keys
+    first[:1] = True
+    for start in range(1, count, chunkSize): # Compares each sorted key with the one before without sorting a copy of the keys
+        sortedKey = key[order[start - 1:start + chunkSize]]
+        np.not_equal(sortedKey[1:], sortedKey[:-1], out=first[start:start + chunkSize])
+    inverse = key.view(np.int64)          # Point index of each corner, stored over the keys as they are no longer needed
+    group = -1                            # Point index of the last group seen
+    for start in range(0, count, chunkSize): # Numbers the groups and scatters the numbers back to the corners
+        groups = np.cumsum(first[start:start + chunkSize]) + group
+        inverse[order[start:start + chunkSize]] = groups
+        group = int(groups[-1])
+    owners = np.minimum.reduceat(order, np.flatnonzero(first)) # Earliest corner of each group, read before any other corner of it
+    del order, first
+
+    # Takes each point from its group's earliest corner, and checks every later corner matches it as two different corners sharing a hash is very unlikely but possible
+    points = np.empty((len(owners), 3), dtype=np.float32)
+    byCorner = np.argsort(owners)         # Groups in the order their points are read
+    owners = owners[byCorner]
+    for start, corners in readCorners(fileName):
+        low, high = np.searchsorted(owners, [start, start + len(corners)]) # Groups whose point is in this chunk
+        points[byCorner[low:high]] = corners[owners[low:high] - start]
+        if not np.array_equal(points[inverse[start:start + len(corners)]], corners):
+            return mergeVerticesExactly(np.concatenate([part for offset, part in readCorners(fileName)]))
+    return points, inverse
+
+# Merges equal corners with a sort on every coordinate, used if two different corners share a hash
+def mergeVerticesExactly(corners):
+    bits = corners.view(np.uint32)
+    order = np.lexsort((bits[:, 2], bits[:, 1], bits[:, 0])) # Stable sort on every coordinate
+    sortedBits = bits[order]
+    first = np.empty(len(sortedBits), dtype=bool)
+    first[:1] = True
+    np.any(sortedBits[1:] != sortedBits[:-1], axis=1, out=first[1:])
+    inverse = np.empty(len(order), dtype=np.int64)
+    inverse[order] = np.cumsum(first) - 1
+    return corners[order[first]], inverse
+
+# Loads an STL file into a vtkPolyData, binary files are read through NumPy and ASCII files through vtkSTLReader
+def loadStl(fileName):
+    if not isBinaryStl(fileName):        # ASCII files are rare for parts and have no fixed layout to map
+        reader = vtkSTLReader()
+        reader.SetFileName(fileName)
+        reader.Update()
+        return reader.GetOutput()
+
+    points, connectivity = mergeVertices(fileName) # Shared points and the triangles that use them
+    polyData = vtkPolyData()         # Geometry container for the part
+
+    # Points, the arrays are handed to vtk without copying
+    partPoints = vtkPoints()
+    partPoints.SetData(numpy_support.numpy_to_vtk(points, deep=False))
+    polyData.SetPoints(partPoints)
+
+    # Triangles, every cell has three corners
+    offsets = np.arange(0, len(connectivity) + 1, 3, dtype=np.int64) # Triangle i starts at connectivity entry 3i
+    cells = vtkCellArray()
+    cells.SetData(numpy_support.numpy_to_vtkIdTypeArray(offsets, deep=False),
+                  numpy_support.numpy_to_vtkIdTypeArray(connectivity, deep=False))
+    polyData.SetPolys(cells)
+    return polyData
+
+# Writes a binary STL of a wavy grid with about the given number of triangles, used to benchmark the loaders
+def writeTestStl(fileName, triangleCount):
+    side = int(np.sqrt(triangleCount / 2)) + 1 # Grid points along each side
+    x, y = np.meshgrid(np.linspace(0, 100, side, dtype=np.float32), np.linspace(0, 100, side, dtype=np.float32))
+    z = (np.sin(x / 5) * np.cos(y / 7) * 5).astype(np.float32)
+    grid = np.stack([x, y, z], axis=-1)       # (side, side, 3) grid of points
+    a, b = grid[:-1, :-1].reshape(-1, 3), grid[:-1, 1:].reshape(-1, 3) # Corners of each grid square
+    c, d = grid[1:, :-1].reshape(-1, 3), grid[1:, 1:].reshape(-1, 3)
+    triangles = np.zeros(len(a) * 2, dtype=stlTriangle)
+    triangles["vertices"][0::2] = np.stack([a, b, d], axis=1) # Two triangles per square
+    triangles["vertices"][1::2] = np.stack([a, d, c], axis=1)
+    with open(fileName, "wb") as file:
+        file.write(b"PrinterGuru test grid".ljust(80))
+        file.write(np.array([len(triangles)], "<u4").tobytes())
+        triangles.tofile(file)
+
+# Process pool worker, loads the file with one of the loaders and returns the time and memory taken
+def measureLoader(fileName, useVtkReader):
+    baseline = getPeakRSS()                # Peak memory before loading
+    startTime = time.perf_counter()
+    if useVtkReader:
+        reader = vtkSTLReader()
+        reader.SetFileName(fileName)
+        reader.Update()
+        polyData = reader.GetOutput()
+    else:
+        polyData = loadStl(fileName)
+    seconds = time.perf_counter() - startTime
+    return {"seconds": seconds, "peakRSS": getPeakRSS() - baseline, # Extra peak memory in MB used by loading
+            "points": polyData.GetNumberOfPoints(), "triangles": polyData.GetNumberOfCells()}
+
+# Compares this loader with vtkSTLReader, each load runs in a fresh process so the peak memory figures are separate
+def main():
+    fileName = sys.argv[1] if len(sys.argv) > 1 else "benchmark.stl" # STL file to load
+    if not os.path.exists(fileName):     # Makes a 1M triangle test file if none was given
+        writeTestStl(fileName, 1000000)
+    for name, useVtkReader in (("vtkSTLReader", True), ("StlLoader", False)):
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            print(name, executor.submit(measureLoader, fileName, useVtkReader).result())
+
+# Checks if script is the main program being run
+if __name__ == '__main__':
+    main() # Runs the main function
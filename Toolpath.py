@@ -0,0 +1,139 @@
+# Importing all required libraries
+import time
+import numpy as np
+from vtkmodules.vtkCommonCore import vtkPoints, vtkLookupTable
+from vtkmodules.vtkCommonDataModel import vtkPolyData, vtkCellArray
+from vtkmodules.vtkRenderingCore import vtkActor, vtkPolyDataMapper
+from vtkmodules.util import numpy_support # Conversion between NumPy and vtk arrays
+
+# Printed extrusion drawn as line segments in one growing vtkPolyData, rendered through a single mapper
+class ToolpathLayer:
+    # Initalises the toolpath layer object
+    def __init__(self, capacity=65536, flushInterval=0.25, lineWidth=2.0, tubes=False):
+        self.count = 0                     # Number of segments stored
+        self.flushInterval = flushInterval # Minimum time in seconds between pushing new segments to vtk
+        self.lastFlush = 0.0               # Time of the last push to vtk
+        self.dirty = False                 # Set when there are segments not yet pushed to vtk
+        self.allocate(capacity)            # Preallocates the segment arrays
+
+        # Layers, a new layer starts at each new extrusion height
+        self.layerStarts = [] # Index of the first segment of each layer
+        self.layerHeights = [] # Z height of each layer
+        self.visibleLayers = None # (first, last) visible layers, None shows every layer
+
+        # vtk pipeline
+        self.polyData = vtkPolyData()  # Holds every segment
+        self.mapper = vtkPolyDataMapper()
+        self.mapper.SetInputData(self.polyData)
+        self.mapper.SetScalarModeToUsePointData() # Colours by the feed rate stored on each point
+        self.mapper.ScalarVisibilityOff()         # Solid colour until colouring by feed rate is turned on
+        lookupTable = vtkLookupTable()        # Slow feed rates are blue and fast feed rates red
+        lookupTable.SetHueRange(0.667, 0.0)
+        lookupTable.Build()
+        self.mapper.SetLookupTable(lookupTable)
+        self.actor = vtkActor()
+        self.actor.SetMapper(self.mapper)
+        self.actor.GetProperty().SetColor(0.905882, 0.443137, 0.027451) # Orange filament
+        self.actor.GetProperty().SetLineWidth(lineWidth)
+        self.actor.GetProperty().SetRenderLinesAsTubes(tubes) # Shaded like tubes on the GPU without generating tube geometry
+        self.actor.PickableOff() # The toolpath should never get in the way of picking printer parts
+        self.flush(force=True)
+
+    # Allocates the segment arrays with room for capacity segments, keeping the stored segments
+    def allocate(self, capacity):
+        points = np.zeros((capacity * 2, 3), dtype=np.float32)  # Two points per segment
+        feeds = np.zeros(capacity * 2, dtype=np.float32)        # Feed rate at each point
+        if self.count:                                          # Copies the existing segments across
+            points[:self.count * 2] = self.points[:self.count * 2]
+            feeds[:self.count * 2] = self.feeds[:self.count * 2]
+        self.points, self.feeds = points, feeds
+        self.connectivity = np.arange(capacity * 2, dtype=np.int32)         # Segment i joins points 2i and 2i + 1
+        self.cellOffsets = np.arange(0, capacity * 2 + 1, 2, dtype=np.int32) # Segment i starts at connectivity entry 2i
+        self.capacity = capacity
+
+    # Adds segments from starts to ends, (n, 3) arrays in the toolpath's coordinates, with their feed rates
+    def addSegments(self, starts, ends, feeds):
+        count = len(starts)   # Number of new segments
+        if count == 0:
+            return
+        if self.count + count > self.capacity:                     # Grows the arrays when full
+            self.allocate(max(self.capacity * 2, self.count + count)) # Doubling keeps the cost of growing amortised
+
+        # Starts new layers where the extrusion height changes
+        heights = starts[:, 2]                                      # Height of each new segment
+        previous = np.concatenate([[self.layerHeights[-1] if self.layerHeights else np.nan], heights[:-1]])
+        for i in np.flatnonzero(heights != previous):               # Loops for each change of height
+            self.layerStarts.append(self.count + int(i))
+            self.layerHeights.append(float(heights[i]))
+
+        # Stores the segments
+        points = self.points[self.count * 2:(self.count + count) * 2] # View of the free space
+        points[0::2] = starts
+        points[1::2] = ends
+        self.feeds[self.count * 2:(self.count + count) * 2] = np.repeat(feeds, 2)
+        self.count += count
+        self.dirty = True
+
+    # Removes every layer from the given height upwards, used when playback jumps backwards
+    def truncateAtHeight(self, height):
+        layer = int(np.searchsorted(self.layerHeights, height)) if self.layerHeights else 0 # First layer at or above the height
+        if layer < len(self.layerStarts):
+            self.count = self.layerStarts[layer]
+            del self.layerStarts[layer:], self.layerHeights[layer:]
+            self.dirty = True
+
+    # Removes every segment
+    def clear(self):
+        self.count = 0
+        self.layerStarts, self.layerHeights = [], []
+        self.dirty = True
+        self.flush(force=True)
+
+    # Shows only the layers from first to last, or every layer if first is None
+    def setVisibleLayers(self, first, last=None):
+        self.visibleLayers = None if first is None else (first, last)
+        self.dirty = True
+        self.flush(force=True)
+
+    # Turns colouring by feed rate on or off
+    def setColourByFeed(self, enabled):
+        self.mapper.SetScalarVisibility(enabled)
+
+    # Pushes new segments to vtk, at most once per flush interval unless forced
+    def flush(self, force=False):
+        now = time.perf_counter()
+        if not self.dirty or (not force and now - self.lastFlush < self.flushInterval):
+            return False
+        self.lastFlush = now
+        self.dirty = False
+
+        # Visible segment range
+        first, last = 0, self.count # Segment range to draw
+        if self.visibleLayers is not None and self.layerStarts:
+            firstLayer, lastLayer = self.visibleLayers
+            first = self.layerStarts[min(firstLayer, len(self.layerStarts) - 1)]
+            last = self.layerStarts[lastLayer + 1] if lastLayer is not None and lastLayer + 1 < len(self.layerStarts) else self.count
+            last = max(first, last)
+
+        # Wraps the arrays without copying them, only the used part of each array is handed over
+        points = vtkPoints()
+        points.SetData(numpy_support.numpy_to_vtk(self.points[:self.count * 2], deep=False))
+        cells = vtkCellArray()
+        cells.SetData(numpy_support.numpy_to_vtk(self.cellOffsets[:last - first + 1], deep=False),
+                      numpy_support.numpy_to_vtk(self.connectivity[first * 2:last * 2], deep=False))
+        scalars = numpy_support.numpy_to_vtk(self.feeds[:self.count * 2], deep=False)
+        scalars.SetName("Feed")
+        self.polyData.SetPoints(points)
+        self.polyData.SetLines(cells)
+        self.polyData.GetPointData().SetScalars(scalars)
+        if self.count:
+            self.mapper.SetScalarRange(float(self.feeds[:self.count * 2].min()), float(self.feeds[:self.count * 2].max()))
+        self.polyData.Modified()
+        return True
+
+    # Returns the segment count and memory use of the toolpath
+    def getStatistics(self):
+        allocated = self.points.nbytes + self.feeds.nbytes + self.connectivity.nbytes + self.cellOffsets.nbytes # Bytes held by the arrays
+        perSegment = allocated / self.capacity # Bytes per segment of capacity
+        return {"segments": self.count, "layers": len(self.layerStarts), "capacity": self.capacity,
+                "allocatedMB": allocated / (1024 * 1024), "MBPerMillionSegments": perSegment * 1e6 / (1024 * 1024)}
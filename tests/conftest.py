@@ -0,0 +1,6 @@
+# Importing all required libraries
+import os
+import sys
+
+# The modules live at the top of the repository rather than in a package, so it is put on the import path for the tests
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
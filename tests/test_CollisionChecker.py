@@ -0,0 +1,78 @@
+# Importing all required libraries
+import numpy as np
+from vtkmodules.vtkFiltersSources import vtkCubeSource
+from vtkmodules.vtkFiltersCore import vtkTriangleFilter
+import CollisionChecker
+
+# Returns count boxes as centres, unit axes and half extents, with random sizes and turns, centred within spread of centre
+def randomBoxes(random, count, centre, spread, size):
+    centres = np.asarray(centre) + random.uniform(-spread, spread, (count, 3))
+    axes = np.linalg.qr(random.normal(size=(count, 3, 3)))[0].transpose(0, 2, 1) # Rows of a random rotation
+    extents = random.uniform(size / 4, size, (count, 3))
+    return centres, axes, extents
+
+# Brute force reference, checks every box pair at every translation on all 15 separating axes one at a time
+def referenceCollisions(movingBoxes, obstacleBoxes, translations):
+    colliding = np.zeros(len(translations), dtype=bool)
+    for t, translation in enumerate(translations): # Loops for each translation
+        for centreA, axesA, extentsA in zip(*movingBoxes):
+            for centreB, axesB, extentsB in zip(*obstacleBoxes):
+                offset = centreB - (centreA + translation)
+                candidates = list(axesA) + list(axesB) + [np.cross(a, b) for a in axesA for b in axesB]
+                separated = False
+                for axis in candidates:    # Loops for each separating axis
+                    if np.linalg.norm(axis) < 1e-9: # Parallel edges give no axis
+                        continue
+                    radius = np.sum(extentsA * np.abs(axesA @ axis)) + np.sum(extentsB * np.abs(axesB @ axis))
+                    if abs(offset @ axis) > radius:
+                        separated = True
+                        break
+                if not separated:
+                    colliding[t] = True
+    return colliding
+
+# Checks the checker agrees with the brute force reference, on the direct path and on the grid path
+def testMatchesReference():
+    random = np.random.default_rng(1)
+    movingBoxes = randomBoxes(random, 4, (0, 0, 0), 10, 6)
+    obstacleBoxes = randomBoxes(random, 20, (50, 50, 20), 40, 8)
+    lower, upper = np.array([0, 0, 0]), np.array([100, 100, 40])
+    translations = random.uniform(lower, upper, (200, 3))
+    expected = referenceCollisions(movingBoxes, obstacleBoxes, translations)
+    assert 0 < expected.sum() < len(translations) # The test covers both outcomes
+
+    checker = CollisionChecker.CollisionChecker(movingBoxes, lower, upper)
+    checker.setObstacles(obstacleBoxes)
+    assert np.array_equal(np.concatenate([checker.checkTranslations(translation) for translation in translations]), expected) # One at a time, the direct path
+    repeated = np.tile(translations, (100, 1)) # Enough translations to go through the grid
+    assert len(checker.pairCentres) * len(repeated) > 65536
+    assert np.array_equal(checker.checkTranslations(repeated), np.tile(expected, 100))
+    checker.maxGridEntries = 1         # Forces the coarsest grid
+    checker.buildGrid()
+    assert np.array_equal(checker.checkTranslations(repeated), np.tile(expected, 100))
+
+# Checks nothing collides before any obstacles are set
+def testNoObstacles():
+    random = np.random.default_rng(2)
+    checker = CollisionChecker.CollisionChecker(randomBoxes(random, 4, (0, 0, 0), 5, 5), (0, 0, 0), (10, 10, 10))
+    assert not checker.checkTranslations(random.uniform(0, 10, (100, 3))).any()
+
+# Checks the leaf boxes of a cube cover it, and that a box just past its face only collides once the clearance reaches it
+def testLeafBoxes():
+    cube = vtkCubeSource()
+    cube.SetXLength(20)
+    cube.SetYLength(10)
+    cube.SetZLength(4)
+    triangles = vtkTriangleFilter()
+    triangles.SetInputConnection(cube.GetOutputPort())
+    triangles.Update()
+    centres, axes, extents = CollisionChecker.obbLeafBoxes(triangles.GetOutput(), offset=(100, 0, 0))
+    corners = centres[:, None, :] + np.einsum("nk,nkj,ck->ncj", extents, axes, np.array(np.meshgrid([-1, 1], [-1, 1], [-1, 1])).reshape(3, -1).T)
+    assert np.allclose(corners.reshape(-1, 3).min(axis=0), (90, -5, -2), atol=1e-4)
+    assert np.allclose(corners.reshape(-1, 3).max(axis=0), (110, 5, 2), atol=1e-4)
+
+    probe = (np.zeros((1, 3)), np.eye(3)[None], np.full((1, 3), 0.5)) # 1 mm cube moved along x
+    for clearance, hits in ((0.0, [False, True]), (2.0, [True, True])):
+        checker = CollisionChecker.CollisionChecker(probe, (80, -10, -10), (120, 10, 10), clearance=clearance)
+        checker.setObstacles((centres, axes, extents))
+        assert list(checker.checkTranslations([[88, 0, 0], [95, 0, 0]])) == hits # 1.5 mm from the face, and inside the cube
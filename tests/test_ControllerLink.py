@@ -0,0 +1,55 @@
+# Importing all required libraries
+import time
+import collections
+import pytest
+pytest.importorskip("serial")   # The link needs pyserial, which is optional
+pytest.importorskip("pty")      # The emulator needs a unix pseudo terminal
+import ControllerLink
+
+# Starts a link to a firmware emulator, waiting until it is ready
+def startLink(**emulatorOptions):
+    emulator = ControllerLink.FirmwareEmulator(**emulatorOptions)
+    link = ControllerLink.ControllerLink(emulator.port)
+    link.start()
+    return link, emulator
+
+# Waits until nothing is queued or in flight
+def waitForIdle(link):
+    deadline = time.time() + 10
+    while True:
+        stats = link.getStatistics()
+        if not stats["queueDepth"] and not stats["inFlight"]:
+            return stats
+        assert time.time() < deadline
+        time.sleep(0.01)
+
+# Checks lost acknowledgements never make the firmware run a command twice, only the newest position target is sent again
+def testLostAcknowledgements():
+    link, emulator = startLink(dropEvery=5)
+    try:
+        for i in range(20):
+            assert link.sendCommand(f"M{i}")
+        waitForIdle(link)
+        for i in range(10):
+            link.sendPosition([i, 0, 0])
+            time.sleep(0.002)
+        stats = waitForIdle(link)
+    finally:
+        link.stop()
+        emulator.stop()
+    counts = collections.Counter(emulator.received)
+    assert all(counts[f"M{i}"] == 1 for i in range(20))  # Each command was received once, in order
+    assert [line for line in emulator.received if line.startswith("M")] == [f"M{i}" for i in range(20)]
+    assert stats["unconfirmed"] == 4                      # Every fifth acknowledgement of the commands was dropped
+    assert emulator.received[-1] == "G0 X9.000 Y0.000 Z0.000"
+    assert stats["acknowledged"] + stats["lost"] == stats["sent"]
+
+# Checks a port that cannot be opened is reported rather than raised, and lines sent meanwhile are only queued
+def testMissingPort(tmp_path):
+    link = ControllerLink.ControllerLink(str(tmp_path / "missing"))
+    link.start()                        # Returns straight away, the port is opened on the writer thread
+    link.sendPosition([1, 2, 3])
+    link.writerThread.join(5)
+    stats = link.getStatistics()
+    assert stats["error"] and not stats["connected"] and stats["sent"] == 0
+    link.stop()
@@ -0,0 +1,94 @@
+# Importing all required libraries
+import time
+import numpy as np
+import GcodePlayer
+
+# Two layers of a small print, with a G92 extruder reset and relative moves to check the parser state carries across
+gcode = b"""; test print
+G28
+G90
+M82
+G1 Z0.2 F600
+G1 X10 Y0 E1 F1200 ; first layer
+G1 X10 Y10 E2
+G92 E0
+G1 X0 Y10 E1
+G1 Z0.4
+G91
+G1 X5 E0.5
+G1 Y-5 E0.5
+G90
+M83
+G1 X0 Y0 E1
+"""
+
+# Writes the test G-code file and returns its name
+def writeGcode(tmp_path):
+    fileName = str(tmp_path / "test.gcode")
+    with open(fileName, "wb") as file:
+        file.write(gcode)
+    return fileName
+
+# Plays a whole file and returns every timestep position
+def playAll(player):
+    positions = [player.advance(1000.0)]
+    while not player.finished:
+        positions.append(player.advance(1000.0))
+    return np.vstack(positions)
+
+# Checks absolute, relative, G92 and M83 moves give the right machine positions and extrusion
+def testReadMoves(tmp_path):
+    with open(writeGcode(tmp_path), "rb") as file:
+        moves = [move[1:5] for move in GcodePlayer.readMoves(file, GcodePlayer.GcodeState())]
+    assert moves == [(0, 0, 0, 0), (0, 0, 0.2, 0), (10, 0, 0.2, 1), (10, 10, 0.2, 1), (0, 10, 0.2, 1), (0, 10, 0.4, 0),
+                     (5, 10, 0.4, 0.5), (5, 5, 0.4, 0.5), (0, 0, 0.4, 1)]
+
+# Checks parameters without a value are kept as None rather than stopping the parse
+def testParseParameters():
+    assert GcodePlayer.parseParameters([b"X1.5", b"w", b"E-2"]) == {b"X": 1.5, b"W": None, b"E": -2.0}
+
+# Checks the layer index finds both layers and the state saved for each
+def testLayerIndex(tmp_path):
+    layers = GcodePlayer.buildLayerIndex(writeGcode(tmp_path))
+    assert list(layers["z"]) == [0.2, 0.4]
+    assert gcode[layers["offset"][0]:].startswith(b"G1 Z0.2")
+    assert gcode[layers["offset"][1]:].startswith(b"G1 Z0.4")
+    state = GcodePlayer.GcodeState.fromArray(layers["state"][1]) # State before the second layer's Z move
+    assert state.position == [0.0, 10.0, 0.2] and state.absolute and state.offsets[3] == 2.0 # The G92 E0 offset is kept
+
+# Checks a whole file plays through to its last move
+def testPlayback(tmp_path):
+    player = GcodePlayer.GcodePlayer(writeGcode(tmp_path), timestep=0.01, buildIndex=False)
+    positions = playAll(player)
+    assert np.allclose(positions[-1], [0, 0, 0.4], atol=0.2) # The last timestep is within one timestep's travel of the end
+    assert player.finished
+    player.close()
+
+# Checks seeking to a layer starts playback at the layer and plays on to the end of the file
+def testSeekLayer(tmp_path):
+    player = GcodePlayer.GcodePlayer(writeGcode(tmp_path), timestep=0.01)
+    deadline = time.time() + 30
+    while not player.layerIndexReady():  # The index is built in another process
+        assert time.time() < deadline
+        time.sleep(0.01)
+    assert player.seekLayer(1)
+    assert np.allclose(player.position, [0, 10, 0.2]) # Starts where the layer's Z move starts
+    positions = playAll(player)
+    assert np.allclose(positions[-1], [0, 0, 0.4], atol=0.2)
+    assert player.currentLayer() == 1
+    assert not player.seekLayer(2)       # There is no third layer
+    player.close()
+
+# Checks holding at a timestep rewinds the player so it resumes there, keeping only the extrusion finished before it
+def testHoldAt(tmp_path):
+    player = GcodePlayer.GcodePlayer(writeGcode(tmp_path), timestep=0.01, buildIndex=False)
+    positions = player.advance(1000.0)   # Plays the whole file in one step
+    assert player.finished and len(player.completedExtrusions[0]) == 6
+    held = int(np.argmax(positions[:, 0] >= 10)) # First timestep at the end of the first extrusion
+    player.holdAt(held)
+    assert not player.finished
+    assert np.allclose(player.position, positions[held - 1])
+    assert len(player.completedExtrusions[0]) == 0 # The first extrusion had not finished before the held timestep
+    resumed = playAll(player)
+    assert np.allclose(resumed, positions[held:])
+    player.close()
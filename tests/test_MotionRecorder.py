@@ -0,0 +1,62 @@
+# Importing all required libraries
+import numpy as np
+import pytest
+import MotionRecorder
+
+# Records some position updates, stopping the recorder so every record is written
+def recordUpdates(fileName, updates):
+    recorder = MotionRecorder.MotionRecorder(fileName, batchSize=4) # Small batches so several writes happen
+    recorder.start()
+    for real, simulated, held in updates:
+        recorder.record(real, simulated, held)
+    recorder.stop()
+    return recorder
+
+# Checks every record written can be read back, in order, after the header
+def testRoundTrip(tmp_path):
+    fileName = str(tmp_path / "motion.bin")
+    updates = [([i, i + 0.5, 2 * i], [-i, 0.25 * i, 1], i % 3 == 0) for i in range(10)]
+    recorder = recordUpdates(fileName, updates)
+    assert recorder.written == len(updates)
+
+    header = MotionRecorder.readHeader(fileName)
+    assert header["version"] == MotionRecorder.version and header["recordSize"] == MotionRecorder.motionRecord.itemsize
+    records = MotionRecorder.loadRecording(fileName)
+    assert np.array_equal(records["real"], [real for real, simulated, held in updates])
+    assert np.array_equal(records["simulated"], [simulated for real, simulated, held in updates])
+    assert list(records["held"]) == [held for real, simulated, held in updates]
+    assert np.all(np.diff(records["time"]) >= 0)
+
+# Checks opening an existing log appends to it rather than writing a second header
+def testAppend(tmp_path):
+    fileName = str(tmp_path / "motion.bin")
+    recordUpdates(fileName, [([1, 2, 3], [4, 5, 6], False)])
+    recordUpdates(fileName, [([7, 8, 9], [1, 2, 3], True)])
+    records = MotionRecorder.loadRecording(fileName)
+    assert np.array_equal(records["real"], [[1, 2, 3], [7, 8, 9]])
+
+# Checks a record cut short by a crash is left out, and files that are not motion logs are refused
+def testDamagedFiles(tmp_path):
+    fileName = str(tmp_path / "motion.bin")
+    recordUpdates(fileName, [([1, 2, 3], [4, 5, 6], False)] * 3)
+    with open(fileName, "ab") as file:
+        file.write(b"\0" * 10)           # Part of a fourth record
+    assert len(MotionRecorder.loadRecording(fileName)) == 3
+
+    other = tmp_path / "other.bin"
+    other.write_bytes(b"not a motion log at all")
+    with pytest.raises(ValueError):
+        MotionRecorder.loadRecording(str(other))
+
+# Checks the replay finds the newest record at or before each time
+def testReplay():
+    records = np.zeros(4, dtype=MotionRecorder.motionRecord)
+    records["time"] = [10.0, 11.0, 11.5, 13.0]
+    records["real"][:, 0] = [0, 1, 2, 3]
+    replay = MotionRecorder.MotionReplay(records)
+    assert replay.seek(10.9)["real"][0] == 0
+    assert replay.advance(0.6)["real"][0] == 2 # 11.5 exactly
+    assert not replay.finished
+    assert replay.advance(100)["real"][0] == 3 # Clamped to the end
+    assert replay.finished
+    assert replay.seek(0)["real"][0] == 0      # Clamped to the start